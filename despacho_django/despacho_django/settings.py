@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 import logging
+import tempfile
 from django.core.exceptions import ImproperlyConfigured
 
 logger = logging.getLogger(__name__)
@@ -108,6 +109,10 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    # Server-Timing + log por petición (después de WhiteNoise: no mide estáticos).
+    'proyectos.middleware.ServerTimingMiddleware',
+    # Comprime JSON/HTML dinámico (los estáticos ya los comprime WhiteNoise).
+    'proyectos.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -153,13 +158,34 @@ if USE_CLOUDINARY:
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Versiones reducidas de las imágenes del catálogo (proyectos/renditions.py):
+# se generan al subir, en estos anchos y formatos (AVIF solo si Pillow lo
+# soporta) y la API las devuelve como srcset.
+IMAGE_RENDITION_WIDTHS = tuple(
+    int(w) for w in _env_list('IMAGE_RENDITION_WIDTHS', ['320', '640', '960', '1280'])
+)
+IMAGE_RENDITION_FORMATS = tuple(_env_list('IMAGE_RENDITION_FORMATS', ['avif', 'webp']))
+IMAGE_RENDITION_QUALITY = {'avif': 55, 'webp': 80}
+
+# /img/<ancho>x<alto>/<ruta> (proyectos/resize.py): imágenes redimensionadas al
+# vuelo cuando no hay Cloudinary, guardadas en un cache en disco que descarta
+# las menos usadas al pasar de IMAGE_RESIZE_CACHE_MAX_MB.
+# - IMAGE_RESIZE_SIZES: medidas aceptadas (p. ej. "320x0,640x0,800x600"); por
+#   defecto los anchos de las rendiciones. "*" acepta cualquiera hasta
+#   IMAGE_RESIZE_MAX_DIMENSION; lo demás es 404.
+IMAGE_RESIZE_CACHE_DIR = os.getenv('IMAGE_RESIZE_CACHE_DIR') or str(Path(tempfile.gettempdir()) / 'despacho_django_img')
+IMAGE_RESIZE_CACHE_MAX_BYTES = int(os.getenv('IMAGE_RESIZE_CACHE_MAX_MB', '512') or '512') * 1024 * 1024
+IMAGE_RESIZE_MAX_DIMENSION = int(os.getenv('IMAGE_RESIZE_MAX_DIMENSION', '2560') or '2560')
+IMAGE_RESIZE_SIZES = tuple(_env_list('IMAGE_RESIZE_SIZES', [f'{w}x0' for w in IMAGE_RENDITION_WIDTHS]))
+
 
 
 ROOT_URLCONF = 'despacho_django.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates que mide el render para Server-Timing (proyectos/timing.py).
+        'BACKEND': 'proyectos.timing.TimedDjangoTemplates',
         # Project-level templates directory
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
@@ -176,6 +202,11 @@ TEMPLATES = [
 WSGI_APPLICATION = 'despacho_django.wsgi.application'
 
 
+# Vistas async (proyectos/views_async.py) para correr bajo ASGI; las activa
+# scripts/railway_start.py con SERVER_MODE=asgi.
+ASYNC_VIEWS = _env_bool('DJANGO_ASYNC_VIEWS', default=False)
+
+
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
@@ -189,7 +220,9 @@ if DATABASE_URL:
         DATABASES = {
             'default': dj_database_url.parse(
                 DATABASE_URL,
-                conn_max_age=600,
+                # Bajo ASGI cada petición async usa su propia conexión y las
+                # persistentes se acumularían; Django recomienda desactivarlas.
+                conn_max_age=0 if ASYNC_VIEWS else 600,
                 ssl_require=not DEBUG,
             )
         }
@@ -206,6 +239,66 @@ else:
     }
 
 
+# Cache
+# - FileBasedCache por defecto: lo comparten todos los workers de gunicorn del mismo
+#   contenedor. LocMemCache es por proceso y cada worker vería su propia versión del
+#   catálogo (ver proyectos/cache.py), sirviendo datos viejos después de editar en el admin.
+# - DJANGO_CACHE_DIR permite moverlo (p. ej. a un volumen persistente).
+# - DJANGO_CACHE_BACKEND solo para benchmarks (p. ej. DummyCache para medir el ORM).
+# - 'compressed': variantes br/gzip de CompressionMiddleware, aparte para que no
+#   desplacen del cache principal las versiones del catálogo ni el snapshot.
+_CACHE_BACKEND = os.getenv('DJANGO_CACHE_BACKEND') or 'django.core.cache.backends.filebased.FileBasedCache'
+_CACHE_DIR = os.getenv('DJANGO_CACHE_DIR') or str(Path(tempfile.gettempdir()) / 'despacho_django_cache')
+CACHES = {
+    'default': {
+        'BACKEND': _CACHE_BACKEND,
+        'LOCATION': _CACHE_DIR,
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('DJANGO_CACHE_MAX_ENTRIES', '2000') or '2000'),
+        },
+    },
+    'compressed': {
+        'BACKEND': _CACHE_BACKEND,
+        'LOCATION': str(Path(_CACHE_DIR) / 'compressed'),
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('DJANGO_COMPRESSION_CACHE_MAX_ENTRIES', '500') or '500'),
+        },
+    },
+}
+
+
+# Server-Timing y presupuesto de consultas por vista (proyectos.middleware.ServerTimingMiddleware)
+# - La cabecera expone número y tiempo de consultas: por defecto solo con DEBUG.
+#   El log por petición y /metrics siguen activos siempre.
+SERVER_TIMING_HEADER = _env_bool('SERVER_TIMING_HEADER', default=DEBUG)
+SERVER_TIMING_QUERY_BUDGET = int(os.getenv('SERVER_TIMING_QUERY_BUDGET', '10') or '10')
+
+
+# /metrics (proyectos/metrics.py): Authorization: Bearer <METRICS_TOKEN>.
+# Sin token solo responde con DJANGO_DEBUG=true.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+
+# Edge cache (CDN / proxy delante de Railway), ver proyectos/edge.py
+# - s-maxage corto por defecto; con un backend de purga real se puede subir,
+#   porque cada cambio en el admin invalida sus Surrogate-Key.
+# - EDGE_PURGE_BACKEND: proyectos.edge.LoggingPurgeBackend (por defecto),
+#   NullPurgeBackend o FastlyPurgeBackend (usa FASTLY_SERVICE_ID / FASTLY_API_TOKEN).
+EDGE_CACHE_S_MAXAGE = int(os.getenv('EDGE_CACHE_S_MAXAGE', '300') or '300')
+EDGE_CACHE_STALE_WHILE_REVALIDATE = int(os.getenv('EDGE_CACHE_STALE_WHILE_REVALIDATE', '60') or '60')
+EDGE_CACHE_STALE_IF_ERROR = int(os.getenv('EDGE_CACHE_STALE_IF_ERROR', '86400') or '86400')
+EDGE_SURROGATE_KEY_HEADER = os.getenv('EDGE_SURROGATE_KEY_HEADER') or 'Surrogate-Key'
+EDGE_PURGE_BACKEND = os.getenv('EDGE_PURGE_BACKEND') or 'proyectos.edge.LoggingPurgeBackend'
+EDGE_PURGE_OPTIONS = {}
+if os.getenv('FASTLY_SERVICE_ID'):
+    EDGE_PURGE_OPTIONS = {
+        'service_id': os.getenv('FASTLY_SERVICE_ID'),
+        'api_token': os.getenv('FASTLY_API_TOKEN', ''),
+    }
+
+
 # Startup diagnostics (no secrets in clear-text)
 logger.info(
     'Startup env: DEBUG=%s SECRET_KEY_SET=%s ALLOWED_HOSTS=%s DATABASE_URL_SET=%s USE_CLOUDINARY=%s',
@@ -279,6 +372,16 @@ STORAGES = {
     },
 }
 
+# Uploads guardados bajo el hash de su contenido (proyectos/storage.py): las
+# subidas repetidas reutilizan el mismo archivo. Opcional: con
+# MEDIA_CONTENT_ADDRESSED=true; los videos conservan siempre su nombre.
+MEDIA_CONTENT_ADDRESSED = _env_bool('MEDIA_CONTENT_ADDRESSED', default=False)
+if MEDIA_CONTENT_ADDRESSED:
+    STORAGES['default'] = {
+        'BACKEND': 'proyectos.storage.ContentAddressedStorage',
+        'OPTIONS': {'backend': STORAGES['default']['BACKEND']},
+    }
+
 # Safety valve: evita 500 si falta una entrada en el manifest.
 # Idealmente mantenlo en True cuando ya esté estable el pipeline de collectstatic.
 if not DEBUG:
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ProyectosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'proyectos'
+
+    def ready(self):
+        # Registra los receivers que invalidan el cache del catálogo.
+        from . import signals  # noqa: F401
@@ -0,0 +1,128 @@
+"""Conteo de referencias a los archivos direccionados por contenido.
+
+Con ``ContentAddressedStorage`` (proyectos/storage.py) dos filas que suben la
+misma imagen comparten archivo, así que borrar una no puede borrarlo. Cada
+archivo ``blobs/...`` tiene una fila de ``Blob`` con cuántas filas lo usan:
+
+- ``proyectos.signals`` llama a ``actualizar_referencias`` al guardar y a
+  ``soltar_instancia`` al borrar cualquier modelo con ``ConArchivos``;
+- ``guardar_rendiciones`` llama a ``referenciar`` porque usa ``bulk_create``.
+
+Cuando un blob llega a cero referencias se borra, archivo incluido, después
+del commit (y solo si sigue en cero). Los nombres que no son blobs (subidas
+anteriores, videos o ``MEDIA_CONTENT_ADDRESSED=false``) no se cuentan ni se
+borran.
+``manage.py dedupe_media`` recalcula los conteos desde cero.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .models import Blob, ConArchivos
+from .storage import PREFIJO, es_blob
+
+logger = logging.getLogger(__name__)
+
+
+def campos_archivo(modelo) -> list[str]:
+    return [f.attname for f in modelo._meta.concrete_fields if isinstance(f, models.FileField)]
+
+
+def modelos_con_archivos() -> list:
+    return [m for m in apps.get_app_config('proyectos').get_models() if issubclass(m, ConArchivos)]
+
+
+def referenciar(nombres) -> None:
+    for nombre, n in Counter(n for n in nombres if es_blob(n)).items():
+        if not Blob.objects.filter(nombre=nombre).update(referencias=F('referencias') + n):
+            blob, creado = Blob.objects.get_or_create(nombre=nombre, defaults={'referencias': n})
+            if not creado:
+                Blob.objects.filter(pk=blob.pk).update(referencias=F('referencias') + n)
+
+
+def soltar(nombres) -> None:
+    for nombre, n in Counter(n for n in nombres if es_blob(n)).items():
+        Blob.objects.filter(nombre=nombre).update(referencias=Greatest(F('referencias') - n, 0))
+        if Blob.objects.filter(nombre=nombre, referencias=0).exists():
+            transaction.on_commit(lambda nombre=nombre: _borrar_si_huerfano(nombre))
+
+
+def _borrar_si_huerfano(nombre) -> None:
+    # Ya committeado: otra petición pudo volver a subir el mismo contenido
+    # entre el conteo y el commit; entonces el blob ya no está en cero.
+    borrados, _ = Blob.objects.filter(nombre=nombre, referencias=0).delete()
+    if borrados:
+        try:
+            default_storage.delete(nombre)
+        except OSError as exc:
+            logger.warning('No se pudo borrar el blob %s: %s', nombre, exc)
+
+
+def actualizar_referencias(instance, created, update_fields=None) -> None:
+    """Tras guardar: suma el archivo nuevo y resta el que la fila dejó de usar."""
+
+    nuevos, viejos = [], []
+    for campo in campos_archivo(type(instance)):
+        if update_fields is not None and campo not in update_fields:
+            continue
+        if campo in instance.get_deferred_fields():
+            continue
+        origen = '' if created else instance._archivo_origen(campo)
+        if origen is None:
+            # Se desconoce lo que había (p. ej. fila creada con bulk_create y
+            # guardada sin recargar): sin diferencia no se toca el conteo.
+            continue
+        actual = getattr(instance, campo).name or ''
+        if actual != origen:
+            nuevos.append(actual)
+            viejos.append(origen)
+    referenciar(nuevos)
+    soltar(viejos)
+
+
+def soltar_instancia(instance) -> None:
+    """Tras borrar: resta los archivos que tenía la fila en la base."""
+
+    nombres = []
+    for campo in campos_archivo(type(instance)):
+        if campo in instance.get_deferred_fields():
+            continue
+        origen = instance._archivo_origen(campo)
+        nombres.append(getattr(instance, campo).name or '' if origen is None else origen)
+    soltar(nombres)
+
+
+def recontar() -> dict[str, int]:
+    """Recalcula ``Blob.referencias`` desde las filas; devuelve el conteo.
+
+    Corrige lo que no pasa por las señales (``update()``, ``_raw_delete``).
+    Los blobs que quedan en cero no se borran aquí.
+    """
+
+    conteo = Counter()
+    for modelo in modelos_con_archivos():
+        for campo in campos_archivo(modelo):
+            filas = (
+                modelo.objects.filter(**{f'{campo}__startswith': PREFIJO + '/'})
+                .values_list(campo, flat=True)
+            )
+            conteo.update(filas.iterator())
+
+    with transaction.atomic():
+        Blob.objects.update(referencias=0)
+        existentes = set(Blob.objects.values_list('nombre', flat=True))
+        for nombre, n in conteo.items():
+            if nombre in existentes:
+                Blob.objects.filter(nombre=nombre).update(referencias=n)
+        Blob.objects.bulk_create(
+            Blob(nombre=nombre, referencias=n) for nombre, n in conteo.items() if nombre not in existentes
+        )
+    return dict(conteo)
@@ -0,0 +1,91 @@
+"""Cache versionado del catálogo de proyectos.
+
+El catálogo cambia pocas veces por semana, así que las respuestas de la API se
+guardan bajo una *versión global del catálogo*. Las señales de
+``proyectos.signals`` mueven la versión al guardar/borrar un ``Proyecto`` o un
+``ProyectoImagen``: las entradas de la versión anterior dejan de consultarse y
+expiran solas, sin tener que borrarlas una por una.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+
+from .metrics import record_cache
+
+CATALOG_VERSION_KEY = 'proyectos:catalog:version'
+
+# Las entradas quedan obsoletas por versión, no por tiempo; el timeout solo
+# acota cuánto ocupan en disco las versiones viejas.
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _now_version() -> int:
+    # Microsegundos: si el cache se vacía (o dos workers mueven la versión a la
+    # vez) no se reutiliza un número que ya apuntó a otro contenido.
+    return time.time_ns() // 1000
+
+
+def catalog_version() -> int:
+    """Versión actual del catálogo (se inicializa si el cache está vacío)."""
+
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, _now_version(), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY, _now_version())
+    return int(version)
+
+
+def bump_catalog_version() -> int:
+    """Invalida todo lo cacheado del catálogo moviendo la versión."""
+
+    current = cache.get(CATALOG_VERSION_KEY) or 0
+    version = max(int(current) + 1, _now_version())
+    cache.set(CATALOG_VERSION_KEY, version, timeout=None)
+    return version
+
+
+def catalog_cache_key(namespace: str, *parts) -> str:
+    """Clave de cache ligada a la versión actual del catálogo.
+
+    ``parts`` debe ser serializable a JSON (filtros, paginación, host...).
+    """
+
+    raw = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+    digest = hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+    return f'proyectos:{namespace}:{catalog_version()}:{digest}'
+
+
+def _namespace(key: str) -> str:
+    # 'proyectos:{namespace}:{version}:{digest}' (ver catalog_cache_key)
+    return key.split(':', 2)[1]
+
+
+def get_or_build(key: str, builder, timeout: int = CATALOG_CACHE_TIMEOUT):
+    """Devuelve el valor cacheado en ``key`` o lo construye con ``builder()``."""
+
+    value = cache.get(key)
+    record_cache(_namespace(key), value is not None)
+    if value is None:
+        value = builder()
+        cache.set(key, value, timeout)
+    return value
+
+
+async def aget_or_build(key: str, builder, timeout: int = CATALOG_CACHE_TIMEOUT):
+    """Como ``get_or_build``, pero ``builder`` es una corrutina (ORM async).
+
+    El cache en disco se consulta directamente: son lecturas locales cortas y
+    ``cache.aget`` de FileBasedCache solo las movería a un hilo.
+    """
+
+    value = cache.get(key)
+    record_cache(_namespace(key), value is not None)
+    if value is None:
+        value = await builder()
+        cache.set(key, value, timeout)
+    return value
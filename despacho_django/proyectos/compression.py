@@ -0,0 +1,56 @@
+"""Helpers de compresión HTTP (gzip y, si está instalado, brotli).
+
+brotli es opcional: sin el paquete ``brotli`` solo se negocia gzip.
+"""
+
+from __future__ import annotations
+
+import gzip
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+# Orden de preferencia del servidor cuando el cliente acepta varias.
+SUPPORTED_ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compress(body: bytes, encoding: str, *, best: bool = False) -> bytes:
+    """Comprime ``body``; ``best=True`` para variantes que se calculan una sola vez."""
+
+    if encoding == 'gzip':
+        # mtime=0: misma entrada -> mismos bytes (útil para caches y ETags).
+        return gzip.compress(body, compresslevel=9 if best else 6, mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(body, quality=11 if best else 5)
+    raise ValueError(f'Encoding no soportado: {encoding!r}')
+
+
+def negotiate_encoding(accept_encoding: str, available=SUPPORTED_ENCODINGS) -> str | None:
+    """Elige el encoding a usar según ``Accept-Encoding`` (None = sin comprimir).
+
+    Respeta ``q=0`` y, a igual calidad, la preferencia de ``available``.
+    """
+
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
@@ -0,0 +1,182 @@
+"""Cache en el borde (CDN / proxy inverso delante de Railway).
+
+Las vistas públicas se marcan con ``@edge_cache(...)``: ``Cache-Control``
+público con ``s-maxage`` y ``stale-while-revalidate`` para el CDN, y una
+cabecera ``Surrogate-Key`` con las etiquetas del contenido:
+
+- ``catalog``: listado, facets y cualquier respuesta que dependa del catálogo.
+- ``project:<id>``: detalle de un proyecto.
+- ``home``: página de inicio (``HomePageConfig``).
+- ``team``: "Sobre nosotros" (``EquipoSeccion`` / ``EquipoMiembro``).
+
+Al guardar o borrar esos modelos, ``proyectos.signals`` agenda las etiquetas
+con ``schedule_purge``; después del commit el backend configurado en
+``EDGE_PURGE_BACKEND`` invalida las etiquetas en el CDN. El navegador
+revalida siempre (``max-age=0``); los ETag del catálogo hacen que eso sea un
+304 barato.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Respuestas que un CDN puede compartir (los 304 renuevan la copia del borde).
+_CACHEABLE_STATUS = (200, 304)
+
+
+def _is_personalized(response) -> bool:
+    # Una cookie o Vary: Cookie (CSRF, sesión) hace la respuesta por visitante.
+    vary = (response.get('Vary') or '').lower()
+    return bool(response.cookies) or 'cookie' in vary
+
+
+def apply_edge_cache(response, keys=(), max_age=0):
+    """Lo que hace ``@edge_cache`` a una respuesta, para vistas que lo deciden por petición."""
+    if response.status_code not in _CACHEABLE_STATUS or _is_personalized(response):
+        return response
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=max_age,
+        s_maxage=settings.EDGE_CACHE_S_MAXAGE,
+        stale_while_revalidate=settings.EDGE_CACHE_STALE_WHILE_REVALIDATE,
+        stale_if_error=settings.EDGE_CACHE_STALE_IF_ERROR,
+    )
+    if keys:
+        response.headers[settings.EDGE_SURROGATE_KEY_HEADER] = ' '.join(keys)
+    return response
+
+
+def edge_cache(*keys, max_age=0):
+    """Hace cacheable en el CDN la respuesta de una vista (sync o async).
+
+    ``keys`` son etiquetas ``Surrogate-Key``; pueden usar los kwargs de la URL,
+    p. ej. ``@edge_cache('project:{pk}')``.
+    """
+
+    def decorator(view):
+        def resolve(kwargs):
+            return [key.format(**kwargs) for key in keys]
+
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def inner(request, *args, **kwargs):
+                response = await view(request, *args, **kwargs)
+                return apply_edge_cache(response, resolve(kwargs), max_age)
+
+        else:
+
+            @wraps(view)
+            def inner(request, *args, **kwargs):
+                response = view(request, *args, **kwargs)
+                return apply_edge_cache(response, resolve(kwargs), max_age)
+
+        return inner
+
+    return decorator
+
+
+class BasePurgeBackend:
+    """Invalida etiquetas ``Surrogate-Key`` en el CDN."""
+
+    def __init__(self, **options):
+        self.options = options
+
+    def purge(self, keys: list[str]) -> None:
+        raise NotImplementedError
+
+
+class NullPurgeBackend(BasePurgeBackend):
+    """No hace nada (sin CDN delante)."""
+
+    def purge(self, keys):
+        pass
+
+
+class LoggingPurgeBackend(BasePurgeBackend):
+    """Solo registra las etiquetas; útil en desarrollo y en tests (``assertLogs``)."""
+
+    def purge(self, keys):
+        logger.info('Purga de edge cache: %s', ' '.join(keys))
+
+
+class FastlyPurgeBackend(BasePurgeBackend):
+    """Purga por surrogate key con la API de Fastly.
+
+    Opciones (``EDGE_PURGE_OPTIONS``): ``service_id``, ``api_token`` y
+    ``soft`` (por defecto True: marca como vieja en vez de borrar, así
+    ``stale-while-revalidate`` sigue sirviendo mientras se regenera).
+    """
+
+    endpoint = 'https://api.fastly.com/service/{service_id}/purge'
+    timeout = 5
+
+    def purge(self, keys):
+        import requests
+
+        headers = {
+            'Fastly-Key': self.options['api_token'],
+            'Surrogate-Key': ' '.join(keys),
+            'Accept': 'application/json',
+        }
+        if self.options.get('soft', True):
+            headers['Fastly-Soft-Purge'] = '1'
+        response = requests.post(
+            self.endpoint.format(service_id=self.options['service_id']),
+            headers=headers,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+
+
+def get_purge_backend() -> BasePurgeBackend:
+    backend_class = import_string(settings.EDGE_PURGE_BACKEND)
+    return backend_class(**getattr(settings, 'EDGE_PURGE_OPTIONS', {}))
+
+
+def purge_keys(keys) -> None:
+    """Purga ``keys`` en el CDN. Un fallo se registra pero no rompe el guardado."""
+
+    keys = sorted(set(keys))
+    if not keys:
+        return
+    try:
+        get_purge_backend().purge(keys)
+    except Exception:
+        logger.exception('No se pudo purgar el edge cache: %s', ' '.join(keys))
+
+
+_pending = threading.local()
+
+
+def _flush_pending():
+    keys = getattr(_pending, 'keys', None)
+    if keys:
+        _pending.keys = set()
+        purge_keys(keys)
+
+
+def schedule_purge(keys) -> None:
+    """Agrega ``keys`` a la purga que se hace al terminar la transacción.
+
+    Guardar un proyecto con varias imágenes en el admin dispara una señal por
+    fila; todas se juntan en una sola llamada al CDN. Purgar antes del commit
+    permitiría que el CDN volviera a cachear la versión vieja.
+    """
+
+    pending = getattr(_pending, 'keys', None)
+    if pending is None:
+        pending = _pending.keys = set()
+    pending.update(keys)
+    transaction.on_commit(_flush_pending)
@@ -0,0 +1,147 @@
+"""Detecta archivos subidos repetidos y los pasa al storage direccionado por contenido.
+
+    python manage.py dedupe_media [--borrar-huerfanos]   # solo informa
+    python manage.py dedupe_media --aplicar --yes [--borrar-huerfanos]
+
+Agrupa por SHA-256 los archivos que usan las filas (``ConArchivos``) y que aún
+no son blobs (los videos se quedan como están). Con ``--aplicar --yes`` copia
+cada uno a ``blobs/...`` (los iguales quedan en un solo archivo), actualiza las
+filas con ``update()`` y borra los originales. Antes lista todo lo que va a
+borrar; sin ``--yes`` se detiene ahí. ``--borrar-huerfanos`` borra además los archivos
+de ``MEDIA_ROOT`` que ninguna fila usa pero son copias exactas de uno que sí
+(``spx1_WuJYAnd.webp`` junto a ``spx1.webp``). Al final recalcula
+``Blob.referencias``.
+
+Las rendiciones no se tocan: se derivan de la imagen y su ``srcset`` guarda las
+URLs; ``generate_renditions --todas`` las vuelve a generar como blobs.
+"""
+
+from collections import defaultdict
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from proyectos.blobs import campos_archivo, modelos_con_archivos, recontar
+from proyectos.cache import bump_catalog_version
+from proyectos.edge import purge_keys
+from proyectos.models import Rendicion
+from proyectos.storage import PREFIJO, ContentAddressedStorage, direccionable, es_blob, hash_contenido
+
+
+class Command(BaseCommand):
+    help = 'Agrupa los archivos subidos idénticos y los pasa al storage direccionado por contenido.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--aplicar', action='store_true', help='mueve los archivos y actualiza las filas')
+        parser.add_argument('--yes', action='store_true', help='confirma --aplicar después de revisar la lista')
+        parser.add_argument(
+            '--borrar-huerfanos', action='store_true',
+            help='borra los archivos sin filas que son copia de uno usado (solo FileSystemStorage)',
+        )
+
+    def handle(self, *args, **options):
+        if options['aplicar'] and not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError('--aplicar requiere MEDIA_CONTENT_ADDRESSED=true.')
+
+        usos = self.referencias()
+        hashes, tamanos = {}, {}
+        for nombre in sorted(usos):
+            try:
+                with default_storage.open(nombre) as f:
+                    hashes[nombre] = hash_contenido(f)
+                tamanos[nombre] = default_storage.size(nombre)
+            except OSError:
+                self.stderr.write(f'No existe: {nombre}')
+
+        grupos = defaultdict(list)
+        for nombre, digest in hashes.items():
+            grupos[digest].append(nombre)
+        repetidos = {d: nombres for d, nombres in grupos.items() if len(nombres) > 1}
+        ahorro = sum(tamanos[nombre] for nombres in repetidos.values() for nombre in nombres[1:])
+        for digest, nombres in sorted(repetidos.items()):
+            self.stdout.write(f'{digest[:12]}: {", ".join(nombres)}')
+        self.stdout.write(
+            f'{len(hashes)} archivos en uso, {len(grupos)} distintos; '
+            f'{ahorro / 1024:.0f} KB repetidos.'
+        )
+
+        huerfanos = self.huerfanos(usos, set(grupos)) if options['borrar_huerfanos'] else []
+        for nombre in huerfanos:
+            self.stdout.write(f'Copia sin uso: {nombre}')
+
+        if not options['aplicar']:
+            if hashes or huerfanos:
+                self.stdout.write('Nada cambió; usa --aplicar --yes para mover los archivos.')
+            return
+
+        # Los originales se borran después de copiarlos a blobs/.
+        for nombre in sorted(hashes):
+            self.stdout.write(f'Se borrará: {nombre}')
+        for nombre in huerfanos:
+            self.stdout.write(f'Se borrará: {nombre}')
+        if not options['yes']:
+            raise CommandError('Nada cambió; revisa la lista y repite con --aplicar --yes.')
+
+        for nombre in hashes:
+            with default_storage.open(nombre) as f:
+                blob = default_storage.save(nombre, f)
+            for modelo, campo in usos[nombre]:
+                cambios = {campo: blob}
+                if campo == 'imagen' and hasattr(modelo, 'imagen_url'):
+                    cambios['imagen_url'] = default_storage.url(blob)
+                modelo.objects.filter(**{campo: nombre}).update(**cambios)
+            default_storage.delete(nombre)
+        for nombre in huerfanos:
+            default_storage.delete(nombre)
+
+        conteo = recontar()
+        bump_catalog_version()
+        purge_keys(['catalog', 'home', 'team'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Movidos {len(hashes)} archivos a {len(grupos)} blobs; '
+            f'{len(huerfanos)} copias sin uso borradas; {len(conteo)} blobs con referencias.'
+        ))
+
+    def referencias(self):
+        """{nombre: [(modelo, campo), ...]} de los archivos en uso que no son blobs."""
+        usos = defaultdict(list)
+        for modelo in modelos_con_archivos():
+            if modelo is Rendicion:
+                continue
+            for campo in campos_archivo(modelo):
+                nombres = (
+                    modelo.objects.exclude(**{f'{campo}__startswith': PREFIJO + '/'})
+                    .exclude(**{campo: ''}).exclude(**{f'{campo}__isnull': True})
+                    .values_list(campo, flat=True).distinct()
+                )
+                for nombre in nombres:
+                    if direccionable(nombre):
+                        usos[nombre].append((modelo, campo))
+        return usos
+
+    def huerfanos(self, usos, digests):
+        """Archivos de MEDIA_ROOT sin filas cuyo contenido es el de uno en uso."""
+        try:
+            default_storage.path('')
+        except NotImplementedError:
+            raise CommandError('--borrar-huerfanos solo funciona con FileSystemStorage.')
+
+        # Las rendiciones tampoco son huérfanas aunque no estén en ``usos``.
+        en_uso = set(usos) | set(Rendicion.objects.values_list('archivo', flat=True))
+        encontrados = []
+        pendientes = ['']
+        while pendientes:
+            carpeta = pendientes.pop()
+            directorios, archivos = default_storage.listdir(carpeta)
+            for directorio in directorios:
+                ruta = f'{carpeta}/{directorio}'.lstrip('/')
+                if ruta != PREFIJO:
+                    pendientes.append(ruta)
+            for archivo in archivos:
+                nombre = f'{carpeta}/{archivo}'.lstrip('/')
+                if nombre in en_uso or es_blob(nombre) or not direccionable(nombre):
+                    continue
+                with default_storage.open(nombre) as f:
+                    if hash_contenido(f) in digests:
+                        encontrados.append(nombre)
+        return sorted(encontrados)
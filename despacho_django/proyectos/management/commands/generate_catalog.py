@@ -0,0 +1,216 @@
+"""Catálogo sintético para pruebas de escala.
+
+    python manage.py generate_catalog --proyectos 100000 --imagenes 3 --contactos 5000 --seed 1
+
+Crea ``--proyectos`` filas de ``Proyecto`` con la distribución de categorías y
+subcategorías de ``proyectos.json``, ``--imagenes`` filas de ``ProyectoImagen``
+por proyecto y ``--contactos`` filas de ``Contacto``. Todo sale de
+``random.Random(--seed)``: la misma semilla da el mismo catálogo, sin importar
+``--batch-size``.
+
+Los archivos de imagen no existen: solo las rutas (``proyectos/generados/...``)
+y su ``imagen_url``. Las fechas se reparten en los ``--anios`` años anteriores
+a ``--hasta`` para que el orden por fecha no sea el mismo que por id; como
+``--hasta`` es una fecha fija, también las fechas dependen solo de la semilla.
+"""
+
+import argparse
+import random
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from proyectos.cache import bump_catalog_version
+from proyectos.edge import purge_keys
+from proyectos.models import Contacto, Proyecto, ProyectoImagen, Rendicion, url_imagen
+
+# (categoria, subcategoria, peso): conteos de proyectos.json, con sus mismas
+# variantes de escritura (los slugs las unifican).
+DISTRIBUCION = (
+    ('Residencial', 'interes alto', 14),
+    ('Residencial', 'interiorismo', 9),
+    ('Comercial', 'clinicas', 6),
+    ('Comercial', 'tiendas', 3),
+    ('Comercial', 'oficinas', 3),
+    ('Residencial', 'Multifamiliar', 3),
+    ('Residencial', 'paisajismo', 3),
+    ('Comercial', 'bodegas', 2),
+    ('Comercial', 'restaurantes', 1),
+    ('Residencial', 'Interes social', 1),
+)
+
+TIPOS = {
+    'interes alto': ('Casa', 'Residencia', 'Villa'),
+    'interiorismo': ('Interiorismo', 'Departamento', 'Estudio'),
+    'clinicas': ('Clínica', 'Consultorio', 'Hospital'),
+    'tiendas': ('Tienda', 'Boutique', 'Local'),
+    'oficinas': ('Oficinas', 'Corporativo', 'Coworking'),
+    'Multifamiliar': ('Edificio', 'Torre', 'Conjunto'),
+    'paisajismo': ('Jardín', 'Terraza', 'Patio'),
+    'bodegas': ('Bodega', 'Nave', 'Almacén'),
+    'restaurantes': ('Restaurante', 'Café', 'Bar'),
+    'Interes social': ('Vivienda', 'Casa', 'Conjunto'),
+}
+
+LUGARES = (
+    'Xochimilco', 'Coyoacán', 'Polanco', 'Roma', 'Condesa', 'Tlalpan', 'Del Valle',
+    'Narvarte', 'Santa Fe', 'San Ángel', 'Azcapotzalco', 'Iztapalapa', 'Lomas', 'Satélite',
+)
+
+FRASES = (
+    'Proyecto de {tipo} en {lugar}.',
+    'Diseño arquitectónico con iluminación natural y ventilación cruzada.',
+    'Se integraron terrazas y áreas verdes al programa.',
+    'Acabados en concreto aparente, madera y piedra volcánica.',
+    'Remodelación integral con redistribución de espacios.',
+    'Construcción en dos niveles con estructura de acero.',
+    'Fachada con celosías para controlar el asoleamiento.',
+    'Instalaciones eficientes y captación de agua pluvial.',
+)
+
+NOMBRES = ('Ana', 'Luis', 'María', 'José', 'Sofía', 'Carlos', 'Lucía', 'Miguel', 'Elena', 'Jorge')
+DOMINIOS = ('gmail.com', 'outlook.com', 'hotmail.com', 'yahoo.com', 'icloud.com')
+
+
+def fecha_iso(valor):
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'fecha inválida: {valor!r} (formato AAAA-MM-DD)')
+
+
+@contextmanager
+def fechas_explicitas(*campos):
+    """Desactiva ``auto_now_add`` para poder fijar las fechas en ``bulk_create``."""
+
+    originales = [(campo, campo.auto_now_add) for campo in campos]
+    for campo, _ in originales:
+        campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, valor in originales:
+            campo.auto_now_add = valor
+
+
+class Command(BaseCommand):
+    help = 'Genera un catálogo sintético (proyectos, imágenes y contactos) para pruebas de escala.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--proyectos', type=int, default=1000)
+        parser.add_argument('--imagenes', type=int, default=1, help='imágenes por proyecto')
+        parser.add_argument('--contactos', type=int, default=0)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--anios', type=int, default=5, help='antigüedad máxima de las fechas')
+        parser.add_argument(
+            '--hasta', type=fecha_iso, default='2026-01-01',
+            help='fecha más reciente (AAAA-MM-DD, medianoche UTC)',
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument(
+            '--reemplazar', action='store_true',
+            help='borra antes todos los proyectos, imágenes y contactos',
+        )
+
+    def handle(self, *args, **options):
+        for opcion in ('proyectos', 'imagenes', 'contactos'):
+            if options[opcion] < 0:
+                raise CommandError(f'--{opcion} no puede ser negativo.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size debe ser mayor que 0.')
+        if options['imagenes'] and not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError(
+                f'{connection.vendor} no devuelve los ids de bulk_create; no se pueden ligar las imágenes.'
+            )
+
+        rng = random.Random(options['seed'])
+        self.hasta = datetime.combine(options['hasta'], time.min, tzinfo=dt_timezone.utc)
+        self.rango = int(timedelta(days=365 * options['anios']).total_seconds())
+        self.pesos = [peso for _, _, peso in DISTRIBUCION]
+
+        if options['reemplazar']:
+            self.borrar()
+
+        with fechas_explicitas(
+            Proyecto._meta.get_field('fecha_creacion'),
+            ProyectoImagen._meta.get_field('creado'),
+            Contacto._meta.get_field('fecha_envio'),
+        ):
+            self.crear_proyectos(rng, options['proyectos'], options['imagenes'], options['batch_size'])
+            self.crear_contactos(rng, options['contactos'], options['batch_size'])
+
+        # bulk_create no pasa por save() ni por las señales.
+        bump_catalog_version()
+        purge_keys(['catalog'])
+
+    def borrar(self):
+        # DELETE directo en SQL: delete() cargaría cada fila para mandar las
+        # señales post_delete, inviable con un millón de proyectos. El cache y
+        # el CDN se invalidan una vez al final de handle(); los archivos de
+        # rendiciones o blobs, si los hubiera, quedan en el storage (los
+        # proyectos generados no tienen). Sin cascada en la base: primero lo
+        # que apunta a proyectos e imágenes.
+        with connection.cursor() as cursor:
+            for modelo in (Rendicion, ProyectoImagen, Proyecto, Contacto):
+                cursor.execute(f'DELETE FROM {connection.ops.quote_name(modelo._meta.db_table)}')
+                self.stdout.write(f'Eliminados {cursor.rowcount} {modelo._meta.label}.')
+
+    def fecha(self, rng):
+        return self.hasta - timedelta(seconds=rng.randrange(self.rango or 1))
+
+    def proyecto(self, rng, i, imagenes):
+        categoria, subcategoria, _ = rng.choices(DISTRIBUCION, weights=self.pesos)[0]
+        tipo = rng.choice(TIPOS[subcategoria])
+        lugar = rng.choice(LUGARES)
+        frases = [FRASES[0]] + rng.sample(FRASES[1:], rng.randint(1, 3))
+        p = Proyecto(
+            nombre=f'{tipo} {lugar} {i + 1}',
+            descripcion=' '.join(frases).format(tipo=tipo.lower(), lugar=lugar),
+            categoria=categoria,
+            subcategoria=subcategoria,
+            imagen=f'proyectos/generados/{i + 1:07d}_0.webp' if imagenes else None,
+            fecha_creacion=self.fecha(rng),
+        )
+        p.actualizar_slugs()
+        p.imagen_url = url_imagen(p.imagen)
+        return p
+
+    def crear_proyectos(self, rng, n, imagenes, batch_size):
+        creados = 0
+        for inicio in range(0, n, batch_size):
+            lote = [self.proyecto(rng, i, imagenes) for i in range(inicio, min(n, inicio + batch_size))]
+            with transaction.atomic():
+                Proyecto.objects.bulk_create(lote, batch_size=batch_size)
+                galerias = []
+                for i, p in enumerate(lote, start=inicio + 1):
+                    for orden in range(imagenes):
+                        imagen = ProyectoImagen(
+                            proyecto=p,
+                            imagen=f'proyectos/generados/{i:07d}_{orden}.webp',
+                            orden=orden,
+                            creado=p.fecha_creacion,
+                        )
+                        imagen.imagen_url = url_imagen(imagen.imagen)
+                        galerias.append(imagen)
+                ProyectoImagen.objects.bulk_create(galerias, batch_size=batch_size)
+            creados += len(lote)
+            self.stdout.write(f'Proyectos: {creados}/{n}')
+        self.stdout.write(self.style.SUCCESS(f'Creados {creados} proyectos con {creados * imagenes} imágenes.'))
+
+    def crear_contactos(self, rng, n, batch_size):
+        for inicio in range(0, n, batch_size):
+            lote = []
+            for i in range(inicio, min(n, inicio + batch_size)):
+                nombre = rng.choice(NOMBRES)
+                lote.append(Contacto(
+                    nombre=nombre,
+                    email=f'{nombre.lower()}.{i + 1}@{rng.choice(DOMINIOS)}',
+                    mensaje='Me interesa cotizar un proyecto similar.',
+                    proyecto='' if rng.random() < 0.5 else rng.choice(LUGARES),
+                    fecha_envio=self.fecha(rng),
+                ))
+            Contacto.objects.bulk_create(lote, batch_size=batch_size)
+        if n:
+            self.stdout.write(self.style.SUCCESS(f'Creados {n} contactos.'))
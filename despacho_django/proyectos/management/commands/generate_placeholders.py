@@ -0,0 +1,45 @@
+"""Guarda medidas, color dominante y LQIP de las imágenes que aún no los tienen.
+
+    python manage.py generate_placeholders [--todas]
+
+Las imágenes nuevas los calculan al guardarse (ver proyectos/renditions.py);
+esto cubre las subidas antes de existir esos campos y las creadas con
+``bulk_create``. Solo lee cada archivo: no sube nada (las versiones reducidas
+las genera ``generate_renditions``).
+"""
+
+from django.core.management.base import BaseCommand
+
+from proyectos.cache import bump_catalog_version
+from proyectos.edge import purge_keys
+from proyectos.models import Proyecto, ProyectoImagen
+from proyectos.renditions import procesar_imagen
+
+
+class Command(BaseCommand):
+    help = 'Calcula medidas, color dominante y LQIP de las imágenes del catálogo que no los tienen.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todas', action='store_true', help='recalcula también las que ya tienen')
+
+    def handle(self, *args, **options):
+        total = 0
+        for modelo in (ProyectoImagen, Proyecto):
+            qs = modelo.objects.exclude(imagen='').exclude(imagen__isnull=True).only('id', 'imagen')
+            if not options['todas']:
+                qs = qs.filter(imagen_ancho__isnull=True)
+            for obj in qs.iterator(chunk_size=100):
+                metadatos, _ = procesar_imagen(obj.imagen, rendiciones=False)
+                if not metadatos:
+                    continue
+                modelo.objects.filter(pk=obj.pk).update(**metadatos)
+                total += 1
+                self.stdout.write(
+                    f'{modelo._meta.label} {obj.pk}: '
+                    f'{metadatos["imagen_ancho"]}x{metadatos["imagen_alto"]} {metadatos["imagen_color"]}'
+                )
+
+        if total:
+            bump_catalog_version()
+            purge_keys(['catalog'])
+        self.stdout.write(self.style.SUCCESS(f'Imágenes procesadas: {total}.'))
@@ -0,0 +1,49 @@
+"""Genera las versiones reducidas de las imágenes que aún no las tienen.
+
+    python manage.py generate_renditions [--todas]
+
+Las imágenes nuevas las generan al guardarse (ver proyectos/renditions.py);
+esto cubre las subidas antes de existir el pipeline, las creadas con
+``bulk_create`` y las que fallaron. ``--todas`` las regenera todas (p. ej.
+después de cambiar ``IMAGE_RENDITION_WIDTHS``). De paso actualiza medidas,
+color y LQIP; para solo esos está ``generate_placeholders``.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from proyectos.cache import bump_catalog_version
+from proyectos.edge import purge_keys
+from proyectos.models import Proyecto, ProyectoImagen
+from proyectos.renditions import formatos_disponibles, guardar_rendiciones, procesar_imagen, srcset_de
+
+
+class Command(BaseCommand):
+    help = 'Genera las versiones WebP/AVIF de las imágenes del catálogo que no las tienen.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todas', action='store_true', help='regenera también las que ya tienen')
+
+    def handle(self, *args, **options):
+        if not formatos_disponibles():
+            raise CommandError('Pillow no soporta ninguno de IMAGE_RENDITION_FORMATS.')
+
+        total = 0
+        for modelo in (ProyectoImagen, Proyecto):
+            qs = modelo.objects.exclude(imagen='').exclude(imagen__isnull=True).only('id', 'imagen')
+            if not options['todas']:
+                qs = qs.filter(imagen_srcset={})
+            for obj in qs.iterator(chunk_size=100):
+                metadatos, rendiciones = procesar_imagen(obj.imagen)
+                if not rendiciones:
+                    continue
+                # update(): sin save() no se vuelve a subir nada ni se disparan
+                # las señales por cada imagen; se invalida una vez al final.
+                modelo.objects.filter(pk=obj.pk).update(imagen_srcset=srcset_de(rendiciones), **metadatos)
+                guardar_rendiciones(obj, rendiciones)
+                total += 1
+                self.stdout.write(f'{modelo._meta.label} {obj.pk}: {len(rendiciones)} rendiciones')
+
+        if total:
+            bump_catalog_version()
+            purge_keys(['catalog'])
+        self.stdout.write(self.style.SUCCESS(f'Imágenes procesadas: {total}.'))
@@ -0,0 +1,144 @@
+"""Métricas en formato Prometheus, expuestas en ``/metrics``.
+
+- ``http_request_duration_seconds`` (histograma) y ``http_requests_total`` por
+  ruta (el patrón de la URL, no la URL concreta), método y status.
+- ``db_queries_total`` / ``db_query_duration_seconds_total`` por ruta, con los
+  contadores de ``proyectos/timing.py``.
+- ``cache_requests_total`` por espacio del cache del catálogo y resultado
+  (hit/miss).
+- ``sendgrid_send_duration_seconds`` (histograma) por mensaje y resultado.
+
+Las peticiones las registra ``ServerTimingMiddleware``.
+
+Gunicorn corre varios workers (``WEB_CONCURRENCY``), cada uno con sus propios
+contadores. Con ``PROMETHEUS_MULTIPROC_DIR`` definido (``railway_start.py`` lo
+hace) ``prometheus_client`` guarda los valores en archivos mapeados en memoria,
+uno por worker, y ``/metrics`` los suma al exponerlos. La variable tiene que
+existir antes de importar ``prometheus_client``.
+
+``prometheus_client`` es opcional: sin él todo esto es un no-op y ``/metrics``
+responde 503.
+"""
+
+from __future__ import annotations
+
+import hmac
+import os
+from contextlib import contextmanager
+from time import perf_counter
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.cache import never_cache
+
+from .encoders import JsonResponse
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        CollectorRegistry,
+        Counter,
+        Histogram,
+        generate_latest,
+        multiprocess,
+    )
+except ImportError:  # pragma: no cover - dependencia opcional
+    Counter = None
+
+UNMATCHED_ROUTE = '<unmatched>'
+
+if Counter is not None:
+    REQUEST_LATENCY = Histogram(
+        'http_request_duration_seconds',
+        'Duración de la petición (desde ServerTimingMiddleware hacia adentro).',
+        ['route', 'method'],
+    )
+    REQUESTS = Counter(
+        'http_requests_total',
+        'Peticiones atendidas.',
+        ['route', 'method', 'status'],
+    )
+    DB_QUERIES = Counter(
+        'db_queries_total',
+        'Consultas SQL ejecutadas.',
+        ['route'],
+    )
+    DB_TIME = Counter(
+        'db_query_duration_seconds_total',
+        'Tiempo total en consultas SQL.',
+        ['route'],
+    )
+    CACHE_REQUESTS = Counter(
+        'cache_requests_total',
+        'Lecturas del cache del catálogo.',
+        ['namespace', 'result'],
+    )
+    SENDGRID_LATENCY = Histogram(
+        'sendgrid_send_duration_seconds',
+        'Duración de cada envío a SendGrid.',
+        ['message', 'outcome'],
+        buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+    )
+
+
+def observe_request(route, method, status, seconds, queries, db_seconds) -> None:
+    if Counter is None:
+        return
+    REQUEST_LATENCY.labels(route, method).observe(seconds)
+    REQUESTS.labels(route, method, str(status)).inc()
+    if queries:
+        DB_QUERIES.labels(route).inc(queries)
+        DB_TIME.labels(route).inc(db_seconds)
+
+
+def record_cache(namespace: str, hit: bool) -> None:
+    if Counter is None:
+        return
+    CACHE_REQUESTS.labels(namespace, 'hit' if hit else 'miss').inc()
+
+
+@contextmanager
+def track_sendgrid(message: str):
+    """Mide un ``sg.send(...)``; ``outcome`` es ``error`` si lanza."""
+
+    start = perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        if Counter is not None:
+            SENDGRID_LATENCY.labels(message, outcome).observe(perf_counter() - start)
+
+
+def _registry():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def _authorized(request) -> bool:
+    token = settings.METRICS_TOKEN
+    if not token:
+        # Sin token solo en desarrollo.
+        return settings.DEBUG
+    header = request.headers.get('Authorization', '')
+    scheme, _, value = header.partition(' ')
+    # En bytes: con str, compare_digest lanza TypeError si hay caracteres no ASCII.
+    return scheme.lower() == 'bearer' and hmac.compare_digest(value.strip().encode(), token.encode())
+
+
+@never_cache
+def metrics_view(request):
+    """Texto de exposición de Prometheus; requiere ``Authorization: Bearer <METRICS_TOKEN>``."""
+
+    if not _authorized(request):
+        response = JsonResponse({'ok': False, 'error': 'No autorizado.'}, status=401)
+        response.headers['WWW-Authenticate'] = 'Bearer'
+        return response
+    if Counter is None:
+        return JsonResponse({'ok': False, 'error': 'prometheus_client no está instalado.'}, status=503)
+    return HttpResponse(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
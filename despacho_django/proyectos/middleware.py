@@ -0,0 +1,238 @@
+import hashlib
+import logging
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+from . import metrics
+from .compression import SUPPORTED_ENCODINGS, compress, negotiate_encoding
+from .timing import end_request, start_request
+
+timing_logger = logging.getLogger('proyectos.timing')
+
+_COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+
+
+def _is_compressible(response) -> bool:
+    content_type = (response.get('Content-Type') or '').split(';', 1)[0].strip().lower()
+    return (
+        content_type.startswith('text/')
+        or content_type in _COMPRESSIBLE_TYPES
+        or content_type.endswith(('+json', '+xml'))
+    )
+
+
+def _is_shared_cacheable(response) -> bool:
+    """True si el cuerpo es el mismo para cualquier visitante.
+
+    Respuestas con cookies (p. ej. el token CSRF de contacto.html) son por
+    usuario: no se guardan en cache y se comprimen con el relleno aleatorio de
+    Django contra BREACH, igual que ``GZipMiddleware``.
+    """
+    cache_control = (response.get('Cache-Control') or '').lower()
+    vary = (response.get('Vary') or '').lower()
+    return (
+        response.status_code == 200
+        and not response.cookies
+        and 'cookie' not in vary
+        and 'private' not in cache_control
+        and 'no-store' not in cache_control
+    )
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Comprime respuestas dinámicas (JSON de la API y páginas HTML) con br o gzip.
+
+    WhiteNoise ya sirve los estáticos precomprimidos; esto cubre lo que generan
+    las vistas. Las variantes comprimidas de respuestas compartibles se guardan
+    por hash del contenido en el cache ``compressed`` (uno propio, para no
+    competir con el del catálogo), así que el mismo payload no se vuelve a
+    comprimir en cada petición. Sin ese alias en ``CACHES`` se comprime siempre.
+    """
+
+    cache_alias = 'compressed'
+
+    max_random_bytes = 100
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_length = getattr(settings, 'COMPRESSION_MIN_LENGTH', 1024)
+
+    def process_response(self, request, response):
+        # Ya comprimida (p. ej. el snapshot del catálogo) o binaria.
+        if response.has_header('Content-Encoding') or not _is_compressible(response):
+            return response
+        if not response.streaming and len(response.content) < self.min_length:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+
+        if response.streaming:
+            encoding = negotiate_encoding(accept_encoding, ('gzip',))
+            if not encoding:
+                return response
+            if response.is_async:
+                original_iterator = response.streaming_content
+
+                async def gzip_wrapper():
+                    async for chunk in original_iterator:
+                        yield compress_string(chunk, max_random_bytes=self.max_random_bytes)
+
+                response.streaming_content = gzip_wrapper()
+            else:
+                response.streaming_content = compress_sequence(
+                    response.streaming_content,
+                    max_random_bytes=self.max_random_bytes,
+                )
+            del response.headers['Content-Length']
+        else:
+            shared = _is_shared_cacheable(response)
+            encoding = negotiate_encoding(accept_encoding, SUPPORTED_ENCODINGS if shared else ('gzip',))
+            if not encoding:
+                return response
+            if shared:
+                compressed = self._cached_compress(response.content, encoding)
+            else:
+                compressed = compress_string(response.content, max_random_bytes=self.max_random_bytes)
+            # Devolver lo comprimido solo si realmente es más corto.
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(response.content))
+
+        # Un ETag fuerte deja de serlo al cambiar la codificación (RFC 9110 8.8.1).
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _cached_compress(self, body: bytes, encoding: str) -> bytes:
+        if self.cache_alias not in settings.CACHES:
+            return compress(body, encoding)
+        cache = caches[self.cache_alias]
+        digest = hashlib.blake2b(body, digest_size=20).hexdigest()
+        key = f'proyectos:compressed:{encoding}:{digest}'
+        compressed = cache.get(key)
+        metrics.record_cache('compressed', compressed is not None)
+        if compressed is None:
+            compressed = compress(body, encoding)
+            cache.set(key, compressed)
+        return compressed
+
+
+def query_budget(n):
+    """Cambia el presupuesto de consultas de una vista (ver ``ServerTimingMiddleware``)."""
+
+    def decorator(view):
+        view.query_budget = n
+        return view
+
+    return decorator
+
+
+class ServerTimingMiddleware:
+    """Cabecera ``Server-Timing`` y una línea de log por petición.
+
+    Mide consultas (número y tiempo), render de plantillas y el total de la
+    petición desde aquí hacia adentro (ver ``proyectos/timing.py``) y los
+    publica también en ``/metrics`` (``proyectos/metrics.py``). Cuesta dos
+    ``perf_counter`` por consulta y por plantilla, así que queda activo en
+    producción; la cabecera, que deja ver cuántas consultas hace cada vista,
+    solo sale con ``SERVER_TIMING_HEADER`` (por defecto, ``DEBUG``).
+
+    Si una vista hace más consultas que ``SERVER_TIMING_QUERY_BUDGET`` (o que
+    su ``@query_budget(n)``) se registra un warning: un N+1 como iterar
+    ``p.imagenes.all()`` sin prefetch aparece en cuanto crece el catálogo. El
+    admin no tiene presupuesto.
+
+    En respuestas streaming solo cuenta hasta que se envían las cabeceras.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.send_header = getattr(settings, 'SERVER_TIMING_HEADER', settings.DEBUG)
+        self.query_budget = getattr(settings, 'SERVER_TIMING_QUERY_BUDGET', 10)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timings, token = start_request()
+        start = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self._report(request, response, timings, perf_counter() - start)
+
+    async def __acall__(self, request):
+        timings, token = start_request()
+        start = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self._report(request, response, timings, perf_counter() - start)
+
+    def _budget_for(self, request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return self.query_budget
+        if match.namespace == 'admin':
+            return None
+        return getattr(match.func, 'query_budget', self.query_budget)
+
+    def _report(self, request, response, timings, total):
+        if self.send_header:
+            response.headers['Server-Timing'] = (
+                f'db;dur={timings.db * 1000:.1f};desc="{timings.queries} queries", '
+                f'tpl;dur={timings.template_time * 1000:.1f}, '
+                f'total;dur={total * 1000:.1f}'
+            )
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else '-'
+        metrics.observe_request(
+            match.route if match else metrics.UNMATCHED_ROUTE,
+            request.method,
+            response.status_code,
+            total,
+            timings.queries,
+            timings.db,
+        )
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'view': view,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 1),
+            'db_ms': round(timings.db * 1000, 1),
+            'queries': timings.queries,
+            'tpl_ms': round(timings.template_time * 1000, 1),
+        }
+        timing_logger.info(' '.join(f'{k}={v}' for k, v in fields.items()), extra={'timing': fields})
+
+        budget = self._budget_for(request)
+        if budget is not None and timings.queries > budget:
+            timing_logger.warning(
+                'Presupuesto de consultas excedido: view=%s path=%s queries=%d budget=%d',
+                view, request.path, timings.queries, budget,
+            )
+        return response
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-18 06:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectos', '0004_homepageconfig'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='proyecto',
+            index=models.Index(fields=['-fecha_creacion', '-id'], name='proyecto_fecha_id_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# Índice GIN para la búsqueda de texto completo (ver proyectos/search.py).
+# Solo aplica en PostgreSQL; en SQLite la búsqueda usa una tabla FTS5 que se
+# crea en post_migrate. La expresión debe coincidir exactamente con la que usa
+# proyectos.search._search_postgres.
+SEARCH_FIELDS = ('nombre', 'descripcion', 'categoria', 'subcategoria')
+SEARCH_CONFIG = 'spanish'
+INDEX_NAME = 'proyecto_search_gin'
+
+
+def _search_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    return GinIndex(SearchVector(*SEARCH_FIELDS, config=SEARCH_CONFIG), name=INDEX_NAME)
+
+
+def crear_indice(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Proyecto = apps.get_model('proyectos', 'Proyecto')
+    schema_editor.add_index(Proyecto, _search_index())
+
+
+def borrar_indice(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Proyecto = apps.get_model('proyectos', 'Proyecto')
+    schema_editor.remove_index(Proyecto, _search_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectos', '0005_proyecto_fecha_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, borrar_indice),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-18 06:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectos', '0006_proyecto_search_gin'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proyecto',
+            name='categoria_slug',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='subcategoria_slug',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='proyecto',
+            index=models.Index(fields=['categoria_slug', '-fecha_creacion', '-id'], name='proyecto_cat_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proyecto',
+            index=models.Index(fields=['subcategoria_slug', '-fecha_creacion', '-id'], name='proyecto_sub_fecha_idx'),
+        ),
+    ]
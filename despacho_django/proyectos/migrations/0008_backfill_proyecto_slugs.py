@@ -0,0 +1,36 @@
+import unicodedata
+
+from django.db import migrations
+
+
+def _slug_etiqueta(valor):
+    # Copia congelada de proyectos.models.slug_etiqueta (las migraciones no
+    # deben depender del código actual de la app).
+    decomposed = unicodedata.normalize('NFD', str(valor or ''))
+    sin_acentos = ''.join(ch for ch in decomposed if not '\u0300' <= ch <= '\u036f')
+    return '-'.join(sin_acentos.split()).lower()
+
+
+def rellenar_slugs(apps, schema_editor):
+    Proyecto = apps.get_model('proyectos', 'Proyecto')
+    pendientes = []
+    for p in Proyecto.objects.only('id', 'categoria', 'subcategoria').iterator(chunk_size=1000):
+        p.categoria_slug = _slug_etiqueta(p.categoria)
+        p.subcategoria_slug = _slug_etiqueta(p.subcategoria)
+        pendientes.append(p)
+        if len(pendientes) >= 1000:
+            Proyecto.objects.bulk_update(pendientes, ['categoria_slug', 'subcategoria_slug'])
+            pendientes = []
+    if pendientes:
+        Proyecto.objects.bulk_update(pendientes, ['categoria_slug', 'subcategoria_slug'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectos', '0007_proyecto_slugs'),
+    ]
+
+    operations = [
+        migrations.RunPython(rellenar_slugs, migrations.RunPython.noop),
+    ]
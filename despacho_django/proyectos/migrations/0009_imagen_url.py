@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-18 06:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectos', '0008_backfill_proyecto_slugs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proyecto',
+            name='imagen_url',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='proyectoimagen',
+            name='imagen_url',
+            field=models.CharField(blank=True, default='', editable=False, max_length=500),
+        ),
+    ]
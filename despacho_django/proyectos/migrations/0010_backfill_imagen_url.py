@@ -0,0 +1,31 @@
+from django.db import migrations
+
+
+def _rellenar(model, lote=500):
+    pendientes = []
+    for obj in model.objects.exclude(imagen='').exclude(imagen__isnull=True).only('id', 'imagen').iterator(chunk_size=lote):
+        obj.imagen_url = obj.imagen.url
+        pendientes.append(obj)
+        if len(pendientes) >= lote:
+            model.objects.bulk_update(pendientes, ['imagen_url'])
+            pendientes = []
+    if pendientes:
+        model.objects.bulk_update(pendientes, ['imagen_url'])
+
+
+def rellenar_imagen_url(apps, schema_editor):
+    # Las filas que queden vacías (p. ej. si el storage no responde) se
+    # resuelven igual en la API con imagen.url.
+    _rellenar(apps.get_model('proyectos', 'Proyecto'))
+    _rellenar(apps.get_model('proyectos', 'ProyectoImagen'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectos', '0009_imagen_url'),
+    ]
+
+    operations = [
+        migrations.RunPython(rellenar_imagen_url, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.9 on 2026-10-18 07:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectos', '0010_backfill_imagen_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proyecto',
+            name='imagen_srcset',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='proyectoimagen',
+            name='imagen_srcset',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.CreateModel(
+            name='Rendicion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origen', models.CharField(max_length=255)),
+                ('formato', models.CharField(choices=[('avif', 'AVIF'), ('webp', 'WebP')], max_length=10)),
+                ('ancho', models.PositiveIntegerField()),
+                ('alto', models.PositiveIntegerField()),
+                ('bytes', models.PositiveIntegerField()),
+                ('archivo', models.FileField(max_length=255, upload_to='proyectos/rendiciones/')),
+                ('url', models.CharField(editable=False, max_length=500)),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('proyecto', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rendiciones', to='proyectos.proyecto')),
+                ('proyecto_imagen', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rendiciones', to='proyectos.proyectoimagen')),
+            ],
+            options={
+                'verbose_name_plural': 'rendiciones',
+                'ordering': ['formato', 'ancho'],
+                'constraints': [models.CheckConstraint(condition=models.Q(models.Q(('proyecto__isnull', False), ('proyecto_imagen__isnull', True)), models.Q(('proyecto__isnull', True), ('proyecto_imagen__isnull', False)), _connector='OR'), name='rendicion_un_dueno')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.9 on 2026-10-18 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectos', '0011_rendiciones'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proyecto',
+            name='imagen_alto',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='imagen_ancho',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='imagen_color',
+            field=models.CharField(blank=True, default='', editable=False, max_length=7),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='imagen_lqip',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='proyectoimagen',
+            name='imagen_alto',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='proyectoimagen',
+            name='imagen_ancho',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='proyectoimagen',
+            name='imagen_color',
+            field=models.CharField(blank=True, default='', editable=False, max_length=7),
+        ),
+        migrations.AddField(
+            model_name='proyectoimagen',
+            name='imagen_lqip',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.9 on 2026-10-18 07:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectos', '0012_imagen_metadatos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=255, unique=True)),
+                ('referencias', models.PositiveIntegerField(default=0)),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,56 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+# Copia congelada del índice de proyectos.search (las migraciones no deben
+# depender del código actual de la app). Tiene que describir el mismo índice
+# que ``Proyecto.Meta.indexes`` para que makemigrations no vea cambios.
+SEARCH_FIELDS = ('nombre', 'descripcion', 'categoria', 'subcategoria')
+SEARCH_CONFIG = 'spanish'
+INDEX_NAME = 'proyecto_search_gin'
+
+
+class SearchIndex(GinIndex):
+    """``GinIndex`` que solo emite SQL en PostgreSQL.
+
+    SQLite reconstruye la tabla de proyectos con los índices del estado; ahí
+    no hay ``tsvector`` y el índice no se crea.
+    """
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor != 'postgresql':
+            return ''
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
+
+    def remove_sql(self, model, schema_editor, **kwargs):
+        if schema_editor.connection.vendor != 'postgresql':
+            return ''
+        return super().remove_sql(model, schema_editor, **kwargs)
+
+    def __eq__(self, other):
+        # La clase del modelo es otra (proyectos.search.SearchIndex): se
+        # compara lo que describe el índice, no la ruta de la clase.
+        if isinstance(other, GinIndex):
+            return self.deconstruct()[1:] == other.deconstruct()[1:]
+        return NotImplemented
+
+
+# El índice GIN ya lo crea 0006 (solo en PostgreSQL). Aquí se registra en el
+# estado de las migraciones para que coincida con ``Proyecto.Meta.indexes``
+# sin volver a crearlo.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proyectos', '0013_blobs'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='proyecto',
+                    index=SearchIndex(SearchVector(*SEARCH_FIELDS, config=SEARCH_CONFIG), name=INDEX_NAME),
+                ),
+            ],
+        ),
+    ]
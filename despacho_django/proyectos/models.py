@@ -1,7 +1,72 @@
-from django.db import models
+import unicodedata
 
+from django.db import models, router, transaction
 
-class HomePageConfig(models.Model):
+from .search import search_index
+
+
+def url_imagen(field) -> str:
+    """URL pública de un ImageField, subiendo el archivo si aún no está en el storage.
+
+    Con Cloudinary cada ``.url`` se genera en el momento; se calcula una sola vez
+    al guardar y se persiste junto al modelo (``imagen_url``). Para
+    FileSystemStorage queda relativa al host (``/media/...``).
+    """
+    if not field:
+        return ''
+    if not field._committed:
+        # Lo mismo que haría FileField.pre_save, pero antes: el storage puede
+        # renombrar el archivo y la URL tiene que ser la del nombre final.
+        field.save(field.name, field.file, save=False)
+    return field.url
+
+
+def slug_etiqueta(valor) -> str:
+    """Normaliza una categoría/subcategoría igual que ``normalizeString`` de proyectos.js.
+
+    Quita acentos, colapsa espacios, pasa a minúsculas y une con guiones:
+    ``'Interés  Medio'`` -> ``'interes-medio'``.
+    """
+    decomposed = unicodedata.normalize('NFD', str(valor or ''))
+    sin_acentos = ''.join(ch for ch in decomposed if not '\u0300' <= ch <= '\u036f')
+    return '-'.join(sin_acentos.split()).lower()
+
+
+class ConArchivos:
+    """Recuerda los nombres de archivo leídos de la base.
+
+    Con eso ``proyectos.blobs`` sabe, al guardar, qué archivo dejó de usar la
+    fila y cuál empezó a usar, sin volver a consultarla.
+    """
+
+    # {attname: nombre} de los FileField cargados; None si la fila no vino de la base.
+    _archivos_origen = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._archivos_origen = {
+            field.attname: getattr(instance, field.attname).name or ''
+            for field in cls._meta.concrete_fields
+            if isinstance(field, models.FileField) and field.attname in field_names
+        }
+        return instance
+
+    def _archivo_origen(self, campo):
+        """Nombre de ``campo`` en la base; None si no se sabe (no se cargó)."""
+        return (self._archivos_origen or {}).get(campo)
+
+    def _marcar_archivos(self, campos=None):
+        """Toma los nombres actuales como los de la base (después de guardar)."""
+        origen = dict(self._archivos_origen or {})
+        for field in self._meta.concrete_fields:
+            if isinstance(field, models.FileField) and (campos is None or field.attname in campos):
+                if field.attname not in self.get_deferred_fields():
+                    origen[field.attname] = getattr(self, field.attname).name or ''
+        self._archivos_origen = origen
+
+
+class HomePageConfig(ConArchivos, models.Model):
     """Configuración de la página de inicio (contenido global).
 
     Por ahora solo incluye el video de la promo (Carcon).
@@ -56,19 +121,121 @@ class HomePageConfig(models.Model):
         return self._youtube_embed(self.carcon_video_url)
 
 
-class Proyecto(models.Model):
+class ConRendiciones(ConArchivos, models.Model):
+    """Columnas derivadas de ``imagen`` y su cálculo al guardar (ver proyectos/renditions.py).
+
+    Genera las versiones reducidas y guarda medidas, color dominante y LQIP.
+    Solo cuando el archivo cambia: editar el nombre de un proyecto no vuelve a
+    procesar su imagen. El modelo concreto declara ``imagen`` y la relación
+    ``rendiciones``.
+    """
+
+    # URL precalculada de ``imagen`` (ver url_imagen).
+    imagen_url = models.CharField(max_length=500, blank=True, default='', editable=False)
+    # {formato: [[url, ancho], ...]} de las versiones reducidas.
+    imagen_srcset = models.JSONField(default=dict, blank=True, editable=False)
+    # Medidas del original, color dominante (#rrggbb) y LQIP en data URI: el
+    # frontend reserva el espacio y pinta antes de cargar la imagen.
+    imagen_ancho = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    imagen_alto = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    imagen_color = models.CharField(max_length=7, blank=True, default='', editable=False)
+    imagen_lqip = models.TextField(blank=True, default='', editable=False)
+
+    # Columnas derivadas de ``imagen``; van con ella en ``update_fields``.
+    CAMPOS_IMAGEN = (
+        'imagen_url', 'imagen_srcset', 'imagen_ancho', 'imagen_alto', 'imagen_color', 'imagen_lqip',
+    )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.imagen_url = url_imagen(self.imagen)
+        rendiciones = self._preparar_rendiciones()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'imagen' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | set(self.CAMPOS_IMAGEN)
+        if not rendiciones:
+            super().save(*args, **kwargs)
+            self._guardar_rendiciones(rendiciones)
+            return
+
+        # Las versiones ya están subidas: si la fila o sus ``Rendicion`` no se
+        # guardan, se borran para no dejar archivos sin dueño en el storage.
+        try:
+            with transaction.atomic(using=kwargs.get('using') or router.db_for_write(type(self), instance=self)):
+                super().save(*args, **kwargs)
+                self._guardar_rendiciones(rendiciones)
+        except BaseException:
+            from .renditions import descartar_rendiciones
+
+            descartar_rendiciones(rendiciones)
+            raise
+
+    def _preparar_rendiciones(self):
+        """Sube las versiones y llena los campos derivados; None si no hay que tocarlas."""
+        nombre = self.imagen.name if self.imagen else ''
+        if self._state.adding:
+            if not nombre:
+                return None
+        elif self._archivo_origen('imagen') in (None, nombre):
+            return None
+
+        from .renditions import CAMPOS_METADATOS, procesar_imagen, srcset_de
+
+        metadatos, rendiciones = procesar_imagen(self.imagen) if nombre else ({}, [])
+        self.imagen_srcset = srcset_de(rendiciones)
+        for campo in CAMPOS_METADATOS:
+            setattr(self, campo, metadatos.get(campo, self._meta.get_field(campo).get_default()))
+        return rendiciones
+
+    def _guardar_rendiciones(self, rendiciones):
+        if rendiciones is not None:
+            from .renditions import guardar_rendiciones
+
+            guardar_rendiciones(self, rendiciones)
+
+
+class Proyecto(ConRendiciones):
     nombre = models.CharField(max_length=200)
     descripcion = models.TextField()
     categoria = models.CharField(max_length=100)
     subcategoria = models.CharField(max_length=100, blank=True)
     imagen = models.ImageField(upload_to='proyectos/', blank=True, null=True)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
+    # Versiones normalizadas (ver slug_etiqueta) para filtrar por índice en vez
+    # de categoria__iexact, que compila a UPPER() y no puede usar un índice.
+    categoria_slug = models.CharField(max_length=100, blank=True, default='', editable=False)
+    subcategoria_slug = models.CharField(max_length=100, blank=True, default='', editable=False)
+
+    class Meta:
+        indexes = [
+            # Orden del listado y paginación keyset de /api/proyectos/?cursor=
+            models.Index(fields=['-fecha_creacion', '-id'], name='proyecto_fecha_id_idx'),
+            # Filtros de la API: rango por slug ya ordenado por fecha.
+            models.Index(fields=['categoria_slug', '-fecha_creacion', '-id'], name='proyecto_cat_fecha_idx'),
+            models.Index(fields=['subcategoria_slug', '-fecha_creacion', '-id'], name='proyecto_sub_fecha_idx'),
+            # Búsqueda ``q`` en PostgreSQL (ver proyectos/search.py).
+            search_index(),
+        ]
 
     def __str__(self):
         return self.nombre
 
+    def actualizar_slugs(self):
+        """Recalcula los slugs; llamar antes de ``bulk_create`` (no pasa por save)."""
+        self.categoria_slug = slug_etiqueta(self.categoria)
+        self.subcategoria_slug = slug_etiqueta(self.subcategoria)
+
+    def save(self, *args, **kwargs):
+        self.actualizar_slugs()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'categoria', 'subcategoria'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'categoria_slug', 'subcategoria_slug'}
+        super().save(*args, **kwargs)
 
-class ProyectoImagen(models.Model):
+
+class ProyectoImagen(ConRendiciones):
     proyecto = models.ForeignKey(
         Proyecto,
         on_delete=models.CASCADE,
@@ -85,6 +252,65 @@ class ProyectoImagen(models.Model):
         return f"{self.proyecto.nombre} - imagen {self.id}"
 
 
+class Rendicion(ConArchivos, models.Model):
+    """Versión reducida (ancho y formato) de la imagen de un proyecto o de su galería."""
+
+    FORMATO_AVIF = 'avif'
+    FORMATO_WEBP = 'webp'
+    FORMATO_CHOICES = [
+        (FORMATO_AVIF, 'AVIF'),
+        (FORMATO_WEBP, 'WebP'),
+    ]
+
+    # Exactamente uno de los dos: la portada del proyecto o una imagen de la galería.
+    proyecto = models.ForeignKey(
+        Proyecto, on_delete=models.CASCADE, null=True, blank=True, related_name='rendiciones',
+    )
+    proyecto_imagen = models.ForeignKey(
+        ProyectoImagen, on_delete=models.CASCADE, null=True, blank=True, related_name='rendiciones',
+    )
+    # Nombre del archivo original en el storage.
+    origen = models.CharField(max_length=255)
+    formato = models.CharField(max_length=10, choices=FORMATO_CHOICES)
+    ancho = models.PositiveIntegerField()
+    alto = models.PositiveIntegerField()
+    bytes = models.PositiveIntegerField()
+    archivo = models.FileField(upload_to='proyectos/rendiciones/', max_length=255)
+    url = models.CharField(max_length=500, editable=False)
+    creado = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['formato', 'ancho']
+        verbose_name_plural = 'rendiciones'
+        constraints = [
+            models.CheckConstraint(
+                condition=(
+                    models.Q(proyecto__isnull=False, proyecto_imagen__isnull=True)
+                    | models.Q(proyecto__isnull=True, proyecto_imagen__isnull=False)
+                ),
+                name='rendicion_un_dueno',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.origen} ({self.formato}, {self.ancho}w)"
+
+
+class Blob(models.Model):
+    """Archivo del storage direccionado por contenido (proyectos/storage.py).
+
+    ``referencias`` cuenta las filas de modelos con ``ConArchivos`` que lo
+    usan; al llegar a cero se borra el archivo (ver proyectos/blobs.py).
+    """
+
+    nombre = models.CharField(max_length=255, unique=True)
+    referencias = models.PositiveIntegerField(default=0)
+    creado = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.nombre} ({self.referencias})"
+
+
 class Contacto(models.Model):
     nombre = models.CharField(max_length=100)
     email = models.EmailField()
@@ -96,7 +322,7 @@ class Contacto(models.Model):
         return f"{self.nombre} - {self.email}"
 
 
-class EquipoSeccion(models.Model):
+class EquipoSeccion(ConArchivos, models.Model):
     """Configuración de la sección Equipo (imagen grupal)."""
     imagen_grupal = models.ImageField(upload_to='equipo/', blank=True, null=True)
     activo = models.BooleanField(default=True)
@@ -110,7 +336,7 @@ class EquipoSeccion(models.Model):
         return "Sección Equipo"
 
 
-class EquipoMiembro(models.Model):
+class EquipoMiembro(ConArchivos, models.Model):
     """Miembros del equipo para la sección Sobre Nosotros."""
     ROL_ARQUITECTO = 'arquitecto'
     ROL_COLABORADOR = 'colaborador'
@@ -0,0 +1,194 @@
+"""Versiones reducidas (WebP/AVIF) y datos de carga de las imágenes del catálogo.
+
+Las imágenes se suben a tamaño completo (PNG o WebP de cientos de KB) y la
+grilla las muestra en tarjetas de a lo más 800px de ancho. Al guardar un
+``ProyectoImagen`` o un ``Proyecto`` con ``imagen`` nueva (``ConRendiciones``
+en ``models.py``) se generan con Pillow los anchos de
+``IMAGE_RENDITION_WIDTHS`` en cada formato de ``IMAGE_RENDITION_FORMATS``:
+
+- cada versión es una fila de ``Rendicion`` con su archivo, medidas y peso;
+- el dueño guarda el resumen en ``imagen_srcset``
+  (``{'avif': [[url, ancho], ...], 'webp': [...]}``), igual que ``imagen_url``:
+  la API arma el ``srcset`` sin consultas extra.
+
+En la misma lectura se guardan las medidas del original, su color dominante
+y un LQIP (miniatura borrosa de unos cientos de bytes como data URI) en
+``imagen_ancho``/``imagen_alto``/``imagen_color``/``imagen_lqip``: el frontend
+reserva el espacio y pinta algo antes de que llegue la imagen.
+
+Nunca se agranda: los anchos mayores que el original se omiten y el ancho del
+original se agrega como el más grande. Si Pillow no puede abrir el archivo la
+imagen queda sin ``srcset`` ni datos de carga (la API sigue dando la original);
+``manage.py generate_renditions`` y ``manage.py generate_placeholders`` generan
+los que falten.
+"""
+
+from __future__ import annotations
+
+import base64
+import logging
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+from .blobs import referenciar
+from .models import Blob, Rendicion, url_imagen
+from .storage import es_blob
+
+logger = logging.getLogger(__name__)
+
+# Lado mayor del LQIP: con 16px el data URI queda en unos 200-400 bytes.
+LQIP_LADO = 16
+
+# Columnas que ``procesar_imagen`` llena en el dueño, además de ``imagen_srcset``.
+CAMPOS_METADATOS = ('imagen_ancho', 'imagen_alto', 'imagen_color', 'imagen_lqip')
+
+ERRORES_IMAGEN = (OSError, ValueError, Image.DecompressionBombError)
+
+
+def formatos_disponibles() -> tuple[str, ...]:
+    """Formatos configurados que este Pillow sabe escribir (AVIF depende de la build)."""
+
+    return tuple(f for f in settings.IMAGE_RENDITION_FORMATS if features.check(f))
+
+
+def anchos_para(original: int) -> list[int]:
+    anchos = sorted(w for w in settings.IMAGE_RENDITION_WIDTHS if w < original)
+    if not settings.IMAGE_RENDITION_WIDTHS or original < max(settings.IMAGE_RENDITION_WIDTHS):
+        anchos.append(original)
+    return anchos
+
+
+def _normalizar(imagen):
+    imagen = ImageOps.exif_transpose(imagen)
+    if imagen.mode in ('RGB', 'RGBA'):
+        return imagen
+    con_alfa = 'A' in imagen.getbands() or 'transparency' in imagen.info
+    return imagen.convert('RGBA' if con_alfa else 'RGB')
+
+
+def color_dominante(imagen) -> str:
+    """Color más frecuente tras reducir la paleta, como ``#rrggbb``."""
+
+    muestra = imagen.convert('RGB')
+    muestra.thumbnail((64, 64))
+    paleta = muestra.quantize(colors=8)
+    _, indice = max(paleta.getcolors())
+    r, g, b = paleta.getpalette()[indice * 3:indice * 3 + 3]
+    return f'#{r:02x}{g:02x}{b:02x}'
+
+
+def lqip(imagen) -> str:
+    """Miniatura de ``LQIP_LADO`` px en data URI (WebP si Pillow lo soporta)."""
+
+    miniatura = imagen.copy()
+    miniatura.thumbnail((LQIP_LADO, LQIP_LADO))
+    formato = 'webp' if features.check('webp') else 'png'
+    buffer = BytesIO()
+    miniatura.save(buffer, format=formato.upper(), quality=40)
+    return f'data:image/{formato};base64,{base64.b64encode(buffer.getvalue()).decode("ascii")}'
+
+
+def metadatos_de(imagen) -> dict:
+    return {
+        'imagen_ancho': imagen.width,
+        'imagen_alto': imagen.height,
+        'imagen_color': color_dominante(imagen),
+        'imagen_lqip': lqip(imagen),
+    }
+
+
+def _rendiciones_de(field, original, formatos) -> list[Rendicion]:
+    stem = PurePosixPath(field.name).stem
+    rendiciones = []
+    try:
+        for ancho in anchos_para(original.width):
+            alto = max(1, round(original.height * ancho / original.width))
+            if ancho == original.width:
+                reducida = original
+            else:
+                reducida = original.resize((ancho, alto), Image.Resampling.LANCZOS)
+            for formato in formatos:
+                buffer = BytesIO()
+                reducida.save(
+                    buffer,
+                    format=formato.upper(),
+                    quality=settings.IMAGE_RENDITION_QUALITY.get(formato, 80),
+                )
+                rendicion = Rendicion(
+                    origen=field.name,
+                    formato=formato,
+                    ancho=ancho,
+                    alto=alto,
+                    bytes=buffer.tell(),
+                    archivo=ContentFile(buffer.getvalue(), name=f'{stem}-{ancho}w.{formato}'),
+                )
+                rendicion.url = url_imagen(rendicion.archivo)
+                rendiciones.append(rendicion)
+    except ERRORES_IMAGEN:
+        descartar_rendiciones(rendiciones)
+        raise
+    return rendiciones
+
+
+def descartar_rendiciones(rendiciones) -> None:
+    """Borra los archivos de versiones ya subidas que no llegaron a guardarse.
+
+    Un blob que ya tiene fila en ``Blob`` es el mismo contenido de otra
+    versión guardada: ese no se toca.
+    """
+
+    for rendicion in rendiciones:
+        nombre = rendicion.archivo.name
+        if es_blob(nombre) and Blob.objects.filter(nombre=nombre).exists():
+            continue
+        try:
+            rendicion.archivo.delete(save=False)
+        except OSError as exc:
+            logger.warning('No se pudo borrar la versión %s: %s', nombre, exc)
+
+
+def procesar_imagen(field, rendiciones=True) -> tuple[dict, list[Rendicion]]:
+    """Lee ``field`` una vez: metadatos (``CAMPOS_METADATOS``) y versiones subidas, sin dueño.
+
+    Con ``rendiciones=False`` solo calcula los metadatos. Si el archivo no se
+    puede leer devuelve ``({}, [])``.
+    """
+
+    formatos = formatos_disponibles() if rendiciones else ()
+    if not field:
+        return {}, []
+    try:
+        with field.open('rb') as f, Image.open(f) as original:
+            original = _normalizar(original)
+            metadatos = metadatos_de(original)
+            return metadatos, _rendiciones_de(field, original, formatos)
+    except ERRORES_IMAGEN as exc:
+        logger.warning('No se pudo procesar la imagen %s: %s', field.name, exc)
+        return {}, []
+
+
+def srcset_de(rendiciones) -> dict:
+    """``{formato: [[url, ancho], ...]}`` por ancho ascendente, en el orden de la configuración."""
+
+    srcset = {}
+    for formato in settings.IMAGE_RENDITION_FORMATS:
+        versiones = sorted((r.ancho, r.url) for r in rendiciones if r.formato == formato)
+        if versiones:
+            srcset[formato] = [[url, ancho] for ancho, url in versiones]
+    return srcset
+
+
+def guardar_rendiciones(owner, rendiciones) -> None:
+    """Reemplaza las rendiciones de ``owner``; los archivos viejos los borra una señal."""
+
+    relacion = owner.rendiciones
+    relacion.all().delete()
+    for rendicion in rendiciones:
+        setattr(rendicion, relacion.field.name, owner)
+    Rendicion.objects.bulk_create(rendiciones)
+    # bulk_create no manda post_save: las referencias a los blobs van aparte.
+    referenciar(rendicion.archivo.name for rendicion in rendiciones)
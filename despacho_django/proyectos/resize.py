@@ -0,0 +1,226 @@
+"""Imágenes redimensionadas al vuelo: ``/img/<ancho>x<alto>/<ruta>``.
+
+Sin Cloudinary los archivos de ``MEDIA_ROOT`` solo se sirven a tamaño completo
+(y en producción únicamente con ``DEBUG``). Esta vista hace lo que haría un
+CDN de imágenes:
+
+- la primera petición abre el original con Pillow, lo reduce para que quepa en
+  ``ancho`` x ``alto`` (0 = sin límite en ese eje; nunca agranda) y guarda el
+  resultado en ``IMAGE_RESIZE_CACHE_DIR``;
+- las siguientes sirven el archivo del cache;
+- solo se aceptan las medidas de ``IMAGE_RESIZE_SIZES`` (por defecto los anchos
+  de ``IMAGE_RENDITION_WIDTHS``; ``*`` acepta cualquiera), así que nadie puede
+  llenar el cache pidiendo medidas arbitrarias;
+- los blobs (proyectos/storage.py) nunca cambian de contenido y se sirven
+  ``immutable`` por un año; los demás archivos pueden reemplazarse con el mismo
+  nombre y llevan el TTL del catálogo (``apply_edge_cache``) más el ETag, que
+  incluye tamaño y fecha del original.
+
+El cache está acotado a ``IMAGE_RESIZE_CACHE_MAX_BYTES``: se borran las
+entradas usadas hace más tiempo (la fecha de modificación de cada archivo se
+renueva al servirlo). Recorrer el directorio es caro, así que cada worker lo
+hace en su primera escritura y después solo cuando ha escrito el margen que
+deja un recorte; entre tanto el cache puede pasarse del límite en ese margen
+por worker. Lo comparten los workers del mismo contenedor, igual que el cache
+de Django.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path, PurePosixPath
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_safe
+from PIL import Image, features
+
+from .edge import apply_edge_cache
+from .renditions import ERRORES_IMAGEN, _normalizar
+from .storage import es_blob
+
+logger = logging.getLogger(__name__)
+
+UN_ANIO = 365 * 24 * 60 * 60
+
+# Formato de salida según la extensión del original; lo demás sale como PNG.
+FORMATOS = {
+    '.jpg': 'jpeg',
+    '.jpeg': 'jpeg',
+    '.jfif': 'jpeg',
+    '.png': 'png',
+    '.webp': 'webp',
+    '.avif': 'avif',
+}
+CALIDAD = {'jpeg': 82}
+
+# Una entrada servida no vuelve a marcarse como usada antes de esto: evita
+# escribir en disco en cada hit y el orden de uso sigue siendo suficiente.
+RENOVAR_USO_CADA = 60 * 60
+
+# Al pasarse del límite se recorta hasta esta fracción, para no recorrer el
+# cache en cada escritura siguiente.
+FRACCION_TRAS_RECORTE = 0.9
+
+# Bytes que este proceso escribió desde su último recorrido (None: aún ninguno).
+_escritos = None
+_escritos_lock = threading.Lock()
+
+
+def _medidas_validas(ancho, alto) -> bool:
+    if not (ancho or alto):
+        return False
+    if max(ancho, alto) > settings.IMAGE_RESIZE_MAX_DIMENSION:
+        return False
+    permitidas = settings.IMAGE_RESIZE_SIZES
+    return '*' in permitidas or f'{ancho}x{alto}' in permitidas
+
+
+def _original(ruta) -> Path:
+    try:
+        origen = Path(default_storage.path(ruta))
+    except (NotImplementedError, SuspiciousFileOperation):
+        raise Http404('Imagen no disponible.')
+    if not origen.is_file():
+        raise Http404('Imagen no encontrada.')
+    return origen
+
+
+def _formato(ruta) -> str:
+    formato = FORMATOS.get(PurePosixPath(ruta).suffix.lower(), 'png')
+    if formato in ('webp', 'avif') and not features.check(formato):
+        return 'png'
+    return formato
+
+
+def _clave(ruta, ancho, alto, origen) -> str:
+    stat = origen.stat()
+    return hashlib.sha256(f'{ruta}\0{ancho}x{alto}\0{stat.st_size}\0{stat.st_mtime_ns}'.encode()).hexdigest()
+
+
+def _redimensionar(origen, destino, ancho, alto, formato) -> None:
+    with Image.open(origen) as original:
+        imagen = _normalizar(original)
+        imagen.thumbnail((ancho or imagen.width, alto or imagen.height), Image.Resampling.LANCZOS)
+        if formato == 'jpeg' and imagen.mode != 'RGB':
+            imagen = imagen.convert('RGB')
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        # Archivo temporal + replace: otro worker nunca lee una imagen a medias.
+        fd, temporal = tempfile.mkstemp(dir=destino.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                calidad = CALIDAD.get(formato, settings.IMAGE_RENDITION_QUALITY.get(formato, 80))
+                imagen.save(f, format=formato.upper(), quality=calidad)
+            os.replace(temporal, destino)
+        except BaseException:
+            Path(temporal).unlink(missing_ok=True)
+            raise
+
+
+def recortar_cache(directorio=None, limite=None) -> int:
+    """Borra las entradas usadas hace más tiempo si el cache pasa de ``limite``; devuelve los bytes liberados."""
+
+    directorio = Path(directorio or settings.IMAGE_RESIZE_CACHE_DIR)
+    limite = settings.IMAGE_RESIZE_CACHE_MAX_BYTES if limite is None else limite
+    entradas = []
+    for archivo in directorio.glob('*/*'):
+        if archivo.suffix == '.tmp':
+            continue  # otro worker la está escribiendo
+        try:
+            stat = archivo.stat()
+        except FileNotFoundError:
+            continue  # otro worker la borró
+        entradas.append((stat.st_mtime, stat.st_size, archivo))
+    total = sum(size for _, size, _ in entradas)
+    if total <= limite:
+        return 0
+
+    liberados = 0
+    objetivo = total - int(limite * FRACCION_TRAS_RECORTE)
+    for _, size, archivo in sorted(entradas, key=lambda e: e[0]):
+        if liberados >= objetivo:
+            break
+        archivo.unlink(missing_ok=True)
+        liberados += size
+    return liberados
+
+
+def _anotar_escritura(destino) -> None:
+    """Recorta el cache si este proceso ya escribió el margen que deja un recorte."""
+
+    global _escritos
+    try:
+        tamano = destino.stat().st_size
+    except FileNotFoundError:
+        tamano = 0
+    margen = settings.IMAGE_RESIZE_CACHE_MAX_BYTES * (1 - FRACCION_TRAS_RECORTE)
+    with _escritos_lock:
+        if _escritos is not None and _escritos + tamano < margen:
+            _escritos += tamano
+            return
+        _escritos = 0
+    recortar_cache()
+
+
+def _generar(ruta, origen, destino, ancho, alto, formato) -> None:
+    try:
+        _redimensionar(origen, destino, ancho, alto, formato)
+    except ERRORES_IMAGEN as exc:
+        logger.warning('No se pudo redimensionar %s: %s', ruta, exc)
+        raise Http404('Imagen no disponible.')
+    _anotar_escritura(destino)
+
+
+def _respuesta_cacheable(response, etag, ruta):
+    response.headers['ETag'] = etag
+    if es_blob(ruta):
+        patch_cache_control(response, public=True, max_age=UN_ANIO, immutable=True)
+        return response
+    return apply_edge_cache(response, ['catalog'])
+
+
+@require_safe
+def imagen_redimensionada(request, ancho, alto, ruta):
+    """La imagen ``ruta`` de MEDIA_ROOT reducida a ``ancho`` x ``alto``, desde el cache en disco."""
+
+    if not _medidas_validas(ancho, alto):
+        raise Http404('Medidas no permitidas.')
+    origen = _original(ruta)
+    formato = _formato(ruta)
+    clave = _clave(ruta, ancho, alto, origen)
+    etag = f'"{clave[:32]}"'
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        return _respuesta_cacheable(HttpResponseNotModified(), etag, ruta)
+
+    destino = Path(settings.IMAGE_RESIZE_CACHE_DIR) / clave[:2] / f'{clave}.{formato}'
+    try:
+        usado = destino.stat().st_mtime
+    except FileNotFoundError:
+        _generar(ruta, origen, destino, ancho, alto, formato)
+    else:
+        if time.time() - usado > RENOVAR_USO_CADA:
+            # Si otro worker la recorta entre stat() y utime(), el open() de
+            # abajo la regenera.
+            with contextlib.suppress(FileNotFoundError):
+                os.utime(destino)
+
+    try:
+        archivo = destino.open('rb')
+    except FileNotFoundError:
+        # Recortada por otro worker justo ahora: se vuelve a generar una vez.
+        _generar(ruta, origen, destino, ancho, alto, formato)
+        try:
+            archivo = destino.open('rb')
+        except FileNotFoundError:
+            raise Http404('Imagen no disponible.')
+    return _respuesta_cacheable(FileResponse(archivo, content_type=f'image/{formato}'), etag, ruta)
@@ -0,0 +1,168 @@
+"""Búsqueda de texto completo para el parámetro ``q`` de la API.
+
+Busca en ``nombre``, ``descripcion``, ``categoria`` y ``subcategoria`` y anota
+``search_rank`` (mayor = más relevante):
+
+- PostgreSQL (producción): ``SearchVector`` + ``websearch_to_tsquery`` servidos
+  por el índice GIN ``proyecto_search_gin`` (``SearchIndex``, declarado en
+  ``Proyecto.Meta.indexes``). La expresión del índice y la de la consulta
+  tienen que ser idénticas para que el planner lo use.
+- SQLite (desarrollo): tabla virtual FTS5 ``proyectos_proyecto_fts`` con
+  contenido externo, mantenida por triggers. Se crea/repara en ``post_migrate``
+  porque las migraciones de SQLite reconstruyen la tabla de proyectos y se
+  llevan sus triggers.
+- Otros motores, o SQLite sin FTS5: ``icontains`` sobre los mismos campos.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import OperationalError, connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+SEARCH_FIELDS = ('nombre', 'descripcion', 'categoria', 'subcategoria')
+SEARCH_CONFIG = 'spanish'
+SEARCH_INDEX_NAME = 'proyecto_search_gin'
+
+PROYECTO_TABLE = 'proyectos_proyecto'
+FTS_TABLE = 'proyectos_proyecto_fts'
+
+_FTS_COLUMNS = ', '.join(SEARCH_FIELDS)
+_FTS_NEW = ', '.join(f'new.{f}' for f in SEARCH_FIELDS)
+_FTS_OLD = ', '.join(f'old.{f}' for f in SEARCH_FIELDS)
+
+_SQLITE_FTS_SQL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {_FTS_COLUMNS},
+        content='{PROYECTO_TABLE}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {PROYECTO_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_FTS_COLUMNS}) VALUES (new.id, {_FTS_NEW});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {PROYECTO_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_FTS_COLUMNS}) VALUES ('delete', old.id, {_FTS_OLD});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON {PROYECTO_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_FTS_COLUMNS}) VALUES ('delete', old.id, {_FTS_OLD});
+        INSERT INTO {FTS_TABLE}(rowid, {_FTS_COLUMNS}) VALUES (new.id, {_FTS_NEW});
+    END""",
+    # Reindexa todo: cubre filas escritas mientras faltaban los triggers.
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+
+
+class SearchIndex(GinIndex):
+    """``GinIndex`` que solo se crea en PostgreSQL.
+
+    En los demás motores no hay ``tsvector`` y la búsqueda usa la tabla FTS5 o
+    ``icontains``; ahí el índice existe solo en el estado de las migraciones
+    (así ``makemigrations`` lo conoce y SQLite puede reconstruir la tabla).
+    """
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor != 'postgresql':
+            return ''
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
+
+    def remove_sql(self, model, schema_editor, **kwargs):
+        if schema_editor.connection.vendor != 'postgresql':
+            return ''
+        return super().remove_sql(model, schema_editor, **kwargs)
+
+
+def search_index():
+    return SearchIndex(SearchVector(*SEARCH_FIELDS, config=SEARCH_CONFIG), name=SEARCH_INDEX_NAME)
+
+
+# alias de conexión -> True/False; se resuelve una vez por proceso.
+_fts_available = {}
+
+
+def ensure_sqlite_fts(connection) -> bool:
+    """Crea (o repara) la tabla FTS5 y sus triggers. Idempotente."""
+
+    if connection.vendor != 'sqlite':
+        return False
+    if PROYECTO_TABLE not in connection.introspection.table_names():
+        return False
+    try:
+        with connection.cursor() as cursor:
+            for sql in _SQLITE_FTS_SQL:
+                cursor.execute(sql)
+    except OperationalError as e:
+        logger.warning('SQLite sin FTS5; la búsqueda usará icontains: %s', e)
+        _fts_available[connection.alias] = False
+        return False
+    _fts_available[connection.alias] = True
+    return True
+
+
+def _sqlite_fts_ready(connection) -> bool:
+    if connection.alias not in _fts_available:
+        _fts_available[connection.alias] = FTS_TABLE in connection.introspection.table_names()
+    return _fts_available[connection.alias]
+
+
+def _fts_match(q: str) -> str:
+    # Cada palabra como prefijo entre comillas: el input del usuario nunca se
+    # interpreta como sintaxis FTS5 (AND, NEAR, columnas, comillas sueltas...).
+    return ' '.join(f'"{token}"*' for token in re.findall(r'\w+', q))
+
+
+def _search_postgres(qs, q):
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+
+    vector = SearchVector(*SEARCH_FIELDS, config=SEARCH_CONFIG)
+    query = SearchQuery(q, config=SEARCH_CONFIG, search_type='websearch')
+    return (
+        qs.annotate(search=vector)
+        .filter(search=query)
+        .annotate(search_rank=SearchRank(vector, query))
+    )
+
+
+def _search_sqlite(qs, q):
+    match = _fts_match(q)
+    if not match:
+        # Solo puntuación: sin resultados, pero con ``search_rank`` para que
+        # el ``order_by`` del listado siga siendo válido.
+        return qs.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+    matches = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+    # La fila externa se nombra con la tabla y la pk del modelo de ``qs``.
+    quote = connections[qs.db].ops.quote_name
+    meta = qs.model._meta
+    fila = f'{quote(meta.db_table)}.{quote(meta.pk.column)}'
+    # bm25() es "menor = mejor"; se invierte para ordenar igual que en Postgres.
+    rank = RawSQL(
+        f'SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = {fila}',
+        [match],
+        output_field=FloatField(),
+    )
+    return qs.filter(id__in=matches).annotate(search_rank=rank)
+
+
+def _search_fallback(qs, q):
+    condition = Q()
+    for field in SEARCH_FIELDS:
+        condition |= Q(**{f'{field}__icontains': q})
+    return qs.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def search(qs, q: str):
+    """Filtra ``qs`` (de ``Proyecto``) por ``q`` y anota ``search_rank``."""
+
+    connection = connections[qs.db]
+    if connection.vendor == 'postgresql':
+        return _search_postgres(qs, q)
+    if connection.vendor == 'sqlite' and _sqlite_fts_ready(connection):
+        return _search_sqlite(qs, q)
+    return _search_fallback(qs, q)
@@ -0,0 +1,103 @@
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from .blobs import actualizar_referencias, soltar_instancia
+from .cache import bump_catalog_version
+from .edge import schedule_purge
+from .models import EquipoMiembro, EquipoSeccion, HomePageConfig, Proyecto, ProyectoImagen, Rendicion
+from .search import ensure_sqlite_fts
+from .storage import es_blob
+from .timing import install_query_timer
+
+
+@receiver(post_save, sender=Proyecto)
+@receiver(post_delete, sender=Proyecto)
+@receiver(post_save, sender=ProyectoImagen)
+@receiver(post_delete, sender=ProyectoImagen)
+def invalidar_catalogo(sender, **kwargs):
+    """Mueve la versión del catálogo cuando cambia un proyecto o su galería.
+
+    Se difiere a ``on_commit``: si se moviera dentro de la transacción (el admin
+    guarda dentro de un atomic), una petición concurrente podría cachear datos
+    viejos bajo la versión nueva.
+    """
+    transaction.on_commit(bump_catalog_version)
+
+
+def _edge_keys(sender, instance):
+    if sender is Proyecto:
+        return ['catalog', f'project:{instance.pk}']
+    if sender is ProyectoImagen:
+        return ['catalog', f'project:{instance.proyecto_id}']
+    if sender is HomePageConfig:
+        return ['home']
+    return ['team']
+
+
+@receiver(post_save, sender=Proyecto)
+@receiver(post_delete, sender=Proyecto)
+@receiver(post_save, sender=ProyectoImagen)
+@receiver(post_delete, sender=ProyectoImagen)
+@receiver(post_save, sender=HomePageConfig)
+@receiver(post_delete, sender=HomePageConfig)
+@receiver(post_save, sender=EquipoSeccion)
+@receiver(post_delete, sender=EquipoSeccion)
+@receiver(post_save, sender=EquipoMiembro)
+@receiver(post_delete, sender=EquipoMiembro)
+def purgar_edge_cache(sender, instance, **kwargs):
+    """Purga en el CDN las Surrogate-Key del contenido que cambió (ver proyectos/edge.py)."""
+    schedule_purge(_edge_keys(sender, instance))
+
+
+@receiver(post_delete, sender=Rendicion)
+def borrar_archivo_rendicion(sender, instance, **kwargs):
+    """Las rendiciones son derivadas: al borrar la fila (o su imagen, en cascada) se borra el archivo.
+
+    Los blobs pueden estar compartidos; esos los borra ``soltar_blobs`` al
+    quedar sin referencias.
+    """
+    if instance.archivo and not es_blob(instance.archivo.name):
+        transaction.on_commit(lambda: instance.archivo.delete(save=False))
+
+
+@receiver(post_save, sender=Proyecto)
+@receiver(post_save, sender=ProyectoImagen)
+@receiver(post_save, sender=Rendicion)
+@receiver(post_save, sender=HomePageConfig)
+@receiver(post_save, sender=EquipoSeccion)
+@receiver(post_save, sender=EquipoMiembro)
+def referenciar_blobs(sender, instance, created, update_fields=None, **kwargs):
+    """Suma/resta referencias de ``Blob`` si cambió algún archivo (ver proyectos/blobs.py)."""
+    actualizar_referencias(instance, created, update_fields)
+    instance._marcar_archivos(update_fields)
+
+
+@receiver(post_delete, sender=Proyecto)
+@receiver(post_delete, sender=ProyectoImagen)
+@receiver(post_delete, sender=Rendicion)
+@receiver(post_delete, sender=HomePageConfig)
+@receiver(post_delete, sender=EquipoSeccion)
+@receiver(post_delete, sender=EquipoMiembro)
+def soltar_blobs(sender, instance, **kwargs):
+    """Resta las referencias de la fila borrada; los blobs sin uso se borran tras el commit."""
+    soltar_instancia(instance)
+
+
+@receiver(post_migrate)
+def preparar_busqueda_sqlite(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """Crea/repara la tabla FTS5 de desarrollo después de cada migrate.
+
+    Las migraciones de SQLite que reconstruyen ``proyectos_proyecto`` borran
+    sus triggers; recrearlos aquí evita que la búsqueda quede desactualizada.
+    """
+    if sender.name != 'proyectos':
+        return
+    ensure_sqlite_fts(connections[using])
+
+
+@receiver(connection_created)
+def instrumentar_conexion(sender, connection, **kwargs):
+    """Cuenta consultas y tiempo de base de datos por petición (ver proyectos/timing.py)."""
+    install_query_timer(connection)
@@ -0,0 +1,86 @@
+"""Snapshot precomprimido del catálogo completo.
+
+``/api/proyectos/?page_size=1000`` (el máximo) sin filtros devuelve el
+catálogo entero y el JSON es idéntico para todos los visitantes. La grilla de
+proyectos.js ya no lo pide (pagina con ``page_size=24&cursor=...``); lo usan
+los clientes que bajan todo de una vez: copias viejas de proyectos.js que aún
+estén en el cache del navegador o del CDN e integraciones externas. El
+snapshot serializa ese payload una sola vez por versión del catálogo, junto con
+sus variantes gzip/brotli, y la vista lo sirve tal cual: sin consultas, sin
+serializar y sin comprimir por petición.
+
+Se construye en la primera petición después de un cambio (las URLs de imagen
+son absolutas, así que hay un snapshot por host) y queda en el cache por
+defecto, que en este proyecto vive en disco.
+"""
+
+from __future__ import annotations
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .cache import aget_or_build, catalog_cache_key, get_or_build
+from .compression import SUPPORTED_ENCODINGS, compress, negotiate_encoding
+from .encoders import dumps
+
+# El catálogo completo de una vez; otras combinaciones pasan por el cache normal.
+SNAPSHOT_PAGE_SIZE = 1000
+
+
+def is_snapshot_request(params, default_fields) -> bool:
+    """True si la petición es exactamente la del catálogo completo sin filtros."""
+
+    return (
+        not params['categoria']
+        and not params['sub']
+        and not params['q']
+        and params['cursor'] is None
+        and params['page'] == 1
+        and params['page_size'] == SNAPSHOT_PAGE_SIZE
+        and params['fields'] == default_fields
+        and params['images'] == 'cover'
+    )
+
+
+def build_snapshot(payload) -> dict:
+    """Serializa ``payload`` y precalcula sus variantes comprimidas."""
+
+    body = dumps(payload)
+    variants = {'identity': body}
+    for encoding in SUPPORTED_ENCODINGS:
+        variants[encoding] = compress(body, encoding, best=True)
+    return variants
+
+
+def get_snapshot(request, build_payload) -> dict:
+    key = catalog_cache_key('snapshot', request.build_absolute_uri('/'))
+    return get_or_build(key, lambda: build_snapshot(build_payload()))
+
+
+async def aget_snapshot(request, build_payload) -> dict:
+    """Versión async: ``build_payload`` es una corrutina.
+
+    Brotli/gzip al máximo nivel tardan; se comprimen en un hilo para no
+    bloquear el event loop.
+    """
+
+    async def build():
+        return await sync_to_async(build_snapshot, thread_sensitive=False)(await build_payload())
+
+    key = catalog_cache_key('snapshot', request.build_absolute_uri('/'))
+    return await aget_or_build(key, build)
+
+
+def snapshot_response(request, snapshot) -> HttpResponse:
+    """Sirve la variante que mejor encaja con ``Accept-Encoding``."""
+
+    available = tuple(e for e in SUPPORTED_ENCODINGS if e in snapshot)
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding', ''), available)
+
+    response = HttpResponse(snapshot[encoding or 'identity'], content_type='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Content-Length'] = str(len(response.content))
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
@@ -0,0 +1,116 @@
+"""Storage direccionado por contenido para los archivos subidos.
+
+Cada archivo se guarda con el SHA-256 de su contenido como nombre
+(``blobs/ab/ab12...ef.webp``), sin importar el ``upload_to`` del campo ni el
+nombre original. Subir de nuevo la misma imagen (el admin la guardaba como
+``spx1_WuJYAnd.webp``, ``spx1_pGuFFbU.webp``...) reutiliza el archivo que ya
+está: no se sube otra vez, ocupa una sola copia y el CDN cachea una sola URL.
+
+``ContentAddressedStorage`` envuelve al backend real (``FileSystemStorage`` o
+el de Cloudinary), configurado en ``STORAGES['default']['OPTIONS']``. Como un
+mismo archivo puede estar en varias filas, nunca se borra directamente: las
+referencias se cuentan en ``Blob`` (ver proyectos/blobs.py) y el archivo se
+borra cuando ya nadie lo usa.
+
+Los videos (``TIPOS_SIN_HASH``) se guardan con su nombre de siempre: leerlos
+enteros para calcular el hash en cada subida cuesta más de lo que ahorra, y
+casi nunca se repiten.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+from pathlib import PurePosixPath
+
+from django.core.files import File
+from django.core.files.storage import Storage
+from django.utils.deconstruct import deconstructible
+from django.utils.module_loading import import_string
+
+# Carpeta raíz de los blobs; se reparte en subcarpetas por los dos primeros
+# caracteres del hash para no acumular miles de archivos en una sola.
+PREFIJO = 'blobs'
+
+# Tipos MIME (por prefijo) que se guardan con su nombre, sin hash.
+TIPOS_SIN_HASH = ('video/',)
+
+
+def hash_contenido(content) -> str:
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def nombre_blob(digest: str, nombre_original: str) -> str:
+    # La extensión se conserva: el Content-Type de FileSystemStorage/WhiteNoise
+    # y el formato que espera Cloudinary salen de ella.
+    extension = PurePosixPath(nombre_original or '').suffix.lower()
+    return f'{PREFIJO}/{digest[:2]}/{digest}{extension}'
+
+
+def es_blob(nombre: str) -> bool:
+    return bool(nombre) and nombre.startswith(PREFIJO + '/')
+
+
+def direccionable(nombre: str) -> bool:
+    """False para los archivos que no se guardan por hash (videos)."""
+    tipo, _ = mimetypes.guess_type(nombre or '')
+    return not (tipo and tipo.startswith(TIPOS_SIN_HASH))
+
+
+@deconstructible(path='proyectos.storage.ContentAddressedStorage')
+class ContentAddressedStorage(Storage):
+    """Guarda bajo el hash del contenido y delega todo lo demás en ``backend``."""
+
+    def __init__(self, backend='django.core.files.storage.FileSystemStorage', options=None):
+        self.backend = backend
+        self.options = options or {}
+        self.inner = import_string(backend)(**self.options)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not direccionable(name):
+            return self.inner.save(name, content, max_length=max_length)
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        nombre = nombre_blob(hash_contenido(content), name)
+        if self.inner.exists(nombre):
+            # Mismo contenido, mismo nombre: no hace falta volver a subirlo.
+            return nombre
+        content.seek(0)
+        return self.inner.save(nombre, content, max_length=max_length)
+
+    # Delegación al backend real.
+
+    def _open(self, name, mode='rb'):
+        return self.inner.open(name, mode)
+
+    def delete(self, name):
+        self.inner.delete(name)
+
+    def exists(self, name):
+        return self.inner.exists(name)
+
+    def listdir(self, path):
+        return self.inner.listdir(path)
+
+    def size(self, name):
+        return self.inner.size(name)
+
+    def url(self, name):
+        return self.inner.url(name)
+
+    def path(self, name):
+        return self.inner.path(name)
+
+    def get_accessed_time(self, name):
+        return self.inner.get_accessed_time(name)
+
+    def get_created_time(self, name):
+        return self.inner.get_created_time(name)
+
+    def get_modified_time(self, name):
+        return self.inner.get_modified_time(name)
@@ -1,3 +1,1305 @@
-from django.test import TestCase
+"""Pruebas de la app ``proyectos``."""
 
-# Create your tests here.
+import base64
+import datetime
+import decimal
+import gzip
+import importlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from asgiref.sync import async_to_sync
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import ResolverMatch
+from PIL import Image
+
+from . import compression, edge, encoders, resize, search, views, views_api, views_async
+from .cache import catalog_cache_key
+from .middleware import CompressionMiddleware, ServerTimingMiddleware, query_budget
+from .models import (
+    Blob, Contacto, EquipoMiembro, EquipoSeccion, HomePageConfig, Proyecto, ProyectoImagen, Rendicion, slug_etiqueta,
+)
+
+# Con la misma semilla los primeros proyectos son siempre los mismos: desde 20
+# hay resultados para todos los filtros de las pruebas.
+CATALOG_SIZES = (20, 60, 200)
+
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'proyectos-tests',
+    },
+    'compressed': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'proyectos-tests-compressed',
+    },
+}
+
+
+def generar_catalogo(n, imagenes=3):
+    call_command(
+        'generate_catalog', proyectos=n, imagenes=imagenes, reemplazar=True, seed=0,
+        stdout=StringIO(),
+    )
+    cache.clear()
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    EDGE_PURGE_BACKEND='proyectos.edge.NullPurgeBackend',
+)
+class QueryCountTests(TestCase):
+    """Número de consultas por vista, igual para catálogos de distintos tamaños.
+
+    Un N+1 hace que crezca con N. Corre contra las vistas síncronas y contra
+    las de ``views_async``.
+    """
+
+    # Peticiones sin cache: validadores del catálogo (ETag) + lo de la vista.
+    LIST_QUERIES = {
+        # validadores, COUNT, página, portadas
+        '/api/proyectos/': 4,
+        '/api/proyectos/?categoria=residencial&page=2': 4,
+        '/api/proyectos/?images=all&page_size=24': 4,
+        '/api/proyectos/?images=none&fields=nombre': 3,
+        # keyset: sin COUNT
+        '/api/proyectos/?cursor=&page_size=24': 3,
+        '/api/proyectos/?cursor=&sub=tiendas': 3,
+        '/api/proyectos/?q=casa': 4,
+        # validadores + GROUP BY
+        '/api/proyectos/facets/': 2,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        EquipoSeccion.objects.create()
+        for orden in range(4):
+            EquipoMiembro.objects.create(nombre=f'Arquitecto {orden}', rol=EquipoMiembro.ROL_ARQUITECTO, orden=orden)
+            EquipoMiembro.objects.create(nombre=f'Colaborador {orden}', rol=EquipoMiembro.ROL_COLABORADOR, orden=orden)
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def get(self, modulo, vista, path, **kwargs):
+        request = self.factory.get(path)
+        if modulo is views_async:
+            return async_to_sync(getattr(modulo, vista))(request, **kwargs)
+        return getattr(modulo, vista)(request, **kwargs)
+
+    def assertQueriesAtEverySize(self, num, modulo, vista, path):
+        for n in CATALOG_SIZES:
+            with self.subTest(modulo=modulo.__name__, path=path, proyectos=n):
+                generar_catalogo(n)
+                with self.assertNumQueries(num):
+                    response = self.get(modulo, vista, path)
+                    if response.streaming:
+                        b''.join(response)
+                self.assertEqual(response.status_code, 200)
+
+    def test_listado(self):
+        for modulo in (views_api, views_async):
+            for path, num in self.LIST_QUERIES.items():
+                vista = 'proyectos_facets' if 'facets' in path else 'proyectos_list'
+                self.assertQueriesAtEverySize(num, modulo, vista, path)
+
+    def test_listado_en_streaming(self):
+        # Un solo SELECT; con iterator() el prefetch va por bloques de
+        # STREAM_CHUNK_SIZE.
+        for modulo in (views_api, views_async):
+            for n in CATALOG_SIZES:
+                with self.subTest(modulo=modulo.__name__, proyectos=n):
+                    generar_catalogo(n)
+                    bloques = -(-n // views_api.STREAM_CHUNK_SIZE)
+                    # validadores, COUNT, filas, portadas por bloque
+                    with self.assertNumQueries(3 + bloques):
+                        response = self.get(modulo, 'proyectos_list', '/api/proyectos/?page_size=500')
+                        b''.join(response)
+
+    def test_listado_cacheado_no_consulta(self):
+        generar_catalogo(CATALOG_SIZES[0])
+        for modulo in (views_api, views_async):
+            for path in self.LIST_QUERIES:
+                vista = 'proyectos_facets' if 'facets' in path else 'proyectos_list'
+                with self.subTest(modulo=modulo.__name__, path=path):
+                    self.get(modulo, vista, path)
+                    with self.assertNumQueries(0):
+                        self.get(modulo, vista, path)
+
+    def test_detalle(self):
+        for modulo in (views_api, views_async):
+            for n in CATALOG_SIZES:
+                with self.subTest(modulo=modulo.__name__, proyectos=n):
+                    generar_catalogo(n, imagenes=6)
+                    pk = Proyecto.objects.latest('id').pk
+                    # proyecto, galería, validadores
+                    with self.assertNumQueries(3):
+                        response = self.get(modulo, 'proyecto_detail', f'/api/proyectos/{pk}/', pk=pk)
+                    self.assertEqual(response.status_code, 200)
+
+    def test_paginas(self):
+        paginas = (
+            ('index_page', '/', 1),
+            ('proyectos_page', '/proyectos/', 0),
+            ('contacto_page', '/contacto/', 0),
+        )
+        for modulo in (views, views_async):
+            for vista, path, num in paginas:
+                self.assertQueriesAtEverySize(num, modulo, vista, path)
+
+    def test_sobre_nosotros_no_crece_con_el_equipo(self):
+        for modulo, num in ((views, 3), (views_async, 2)):
+            for extra in (0, 20):
+                with self.subTest(modulo=modulo.__name__, miembros=8 + extra):
+                    EquipoMiembro.objects.bulk_create(
+                        EquipoMiembro(nombre=f'Extra {i}', rol=EquipoMiembro.ROL_COLABORADOR, orden=10 + i)
+                        for i in range(extra)
+                    )
+                    with self.assertNumQueries(num):
+                        response = self.get(modulo, 'sobre_nosotros_page', '/sobre-nosotros/')
+                    self.assertEqual(response.status_code, 200)
+
+    @mock.patch.dict('os.environ', {'SENDGRID_API_KEY': ''})
+    def test_contacto_sin_sendgrid(self):
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                '/contact/',
+                {'nombre': 'Ana', 'correo': 'ana@gmail.com', 'mensaje': 'Hola'},
+                content_type='application/json',
+            )
+        self.assertEqual(response.json()['email_sent'], False)
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    EDGE_PURGE_BACKEND='proyectos.edge.NullPurgeBackend',
+)
+class QueryPlanTests(TestCase):
+    """``EXPLAIN`` de las consultas calientes del listado.
+
+    Fallan si alguna recorre la tabla completa o si el orden deja de salir del
+    índice.
+    """
+
+    # Marcadores de EXPLAIN por motor: tabla completa y orden fuera del índice.
+    FULL_SCAN = {
+        'sqlite': r'\bSCAN {table}\b(?! USING (COVERING )?INDEX)',
+        'postgresql': r'\bSeq Scan on {table}\b',
+    }
+    SORT = {
+        'sqlite': r'USE TEMP B-TREE FOR ORDER BY',
+        'postgresql': r'^\s*(->\s*)?Sort\b',
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        generar_catalogo(300, imagenes=2)
+
+    def setUp(self):
+        if connection.vendor not in self.FULL_SCAN:
+            self.skipTest(f'Sin marcadores de EXPLAIN para {connection.vendor}.')
+        if connection.vendor == 'postgresql':
+            # Con 300 filas el planner prefiere leer la tabla completa aunque
+            # el índice exista; así solo la elige si no hay índice utilizable.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        self.factory = RequestFactory()
+
+    def params(self, query):
+        return views_api._parse_list_params(self.factory.get('/api/proyectos/?' + query))
+
+    def assertUsesIndex(self, qs, ordered=True):
+        plan = qs.explain()
+        table = re.escape(qs.model._meta.db_table)
+        self.assertIsNone(
+            re.search(self.FULL_SCAN[connection.vendor].format(table=table), plan, re.MULTILINE),
+            f'Recorrido completo de {qs.model._meta.db_table}:\n{plan}',
+        )
+        if ordered:
+            self.assertIsNone(
+                re.search(self.SORT[connection.vendor], plan, re.MULTILINE),
+                f'El orden no sale del índice:\n{plan}',
+            )
+
+    def test_listado_keyset(self):
+        ancla = Proyecto.objects.order_by('-fecha_creacion', '-id')[100]
+        for filtros in ('', '&categoria=residencial', '&sub=tiendas', '&categoria=comercial&sub=tiendas'):
+            for cursor in ('', views_api._encode_cursor(ancla, 'next'), views_api._encode_cursor(ancla, 'prev')):
+                with self.subTest(filtros=filtros, cursor=cursor):
+                    qs, _ = views_api._cursor_queryset(self.params(f'cursor={cursor}{filtros}'))
+                    self.assertUsesIndex(qs)
+
+    def test_listado_paginado_filtrado(self):
+        for filtros in ('categoria=residencial', 'sub=interes-alto', 'categoria=residencial&sub=paisajismo'):
+            with self.subTest(filtros=filtros):
+                qs = views_api._ordered_queryset(self.params(f'{filtros}&page=3'))
+                self.assertUsesIndex(qs[24:36])
+                # El COUNT del paginador tampoco recorre la tabla.
+                self.assertUsesIndex(qs.order_by(), ordered=False)
+
+    def test_primera_pagina_sin_filtros(self):
+        qs = views_api._ordered_queryset(self.params('page=1'))
+        self.assertUsesIndex(qs[:12])
+
+    def test_detalle_y_galeria(self):
+        pk = Proyecto.objects.latest('id').pk
+        self.assertUsesIndex(views_api._detail_queryset(pk), ordered=False)
+        imagenes = Proyecto._meta.get_field('imagenes').related_model.objects
+        self.assertUsesIndex(imagenes.filter(proyecto_id__in=[pk, pk - 1]), ordered=False)
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    EDGE_PURGE_BACKEND='proyectos.edge.NullPurgeBackend',
+)
+class ListadoApiTests(TestCase):
+    """Parámetros de ``/api/proyectos/``: paginación, cursor, filtros y errores."""
+
+    @classmethod
+    def setUpTestData(cls):
+        generar_catalogo(30, imagenes=1)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_page_size_acotado(self):
+        for valor, esperado in (('0', 1), ('-1', 1), ('5', 5), ('100000', views_api.MAX_PAGE_SIZE)):
+            with self.subTest(page_size=valor):
+                response = self.client.get(f'/api/proyectos/?page_size={valor}')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()['page_size'], esperado)
+
+    def test_cursor_recorre_todo_en_ambos_sentidos(self):
+        esperados = list(Proyecto.objects.order_by('-fecha_creacion', '-id').values_list('id', flat=True))
+        paginas, cursor = [], ''
+        while cursor is not None:
+            data = self.client.get('/api/proyectos/', {'cursor': cursor, 'page_size': 7, 'fields': 'id'}).json()
+            paginas.append([p['id'] for p in data['results']])
+            cursor = data['next']
+        self.assertEqual([pk for pagina in paginas for pk in pagina], esperados)
+        self.assertEqual([len(pagina) for pagina in paginas], [7, 7, 7, 7, 2])
+
+        # De la última página hacia atrás, con ``previous``, salen las mismas páginas.
+        hacia_atras, cursor = [], data['previous']
+        while cursor is not None:
+            data = self.client.get('/api/proyectos/', {'cursor': cursor, 'page_size': 7, 'fields': 'id'}).json()
+            hacia_atras.append([p['id'] for p in data['results']])
+            cursor = data['previous']
+        self.assertEqual(hacia_atras[::-1], paginas[:-1])
+
+    def test_cursor_alterado_es_400(self):
+        valido = self.client.get('/api/proyectos/', {'cursor': '', 'page_size': 5}).json()['next']
+        otro = base64.urlsafe_b64encode(b'{"f": "ayer", "i": 1}').decode().rstrip('=')
+        sentido = base64.urlsafe_b64encode(b'{"f": "2026-01-01T00:00:00", "i": 1, "d": "up"}').decode()
+        for cursor in (valido[:-3] + '!!!', 'no-es-un-cursor', otro, sentido.rstrip('=')):
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/api/proyectos/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'ok': False, 'error': 'Cursor inválido.'})
+
+    def test_campos_e_imagenes_desconocidos_son_400(self):
+        response = self.client.get('/api/proyectos/?fields=nombre,precio,color')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'ok': False, 'error': 'Campos desconocidos: color, precio'})
+
+        response = self.client.get('/api/proyectos/?images=todas')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'ok': False, 'error': 'images debe ser cover, all o none.'})
+
+    def test_campos_pedidos(self):
+        data = self.client.get('/api/proyectos/?fields=nombre&page_size=3').json()
+        # ``id`` va siempre.
+        self.assertEqual([sorted(p) for p in data['results']], [['id', 'nombre']] * 3)
+
+    def test_busqueda_sin_palabras(self):
+        # Solo puntuación o espacios: antes ``order_by('-search_rank')`` fallaba.
+        for q in ('!!!', '-', '%20%20'):
+            with self.subTest(q=q):
+                response = self.client.get(f'/api/proyectos/?q={q}')
+                self.assertEqual(response.status_code, 200)
+                if q == '%20%20':
+                    self.assertEqual(response.json()['count'], Proyecto.objects.count())
+                else:
+                    self.assertEqual(response.json()['results'], [])
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    EDGE_PURGE_BACKEND='proyectos.edge.NullPurgeBackend',
+)
+class SearchTests(TestCase):
+    """Parámetro ``q``: FTS5 en SQLite y el respaldo con ``icontains``."""
+
+    @classmethod
+    def setUpTestData(cls):
+        crear = Proyecto.objects.create
+        cls.pergola = crear(nombre='Casa Lomas', descripcion='Terraza con pérgola de madera.', categoria='Residencial')
+        cls.hotel = crear(nombre='Torre Norte', descripcion='Lobby y alberca.', categoria='Hospitalidad')
+        cls.bodega = crear(nombre='Nave 3', descripcion='Bodega con andén de carga.', categoria='Industrial')
+        cls.bodegas = crear(
+            nombre='Bodega Bodega', descripcion='Bodega junto a otra bodega.', categoria='Industrial',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def buscar(self, q):
+        return list(search.search(Proyecto.objects.all(), q).order_by('-search_rank', 'id'))
+
+    def api(self, q):
+        response = self.client.get('/api/proyectos/', {'q': q, 'fields': 'id'})
+        self.assertEqual(response.status_code, 200)
+        return [p['id'] for p in response.json()['results']]
+
+    @skipUnless(connection.vendor == 'sqlite', 'FTS5 solo aplica en SQLite')
+    def test_fts5(self):
+        self.assertTrue(search._sqlite_fts_ready(connection))
+        # Solo en la descripción, sin acento y como prefijo.
+        self.assertEqual(self.api('pergola'), [self.pergola.pk])
+        self.assertEqual(self.api('PÉRGOLA madera'), [self.pergola.pk])
+        # Solo en la categoría.
+        self.assertEqual(self.api('hospital'), [self.hotel.pk])
+        # Comillas o asteriscos sueltos no son sintaxis FTS5.
+        self.assertEqual(self.api('"bodega*'), [self.bodegas.pk, self.bodega.pk])
+
+    @skipUnless(connection.vendor == 'sqlite', 'FTS5 solo aplica en SQLite')
+    def test_fts5_ordena_por_relevancia(self):
+        resultados = self.buscar('bodega')
+        self.assertEqual(resultados, [self.bodegas, self.bodega])
+        self.assertGreater(resultados[0].search_rank, resultados[1].search_rank)
+
+    @skipUnless(connection.vendor == 'sqlite', 'FTS5 solo aplica en SQLite')
+    def test_fts5_sigue_a_updates_y_deletes(self):
+        self.pergola.descripcion = 'Fachada de concreto aparente.'
+        self.pergola.save()
+        self.assertEqual(self.buscar('pergola'), [])
+        self.assertEqual(self.buscar('concreto'), [self.pergola])
+
+        Proyecto.objects.filter(pk=self.hotel.pk).update(nombre='Torre Sur')
+        self.assertEqual(self.buscar('sur'), [self.hotel])
+        self.assertEqual(self.buscar('norte'), [])
+
+        self.hotel.delete()
+        self.assertEqual(self.buscar('hospitalidad'), [])
+
+    def test_respaldo_icontains(self):
+        with mock.patch.dict(search._fts_available, {connection.alias: False}):
+            self.assertEqual(self.api('pérgola'), [self.pergola.pk])
+            self.assertEqual(self.api('hospital'), [self.hotel.pk])
+            self.assertEqual(self.api('bodega'), [self.bodegas.pk, self.bodega.pk])
+            self.assertEqual(self.api('ladrillo'), [])
+
+
+@skipUnless('orjson' in encoders.BACKENDS, 'orjson no está instalado')
+@override_settings(
+    CACHES=TEST_CACHES,
+    EDGE_PURGE_BACKEND='proyectos.edge.NullPurgeBackend',
+)
+class EncoderTests(TestCase):
+    """``encoders.dumps``: orjson produce el mismo JSON que la stdlib y que la vista anterior."""
+
+    @classmethod
+    def setUpTestData(cls):
+        generar_catalogo(5, imagenes=2)
+
+    def payload(self):
+        request = RequestFactory().get('/api/proyectos/?images=all')
+        data = views_api._build_list_payload(request, views_api._parse_list_params(request))
+        data['extra'] = {
+            'nombre': 'Casa Ñandú — «Mérida» 🏠',
+            'texto': 'Línea "1"\nLínea \\2\t\u2028fin',
+            'precio': decimal.Decimal('1234.50'),
+            'fecha': datetime.date(2026, 3, 1),
+            'creado': datetime.datetime(2026, 3, 1, 12, 30, 5, 123456, tzinfo=datetime.timezone.utc),
+            'vacio': None,
+            'medidas': [0.1, 1.5, -3, True, False],
+        }
+        return data
+
+    def legado(self, data):
+        # Como respondía la vista antes: DjangoJSONEncoder con las fechas ya
+        # pasadas por isoformat() (ver scripts/benchmark_json.py).
+        def isoformat(obj):
+            if isinstance(obj, dict):
+                return {k: isoformat(v) for k, v in obj.items()}
+            if isinstance(obj, list):
+                return [isoformat(v) for v in obj]
+            if isinstance(obj, datetime.datetime):
+                return obj.isoformat()
+            return obj
+
+        return json.dumps(isoformat(data), cls=DjangoJSONEncoder)
+
+    def test_mismos_bytes_que_la_stdlib(self):
+        data = self.payload()
+        self.assertEqual(encoders.BACKENDS['orjson'](data), encoders.BACKENDS['stdlib'](data))
+
+    def test_mismo_json_que_la_vista_anterior(self):
+        data = self.payload()
+        self.assertIsInstance(data['results'][0]['fecha_creacion'], datetime.datetime)
+        self.assertEqual(json.loads(encoders.BACKENDS['orjson'](data)), json.loads(self.legado(data)))
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    EDGE_PURGE_BACKEND='proyectos.edge.NullPurgeBackend',
+)
+class CompressionTests(TestCase):
+    """``CompressionMiddleware``: codificación negociada y variantes en cache."""
+
+    @classmethod
+    def setUpTestData(cls):
+        generar_catalogo(30, imagenes=1)
+
+    def setUp(self):
+        cache.clear()
+        caches['compressed'].clear()
+
+    def test_variantes_en_su_propio_cache(self):
+        response = self.client.get('/api/proyectos/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        claves = list(caches['compressed']._cache)
+        self.assertEqual(len(claves), 1)
+        self.assertIn('proyectos:compressed:gzip:', claves[0])
+        self.assertFalse([k for k in cache._cache if 'proyectos:compressed:' in k])
+
+    @skipUnless(compression.brotli, 'brotli no está instalado')
+    def test_variante_brotli(self):
+        identidad = self.client.get('/api/proyectos/').content
+        response = self.client.get('/api/proyectos/', HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(compression.brotli.decompress(response.content), identidad)
+        claves = list(caches['compressed']._cache)
+        self.assertEqual(len(claves), 1)
+        self.assertIn('proyectos:compressed:br:', claves[0])
+
+        # La segunda petición sale del cache de variantes.
+        with mock.patch.object(compression.brotli, 'compress') as compress:
+            self.assertEqual(self.client.get('/api/proyectos/', HTTP_ACCEPT_ENCODING='br').content, response.content)
+        compress.assert_not_called()
+
+    def comprimir(self, response, accept_encoding):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda r: response).process_response(request, response)
+
+    def json_grande(self, **headers):
+        response = HttpResponse(b'{"a": "' + b'x' * 4096 + b'"}', content_type='application/json')
+        for nombre, valor in headers.items():
+            response.headers[nombre] = valor
+        return response
+
+    def test_negociacion(self):
+        for accept, esperado in (
+            ('gzip', 'gzip'),
+            ('gzip;q=0.5, identity', 'gzip'),
+            ('gzip;q=0', None),
+            ('', None),
+            ('compress', None),
+        ):
+            with self.subTest(accept=accept):
+                response = self.comprimir(self.json_grande(), accept)
+                self.assertEqual(response.get('Content-Encoding'), esperado)
+                self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_respuestas_chicas_o_binarias_no_se_tocan(self):
+        chica = HttpResponse(b'{}', content_type='application/json')
+        imagen = HttpResponse(b'x' * 4096, content_type='image/png')
+        for response in (chica, imagen):
+            response = self.comprimir(response, 'gzip')
+            self.assertNotIn('Content-Encoding', response)
+            self.assertFalse(response.has_header('Vary'))
+
+    def test_etag_fuerte_pasa_a_debil(self):
+        response = self.comprimir(self.json_grande(ETag='"abc"'), 'gzip')
+        self.assertEqual(response['ETag'], 'W/"abc"')
+
+    def test_respuestas_privadas_no_se_cachean(self):
+        # Por visitante: gzip con relleno aleatorio (BREACH), nunca en el cache.
+        original = self.json_grande().content
+        response = self.comprimir(self.json_grande(**{'Cache-Control': 'private'}), 'gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), original)
+        self.assertEqual(list(caches['compressed']._cache), [])
+
+        response = self.json_grande()
+        response.set_cookie('csrftoken', 'x')
+        self.comprimir(response, 'gzip')
+        self.assertEqual(list(caches['compressed']._cache), [])
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    EDGE_PURGE_BACKEND='proyectos.edge.NullPurgeBackend',
+)
+class CatalogoCondicionalTests(TestCase):
+    """GET condicional del listado: 304 mientras el catálogo no cambia."""
+
+    @classmethod
+    def setUpTestData(cls):
+        generar_catalogo(20, imagenes=1)
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_304_con_etag_o_fecha(self):
+        response = self.client.get('/api/proyectos/')
+        self.assertEqual(response.status_code, 200)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        response = self.client.get('/api/proyectos/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        response = self.client.get('/api/proyectos/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_parametros_invalidos_sin_validadores(self):
+        etag = self.client.get('/api/proyectos/')['ETag']
+        factory = RequestFactory()
+        for modulo in (views_api, views_async):
+            for query in ('cursor=no-es-un-cursor', 'fields=precio', 'images=todas'):
+                with self.subTest(modulo=modulo.__name__, query=query):
+                    request = factory.get('/api/proyectos/?' + query, HTTP_IF_NONE_MATCH=etag)
+                    if modulo is views_async:
+                        response = async_to_sync(modulo.proyectos_list)(request)
+                    else:
+                        response = modulo.proyectos_list(request)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertFalse(response.has_header('ETag'))
+                    self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_detalle_inexistente_sin_validadores(self):
+        etag = self.client.get('/api/proyectos/')['ETag']
+        pk = Proyecto.objects.latest('id').pk
+        factory = RequestFactory()
+        for modulo in (views_api, views_async):
+            vista = modulo.proyecto_detail
+            if modulo is views_async:
+                vista = async_to_sync(vista)
+            with self.subTest(modulo=modulo.__name__):
+                response = vista(factory.get(f'/api/proyectos/{pk}/', HTTP_IF_NONE_MATCH=etag), pk=pk)
+                self.assertEqual(response.status_code, 304)
+
+                response = vista(factory.get(f'/api/proyectos/{pk + 1}/', HTTP_IF_NONE_MATCH=etag), pk=pk + 1)
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(json.loads(response.content), {'ok': False, 'error': 'Proyecto no encontrado.'})
+                self.assertFalse(response.has_header('ETag'))
+                self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_200_despues_de_guardar_en_el_admin(self):
+        etag = self.client.get('/api/proyectos/')['ETag']
+        proyecto = Proyecto.objects.order_by('-fecha_creacion', '-id').first()
+
+        self.client.force_login(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/admin/proyectos/proyecto/{proyecto.pk}/change/', {
+                'nombre': 'Casa renombrada',
+                'descripcion': proyecto.descripcion,
+                'categoria': proyecto.categoria,
+                'subcategoria': proyecto.subcategoria,
+                'imagenes-TOTAL_FORMS': '0',
+                'imagenes-INITIAL_FORMS': '0',
+                'imagenes-MIN_NUM_FORMS': '0',
+                'imagenes-MAX_NUM_FORMS': '1000',
+            })
+        self.assertEqual(response.status_code, 302)
+        self.client.logout()
+
+        response = self.client.get('/api/proyectos/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['results'][0]['nombre'], 'Casa renombrada')
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    EDGE_PURGE_BACKEND='proyectos.edge.NullPurgeBackend',
+)
+class SnapshotTests(TestCase):
+    """Snapshot del catálogo completo (``page_size=1000``) y sus variantes comprimidas."""
+
+    URL = '/api/proyectos/?page_size=1000'
+
+    @classmethod
+    def setUpTestData(cls):
+        generar_catalogo(30, imagenes=1)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cuerpo_del_snapshot(self):
+        response = self.client.get(self.URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Content-Encoding', response)
+        data = response.json()
+        self.assertEqual(data['count'], 30)
+        esperados = list(Proyecto.objects.order_by('-fecha_creacion', '-id').values_list('id', flat=True))
+        self.assertEqual([p['id'] for p in data['results']], esperados)
+        self.assertEqual(set(data['results'][0]), set(views_api._LIST_FIELDS))
+
+        # Ya construido: se sirve sin consultas.
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.URL).content, response.content)
+
+    def test_variante_gzip(self):
+        identidad = self.client.get(self.URL).content
+        response = self.client.get(self.URL, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertEqual(gzip.decompress(response.content), identidad)
+
+    @skipUnless(compression.brotli, 'brotli no está instalado')
+    def test_variante_brotli(self):
+        identidad = self.client.get(self.URL).content
+        snapshot = cache.get(catalog_cache_key('snapshot', 'http://testserver/'))
+        self.assertEqual(set(snapshot), {'identity', 'gzip', 'br'})
+
+        response = self.client.get(self.URL, HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertEqual(compression.brotli.decompress(response.content), identidad)
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    EDGE_PURGE_BACKEND='proyectos.edge.NullPurgeBackend',
+)
+class SlugTests(TestCase):
+    """``categoria_slug``/``subcategoria_slug``: cálculo al guardar, filtros, facets y migración 0008."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_slug_etiqueta(self):
+        for valor, esperado in (
+            ('Interés  Medio', 'interes-medio'),
+            (' RESIDENCIAL ', 'residencial'),
+            ('Baños y cocinas', 'banos-y-cocinas'),
+            (None, ''),
+        ):
+            with self.subTest(valor=valor):
+                self.assertEqual(slug_etiqueta(valor), esperado)
+
+    def test_se_actualizan_al_guardar(self):
+        proyecto = Proyecto.objects.create(nombre='Casa', categoria='Comercial', subcategoria='Tiendas Ancla')
+        self.assertEqual((proyecto.categoria_slug, proyecto.subcategoria_slug), ('comercial', 'tiendas-ancla'))
+
+        proyecto.categoria = 'Residencial'
+        proyecto.save(update_fields=['categoria'])
+        proyecto.refresh_from_db()
+        self.assertEqual(proyecto.categoria_slug, 'residencial')
+
+    def test_variantes_de_escritura_filtran_igual(self):
+        # Mismo slug para todas las formas de escribir la etiqueta: un solo filtro.
+        for categoria in ('Interés Alto', 'interes alto', 'INTERÉS  ALTO'):
+            Proyecto.objects.create(nombre=categoria, categoria=categoria)
+        Proyecto.objects.create(nombre='Otra', categoria='Interés Medio')
+        self.assertEqual(set(Proyecto.objects.values_list('categoria_slug', flat=True)), {'interes-alto', 'interes-medio'})
+        for filtro in ('interes-alto', 'Interés Alto'):
+            with self.subTest(filtro=filtro):
+                data = self.client.get('/api/proyectos/', {'categoria': filtro}).json()
+                self.assertEqual(data['count'], 3)
+
+    def test_arbol_de_facets(self):
+        for categoria, subcategoria, n in (
+            ('Residencial', 'Interés Alto', 2),
+            ('residencial', 'interes alto', 1),
+            ('Residencial', 'Interés Medio', 1),
+            ('Residencial', '', 1),
+            ('Comercial', 'Tiendas', 3),
+            ('', '', 1),
+        ):
+            for i in range(n):
+                Proyecto.objects.create(nombre=f'{categoria}{i}', categoria=categoria, subcategoria=subcategoria)
+
+        data = self.client.get('/api/proyectos/facets/').json()
+        self.assertEqual(data, {
+            'count': 9,
+            'categorias': [
+                {'slug': 'comercial', 'label': 'Comercial', 'count': 3, 'subcategorias': [
+                    {'slug': 'tiendas', 'label': 'Tiendas', 'count': 3},
+                ]},
+                # Las variantes de escritura se juntan; gana la capitalizada.
+                {'slug': 'residencial', 'label': 'Residencial', 'count': 5, 'subcategorias': [
+                    {'slug': 'interes-alto', 'label': 'Interés Alto', 'count': 3},
+                    {'slug': 'interes-medio', 'label': 'Interés Medio', 'count': 1},
+                ]},
+            ],
+        })
+
+    def test_migracion_rellena_los_slugs(self):
+        migracion = importlib.import_module('proyectos.migrations.0008_backfill_proyecto_slugs')
+        Proyecto.objects.bulk_create(
+            Proyecto(nombre=f'p{i}', categoria='Interés Social', subcategoria=f'Fase {i}') for i in range(3)
+        )
+        Proyecto.objects.update(categoria_slug='', subcategoria_slug='')
+
+        migracion.rellenar_slugs(django_apps, None)
+        self.assertEqual(
+            sorted(Proyecto.objects.values_list('categoria_slug', 'subcategoria_slug')),
+            [('interes-social', f'fase-{i}') for i in range(3)],
+        )
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    EDGE_PURGE_BACKEND='proyectos.edge.LoggingPurgeBackend',
+    EDGE_CACHE_S_MAXAGE=300,
+    EDGE_SURROGATE_KEY_HEADER='Surrogate-Key',
+)
+class EdgeCacheTests(TestCase):
+    """``Surrogate-Key``/``Cache-Control`` de las vistas públicas y purga al guardar."""
+
+    @classmethod
+    def setUpTestData(cls):
+        generar_catalogo(20, imagenes=1)
+        EquipoSeccion.objects.create()
+        cls.proyecto = Proyecto.objects.order_by('id').first()
+
+    def setUp(self):
+        cache.clear()
+        # Lo que agendó setUpTestData nunca llega a un commit.
+        edge._pending.keys = set()
+
+    def test_etiquetas_por_vista(self):
+        for url, etiquetas in (
+            ('/api/proyectos/', 'catalog'),
+            ('/api/proyectos/facets/', 'catalog'),
+            (f'/api/proyectos/{self.proyecto.pk}/', f'project:{self.proyecto.pk}'),
+            ('/sobre-nosotros/', 'team'),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['Surrogate-Key'], etiquetas)
+                cache_control = response['Cache-Control']
+                for directiva in ('public', 'max-age=0', 's-maxage=300', 'stale-while-revalidate='):
+                    self.assertIn(directiva, cache_control)
+
+    def test_errores_y_respuestas_personalizadas_no_se_comparten(self):
+        response = self.client.get('/api/proyectos/999999/')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('Surrogate-Key', response)
+
+        response = HttpResponse('hola')
+        response.set_cookie('csrftoken', 'x')
+        response = edge.apply_edge_cache(response, ['home'])
+        self.assertNotIn('Surrogate-Key', response)
+        self.assertFalse(response.has_header('Cache-Control'))
+
+    def test_purga_al_guardar_una_sola_vez(self):
+        pk = self.proyecto.pk
+        with self.assertLogs('proyectos.edge', 'INFO') as logs:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    self.proyecto.nombre = 'Otra'
+                    self.proyecto.save()
+                    self.proyecto.imagenes.first().delete()
+                    EquipoSeccion.objects.update(activo=False)  # update(): sin señales
+        self.assertEqual(logs.output, [f'INFO:proyectos.edge:Purga de edge cache: catalog project:{pk}'])
+
+        with self.assertLogs('proyectos.edge', 'INFO') as logs:
+            with self.captureOnCommitCallbacks(execute=True):
+                EquipoSeccion.objects.get().save()
+        self.assertEqual(logs.output, ['INFO:proyectos.edge:Purga de edge cache: team'])
+
+    def test_sin_commit_no_hay_purga(self):
+        with self.assertNoLogs('proyectos.edge', 'INFO'):
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertRaises(DatabaseError), transaction.atomic():
+                    self.proyecto.save()
+                    raise DatabaseError('rollback')
+
+
+class ServerTimingTests(TestCase):
+    """Cabecera ``Server-Timing``, log por petición y aviso de presupuesto de consultas."""
+
+    @staticmethod
+    def vista(consultas):
+        def vista(request):
+            for _ in range(consultas):
+                Proyecto.objects.exists()
+            return HttpResponse('ok')
+        return vista
+
+    def pedir(self, vista):
+        request = RequestFactory().get('/prueba/')
+        request.resolver_match = ResolverMatch(vista, (), {}, url_name='prueba', route='prueba/')
+        return ServerTimingMiddleware(vista)(request)
+
+    @override_settings(SERVER_TIMING_HEADER=True)
+    def test_cabecera_con_consultas_y_tiempos(self):
+        with self.assertLogs('proyectos.timing', 'INFO') as logs:
+            response = self.pedir(self.vista(3))
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^db;dur=\d+\.\d;desc="3 queries", tpl;dur=\d+\.\d, total;dur=\d+\.\d$',
+        )
+        self.assertIn('view=prueba', logs.output[0])
+        self.assertIn('queries=3', logs.output[0])
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_sin_cabecera_sigue_el_log(self):
+        with self.assertLogs('proyectos.timing', 'INFO') as logs:
+            response = self.pedir(self.vista(1))
+        self.assertNotIn('Server-Timing', response)
+        self.assertIn('queries=1', logs.output[0])
+
+    @override_settings(SERVER_TIMING_QUERY_BUDGET=2)
+    def test_aviso_al_pasarse_del_presupuesto(self):
+        with self.assertLogs('proyectos.timing', 'WARNING') as logs:
+            self.pedir(self.vista(3))
+        self.assertEqual(logs.output, [
+            'WARNING:proyectos.timing:Presupuesto de consultas excedido: '
+            'view=prueba path=/prueba/ queries=3 budget=2',
+        ])
+
+        with self.assertNoLogs('proyectos.timing', 'WARNING'):
+            self.pedir(self.vista(2))
+            # ``@query_budget`` cambia el límite de una sola vista.
+            self.pedir(query_budget(5)(self.vista(4)))
+
+
+@override_settings(METRICS_TOKEN='secreto')
+class MetricsTests(TestCase):
+    """``/metrics`` solo responde con el token de ``METRICS_TOKEN``."""
+
+    def test_sin_token_401(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer')
+        self.assertEqual(response.json(), {'ok': False, 'error': 'No autorizado.'})
+
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer otro')
+        self.assertEqual(response.status_code, 401)
+
+    def test_token_no_ascii_401(self):
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer contraseña')
+        self.assertEqual(response.status_code, 401)
+
+    def test_con_token_200(self):
+        self.client.get('/api/proyectos/')
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'route="api/proyectos/"', response.content)
+
+    @override_settings(METRICS_TOKEN='', DEBUG=False)
+    def test_sin_token_configurado_solo_en_debug(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+
+
+@override_settings(CACHES=TEST_CACHES, EDGE_PURGE_BACKEND='proyectos.edge.NullPurgeBackend')
+class GenerateCatalogTests(TestCase):
+    """``generate_catalog``: la misma semilla da el mismo catálogo."""
+
+    def catalogo(self, *args, **opciones):
+        call_command(
+            'generate_catalog', *args, proyectos=25, imagenes=2, contactos=10, reemplazar=True,
+            stdout=StringIO(), **opciones,
+        )
+        return (
+            list(Proyecto.objects.order_by('fecha_creacion', 'nombre').values_list(
+                'nombre', 'descripcion', 'categoria', 'subcategoria', 'imagen', 'imagen_url', 'fecha_creacion',
+            )),
+            list(ProyectoImagen.objects.order_by('imagen').values_list('proyecto__nombre', 'imagen', 'orden', 'creado')),
+            list(Contacto.objects.order_by('email').values_list('nombre', 'email', 'proyecto', 'fecha_envio')),
+        )
+
+    def test_misma_semilla_mismo_catalogo(self):
+        primero = self.catalogo(seed=7)
+        self.assertEqual(len(primero[0]), 25)
+        self.assertEqual(len(primero[1]), 50)
+        self.assertEqual(len(primero[2]), 10)
+        self.assertEqual(self.catalogo(seed=7), primero)
+        # Sin importar el tamaño de lote.
+        self.assertEqual(self.catalogo(seed=7, batch_size=4), primero)
+        self.assertNotEqual(self.catalogo(seed=8), primero)
+
+    def test_fechas_hasta(self):
+        proyectos = self.catalogo('--hasta=2020-06-01', seed=7, anios=1)[0]
+        fechas = [p[-1] for p in proyectos]
+        hasta = datetime.datetime(2020, 6, 1, tzinfo=datetime.timezone.utc)
+        self.assertLessEqual(fechas[-1], hasta)
+        self.assertGreater(fechas[0], hasta - datetime.timedelta(days=365))
+
+        with self.assertRaises(CommandError):
+            call_command('generate_catalog', '--hasta=ayer', proyectos=1, stdout=StringIO())
+
+
+def imagen_png(ancho, alto, nombre='prueba.png'):
+    buffer = BytesIO()
+    Image.new('RGB', (ancho, alto), (180, 120, 60)).save(buffer, format='PNG')
+    return ContentFile(buffer.getvalue(), name=nombre)
+
+
+def media_temporal(test):
+    media = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, media, ignore_errors=True)
+    ajustes = override_settings(MEDIA_ROOT=media)
+    ajustes.enable()
+    test.addCleanup(ajustes.disable)
+    return Path(media)
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    EDGE_PURGE_BACKEND='proyectos.edge.NullPurgeBackend',
+    IMAGE_RENDITION_WIDTHS=[320, 640, 1280],
+    IMAGE_RENDITION_FORMATS=['webp'],
+)
+class RenditionTests(TestCase):
+    """Versiones WebP/AVIF generadas al guardar, su ``srcset`` y los datos de carga."""
+
+    def setUp(self):
+        self.media = media_temporal(self)
+        self.proyecto = Proyecto.objects.create(nombre='Casa', categoria='Residencial', subcategoria='interes alto')
+
+    def crear_imagen(self, ancho=1000, alto=500):
+        return ProyectoImagen.objects.create(proyecto=self.proyecto, imagen=imagen_png(ancho, alto))
+
+    def test_genera_anchos_sin_agrandar(self):
+        imagen = self.crear_imagen()
+        rendiciones = list(imagen.rendiciones.order_by('ancho'))
+        # 1280 es mayor que el original: se usa el ancho del original.
+        self.assertEqual([(r.ancho, r.alto) for r in rendiciones], [(320, 160), (640, 320), (1000, 500)])
+        for rendicion in rendiciones:
+            self.assertEqual(rendicion.formato, 'webp')
+            self.assertTrue((self.media / rendicion.archivo.name).exists())
+        self.assertEqual([ancho for _, ancho in imagen.imagen_srcset['webp']], [320, 640, 1000])
+
+    def test_guarda_medidas_color_y_lqip(self):
+        imagen = self.crear_imagen()
+        self.assertEqual((imagen.imagen_ancho, imagen.imagen_alto), (1000, 500))
+        self.assertEqual(imagen.imagen_color, '#b4783c')
+        self.assertTrue(imagen.imagen_lqip.startswith('data:image/'))
+        self.assertLess(len(imagen.imagen_lqip), 1000)
+
+    def test_srcset_en_la_api(self):
+        imagen = self.crear_imagen()
+        with self.captureOnCommitCallbacks(execute=True):
+            data = self.client.get(f'/api/proyectos/{self.proyecto.pk}/').json()
+        portada = data['imagenes'][0]
+        self.assertEqual((portada['ancho'], portada['alto'], portada['color']), (1000, 500, '#b4783c'))
+        self.assertEqual(portada['lqip'], imagen.imagen_lqip)
+        srcset = portada['srcset']['webp']
+        self.assertEqual(srcset.count('w,'), 2)
+        self.assertIn(f'{imagen.rendiciones.get(ancho=320).url} 320w', srcset)
+
+    def test_no_regenera_si_la_imagen_no_cambia(self):
+        imagen = self.crear_imagen()
+        ids = set(imagen.rendiciones.values_list('id', flat=True))
+        imagen = ProyectoImagen.objects.get(pk=imagen.pk)
+        imagen.orden = 3
+        imagen.save()
+        self.assertEqual(set(imagen.rendiciones.values_list('id', flat=True)), ids)
+
+        imagen.imagen = imagen_png(400, 400, 'otra.png')
+        with self.captureOnCommitCallbacks(execute=True):
+            imagen.save()
+        self.assertEqual(list(imagen.rendiciones.values_list('ancho', flat=True)), [320, 400])
+        self.assertFalse(Rendicion.objects.filter(id__in=ids).exists())
+
+    def test_borrar_la_imagen_borra_los_archivos(self):
+        imagen = self.crear_imagen()
+        archivos = [self.media / r.archivo.name for r in imagen.rendiciones.all()]
+        with self.captureOnCommitCallbacks(execute=True):
+            imagen.delete()
+        self.assertFalse(Rendicion.objects.exists())
+        self.assertFalse(any(archivo.exists() for archivo in archivos))
+
+    def test_guardado_fallido_no_deja_versiones(self):
+        imagen = ProyectoImagen(proyecto=self.proyecto, imagen=imagen_png(1000, 500))
+        with mock.patch.object(Rendicion.objects, 'bulk_create', side_effect=DatabaseError('falla')):
+            with self.assertRaises(DatabaseError):
+                imagen.save()
+        self.assertFalse(ProyectoImagen.objects.exists())
+        # Solo queda el original, que se sube antes de guardar como en FileField.
+        archivos = [p.relative_to(self.media).as_posix() for p in self.media.rglob('*') if p.is_file()]
+        self.assertEqual(archivos, [imagen.imagen.name])
+
+    def test_archivo_ilegible_queda_sin_srcset(self):
+        with self.assertLogs('proyectos.renditions', 'WARNING'):
+            imagen = ProyectoImagen.objects.create(
+                proyecto=self.proyecto, imagen=ContentFile(b'no es imagen', name='rota.png'),
+            )
+        self.assertEqual(imagen.imagen_srcset, {})
+        self.assertIsNone(imagen.imagen_ancho)
+        self.assertFalse(imagen.rendiciones.exists())
+
+    def test_generate_placeholders_completa_las_que_faltan(self):
+        # bulk_create no pasa por save(): sin medidas ni LQIP.
+        nombre = default_storage.save('proyectos/previa.png', imagen_png(300, 600))
+        ProyectoImagen.objects.bulk_create([ProyectoImagen(proyecto=self.proyecto, imagen=nombre)])
+        call_command('generate_placeholders', stdout=StringIO())
+        imagen = ProyectoImagen.objects.get(imagen=nombre)
+        self.assertEqual((imagen.imagen_ancho, imagen.imagen_alto), (300, 600))
+        self.assertTrue(imagen.imagen_lqip)
+        self.assertFalse(imagen.rendiciones.exists())
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    EDGE_PURGE_BACKEND='proyectos.edge.NullPurgeBackend',
+    IMAGE_RENDITION_FORMATS=[],
+)
+class ImagenUrlTests(TestCase):
+    """``imagen_url`` precalculada al guardar y usada por la API sin pasar por el storage."""
+
+    def setUp(self):
+        self.media = media_temporal(self)
+        cache.clear()
+        self.proyecto = Proyecto.objects.create(nombre='Casa', categoria='Residencial')
+
+    def test_se_calcula_con_el_nombre_final(self):
+        imagen = ProyectoImagen.objects.create(proyecto=self.proyecto, imagen=imagen_png(40, 30, 'casa.png'))
+        self.assertEqual(imagen.imagen_url, f'/media/{imagen.imagen.name}')
+        # Mismo nombre de subida, otro contenido: la URL sigue al nombre que eligió el storage.
+        otra = ProyectoImagen.objects.create(proyecto=self.proyecto, imagen=imagen_png(30, 40, 'casa.png'))
+        self.assertNotEqual(otra.imagen.name, imagen.imagen.name)
+        self.assertEqual(otra.imagen_url, f'/media/{otra.imagen.name}')
+
+    def test_sobrevive_a_otros_guardados(self):
+        imagen = ProyectoImagen.objects.create(proyecto=self.proyecto, imagen=imagen_png(40, 30))
+        url = imagen.imagen_url
+
+        imagen = ProyectoImagen.objects.get(pk=imagen.pk)
+        imagen.orden = 2
+        imagen.save(update_fields=['orden'])
+        imagen = ProyectoImagen.objects.only('id', 'proyecto', 'orden').get(pk=imagen.pk)
+        imagen.orden = 3
+        imagen.save(update_fields=['orden'])
+        self.assertEqual(ProyectoImagen.objects.get(pk=imagen.pk).imagen_url, url)
+
+        imagen = ProyectoImagen.objects.get(pk=imagen.pk)
+        imagen.imagen = imagen_png(20, 20, 'nueva.png')
+        imagen.save(update_fields=['imagen'])
+        imagen.refresh_from_db()
+        self.assertEqual(imagen.imagen_url, f'/media/{imagen.imagen.name}')
+        self.assertNotEqual(imagen.imagen_url, url)
+
+    def test_quitar_la_imagen_la_vacia(self):
+        self.proyecto.imagen = imagen_png(40, 30)
+        self.proyecto.save()
+        self.assertTrue(self.proyecto.imagen_url)
+        self.proyecto.imagen = None
+        self.proyecto.save()
+        self.proyecto.refresh_from_db()
+        self.assertEqual(self.proyecto.imagen_url, '')
+
+    def test_la_api_no_llama_al_storage(self):
+        imagen = ProyectoImagen.objects.create(proyecto=self.proyecto, imagen=imagen_png(40, 30))
+        with mock.patch.object(type(default_storage._wrapped), 'url', side_effect=AssertionError('storage.url')):
+            data = self.client.get('/api/proyectos/?images=all').json()
+        self.assertEqual(data['results'][0]['imagenes'][0]['imagen'], f'http://testserver{imagen.imagen_url}')
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    EDGE_PURGE_BACKEND='proyectos.edge.NullPurgeBackend',
+    IMAGE_RENDITION_FORMATS=[],
+    STORAGES={**settings.STORAGES, 'default': {'BACKEND': 'proyectos.storage.ContentAddressedStorage'}},
+)
+class BlobTests(TestCase):
+    """Storage direccionado por contenido y conteo de referencias de ``Blob``."""
+
+    def setUp(self):
+        self.media = media_temporal(self)
+        self.proyecto = Proyecto.objects.create(nombre='Casa', categoria='Residencial', subcategoria='interes alto')
+
+    def referencias(self, nombre):
+        return Blob.objects.get(nombre=nombre).referencias
+
+    def test_mismo_contenido_un_solo_archivo(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            imagen = ProyectoImagen.objects.create(proyecto=self.proyecto, imagen=imagen_png(40, 30, 'spx1.webp'))
+            miembro = EquipoMiembro.objects.create(
+                nombre='Ana', rol=EquipoMiembro.ROL_ARQUITECTO, imagen=imagen_png(40, 30, 'ana.webp'),
+            )
+            seccion = EquipoSeccion.objects.create(imagen_grupal=imagen_png(40, 30, 'grupo.webp'))
+        nombre = imagen.imagen.name
+        self.assertRegex(nombre, r'^blobs/[0-9a-f]{2}/[0-9a-f]{64}\.webp$')
+        self.assertEqual({miembro.imagen.name, seccion.imagen_grupal.name}, {nombre})
+        self.assertEqual(len([p for p in self.media.rglob('*') if p.is_file()]), 1)
+        self.assertEqual(self.referencias(nombre), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            imagen.delete()
+            seccion.delete()
+        self.assertEqual(self.referencias(nombre), 1)
+        self.assertTrue((self.media / nombre).exists())
+
+        # Cambiar el archivo suelta el anterior; sin referencias se borra.
+        miembro = EquipoMiembro.objects.get(pk=miembro.pk)
+        miembro.imagen = imagen_png(10, 10, 'otra.webp')
+        with self.captureOnCommitCallbacks(execute=True):
+            miembro.save()
+        self.assertFalse(Blob.objects.filter(nombre=nombre).exists())
+        self.assertFalse((self.media / nombre).exists())
+        self.assertEqual(self.referencias(miembro.imagen.name), 1)
+
+    def test_guardar_sin_cambiar_el_archivo_no_cuenta(self):
+        miembro = EquipoMiembro.objects.create(
+            nombre='Ana', rol=EquipoMiembro.ROL_ARQUITECTO, imagen=imagen_png(40, 30, 'ana.webp'),
+        )
+        miembro = EquipoMiembro.objects.get(pk=miembro.pk)
+        miembro.orden = 4
+        miembro.save()
+        self.assertEqual(self.referencias(miembro.imagen.name), 1)
+
+    def test_videos_conservan_su_nombre(self):
+        seccion = HomePageConfig.objects.create(carcon_video_file=ContentFile(b'\x00' * 64, name='promo.mp4'))
+        self.assertEqual(seccion.carcon_video_file.name, 'videos/promo.mp4')
+        self.assertFalse(Blob.objects.exists())
+
+    def test_dedupe_media_junta_las_copias(self):
+        originales = []
+        for nombre in ('proyectos/01.webp', 'proyectos/01_4sORcRa.webp'):
+            ruta = self.media / nombre
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            ruta.write_bytes(imagen_png(40, 30).read())
+            originales.append(ruta)
+        ProyectoImagen.objects.bulk_create(
+            ProyectoImagen(proyecto=self.proyecto, imagen=ruta.relative_to(self.media).as_posix())
+            for ruta in originales
+        )
+
+        out = StringIO()
+        call_command('dedupe_media', stdout=out)
+        self.assertIn('2 archivos en uso, 1 distintos', out.getvalue())
+        self.assertTrue(all(ruta.exists() for ruta in originales))
+
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command('dedupe_media', aplicar=True, stdout=out)
+        self.assertIn('Se borrará: proyectos/01_4sORcRa.webp', out.getvalue())
+        self.assertTrue(all(ruta.exists() for ruta in originales))
+
+        call_command('dedupe_media', aplicar=True, yes=True, stdout=StringIO())
+        nombres = set(ProyectoImagen.objects.values_list('imagen', flat=True))
+        self.assertEqual(len(nombres), 1)
+        nombre = nombres.pop()
+        self.assertEqual(self.referencias(nombre), 2)
+        self.assertEqual(set(ProyectoImagen.objects.values_list('imagen_url', flat=True)), {f'/media/{nombre}'})
+        self.assertFalse(any(ruta.exists() for ruta in originales))
+
+
+@override_settings(IMAGE_RESIZE_SIZES=('*',), IMAGE_RESIZE_MAX_DIMENSION=1000)
+class ResizeTests(TestCase):
+    """``/img/<ancho>x<alto>/<ruta>`` y su cache en disco."""
+
+    def setUp(self):
+        self.media = media_temporal(self)
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        ajustes = override_settings(IMAGE_RESIZE_CACHE_DIR=cache_dir)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.cache_dir = Path(cache_dir)
+        (self.media / 'proyectos').mkdir()
+        (self.media / 'proyectos' / 'casa.png').write_bytes(imagen_png(800, 400).read())
+
+    def imagen(self, response):
+        return Image.open(BytesIO(b''.join(response.streaming_content)))
+
+    def entradas(self):
+        return [p for p in self.cache_dir.rglob('*') if p.is_file()]
+
+    def test_redimensiona_y_cachea(self):
+        with mock.patch.object(resize, '_redimensionar', wraps=resize._redimensionar) as redimensionar:
+            for _ in range(2):
+                response = self.client.get('/img/200x0/proyectos/casa.png')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(self.imagen(response).size, (200, 100))
+        redimensionar.assert_called_once()
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(len(self.entradas()), 1)
+
+        response = self.client.get('/img/200x0/proyectos/casa.png', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_solo_los_blobs_son_inmutables(self):
+        # Un archivo con nombre puede reemplazarse: TTL del catálogo y ETag.
+        response = self.client.get('/img/200x0/proyectos/casa.png')
+        self.assertIn('max-age=0', response['Cache-Control'])
+        self.assertNotIn('immutable', response['Cache-Control'])
+        self.assertTrue(response['ETag'])
+
+        blob = self.media / 'blobs' / 'ab' / ('ab' * 32 + '.png')
+        blob.parent.mkdir(parents=True)
+        shutil.copy(self.media / 'proyectos' / 'casa.png', blob)
+        response = self.client.get(f'/img/200x0/{blob.relative_to(self.media).as_posix()}')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+
+    def test_no_recorre_el_cache_en_cada_escritura(self):
+        with mock.patch.object(resize, '_escritos', None), \
+                mock.patch.object(resize, 'recortar_cache', return_value=0) as recortar:
+            for ancho in (100, 200, 300):
+                self.client.get(f'/img/{ancho}x0/proyectos/casa.png')
+        recortar.assert_called_once()
+
+    def test_si_desaparece_al_servirla_es_404(self):
+        # Otro worker la recorta dos veces seguidas: 404, no un 500.
+        with mock.patch.object(Path, 'open', side_effect=FileNotFoundError):
+            response = self.client.get('/img/200x0/proyectos/casa.png')
+        self.assertEqual(response.status_code, 404)
+
+    def test_si_desaparece_al_renovar_el_uso(self):
+        self.assertEqual(self.client.get('/img/200x0/proyectos/casa.png').status_code, 200)
+        # Usada hace mucho: toca renovar su fecha de uso.
+        for archivo in self.entradas():
+            os.utime(archivo, (0, 0))
+        with mock.patch.object(resize.os, 'utime', side_effect=FileNotFoundError) as utime:
+            response = self.client.get('/img/200x0/proyectos/casa.png')
+        utime.assert_called_once()
+        self.assertEqual(response.status_code, 200)
+
+    def test_no_agranda(self):
+        response = self.client.get('/img/1000x1000/proyectos/casa.png')
+        self.assertEqual(self.imagen(response).size, (800, 400))
+
+    def test_rutas_y_medidas_invalidas(self):
+        for url in (
+            '/img/0x0/proyectos/casa.png',
+            '/img/2000x0/proyectos/casa.png',
+            '/img/200x0/proyectos/no-existe.png',
+            '/img/200x0/../settings.py',
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+        with override_settings(IMAGE_RESIZE_SIZES=('320x0',)):
+            self.assertEqual(self.client.get('/img/200x0/proyectos/casa.png').status_code, 404)
+            self.assertEqual(self.client.get('/img/320x0/proyectos/casa.png').status_code, 200)
+
+    def test_recorta_las_menos_usadas(self):
+        for ancho in (100, 200, 300):
+            self.client.get(f'/img/{ancho}x0/proyectos/casa.png')
+        entradas = sorted(self.entradas(), key=lambda p: p.stat().st_size)
+        # La más chica es la más vieja: se usó primero.
+        for edad, entrada in enumerate(entradas):
+            os.utime(entrada, (1000 + edad, 1000 + edad))
+        tamanos = [p.stat().st_size for p in entradas]
+        liberados = resize.recortar_cache(limite=sum(tamanos) - 1)
+        self.assertEqual(liberados, tamanos[0])
+        self.assertFalse(entradas[0].exists())
+        self.assertTrue(entradas[-1].exists())
@@ -0,0 +1,94 @@
+"""Medición por petición: consultas SQL, render de plantillas y tiempo total.
+
+``ServerTimingMiddleware`` (``proyectos/middleware.py``) abre un
+``RequestTimings`` por petición en una ``ContextVar``; lo alimentan:
+
+- ``record_query``: wrapper de ejecución (el mismo mecanismo que
+  ``connection.execute_wrapper``) instalado en cada conexión al crearse
+  (``connection_created``, ver ``proyectos.signals``). Instalarlo por conexión
+  y no alrededor de la vista cubre también las consultas de las vistas async,
+  que corren en otro hilo con ``sync_to_async``; la ``ContextVar`` viaja con
+  ellas.
+- ``TimedDjangoTemplates``: backend de plantillas que mide cada ``render``.
+
+Fuera de una petición (shell, migraciones, comandos) no se registra nada.
+"""
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+
+class RequestTimings:
+    __slots__ = ('queries', 'db', 'templates', 'template_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.templates = 0
+        self.template_time = 0.0
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar('proyectos_request_timings', default=None)
+
+
+def start_request() -> tuple[RequestTimings, object]:
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end_request(token) -> None:
+    _current.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += perf_counter() - start
+        timings.queries += 1
+
+
+def install_query_timer(connection) -> None:
+    """Agrega ``record_query`` a la conexión (una sola vez, aunque reconecte)."""
+
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timings = _current.get()
+        if timings is None:
+            return super().render(context, request)
+        start = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.template_time += perf_counter() - start
+            timings.templates += 1
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """``DjangoTemplates`` que suma el tiempo de render a la petición en curso.
+
+    Solo envuelve las plantillas de primer nivel; ``{% include %}`` y
+    ``{% extends %}`` quedan dentro de esa misma medición.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
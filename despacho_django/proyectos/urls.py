@@ -1,24 +1,42 @@
+from django.conf import settings
 from django.urls import path
-from . import views
-from .views_api import proyectos_list, contact_form
+from . import resize, views, views_api, views_async
+from .metrics import metrics_view
+from .views_api import contact_form
+
+# Bajo ASGI (DJANGO_ASYNC_VIEWS) las páginas públicas y la API de lectura usan
+# el ORM async de views_async.py; mismas URLs y mismas respuestas.
+paginas = views_async if settings.ASYNC_VIEWS else views
+api = views_async if settings.ASYNC_VIEWS else views_api
 
 app_name = 'proyectos'
 
 urlpatterns = [
     # Páginas públicas
-    path('', views.index_page, name='index'),
-    path('proyectos/', views.proyectos_page, name='proyectos_page'),
-    path('contacto/', views.contacto_page, name='contacto_page'),
-    path('sobre-nosotros/', views.sobre_nosotros_page, name='sobre_nosotros_page'),
+    path('', paginas.index_page, name='index'),
+    path('proyectos/', paginas.proyectos_page, name='proyectos_page'),
+    path('contacto/', paginas.contacto_page, name='contacto_page'),
+    path('sobre-nosotros/', paginas.sobre_nosotros_page, name='sobre_nosotros_page'),
 
     # Endpoints existentes
     path('proyecto/<int:pk>/', views.proyecto_detalle, name='proyecto_detalle'),
-    path('api/proyectos/', proyectos_list, name='api_proyectos_list'),
+    path('api/proyectos/', api.proyectos_list, name='api_proyectos_list'),
+    path('api/proyectos/facets/', api.proyectos_facets, name='api_proyectos_facets'),
+    path('api/proyectos/<int:pk>/', api.proyecto_detail, name='api_proyecto_detail'),
 
     # Nuevo endpoint para formulario de contacto
     path('contact', contact_form, name='contact_form_noslash'),
     path('contact/', contact_form, name='contact_form'),
 
+    # Métricas Prometheus (protegidas con METRICS_TOKEN)
+    path('metrics', metrics_view, name='metrics'),
+
     # Ruta legacy para listado interno (no pública)
     path('proyectos/list/', views.index, name='proyectos_list_legacy'),
 ]
+
+# Sin Cloudinary: imágenes de MEDIA_ROOT redimensionadas y cacheadas en disco.
+if not settings.USE_CLOUDINARY:
+    urlpatterns += [
+        path('img/<int:ancho>x<int:alto>/<path:ruta>', resize.imagen_redimensionada, name='imagen_redimensionada'),
+    ]
@@ -1,29 +1,39 @@
 from django.shortcuts import render, get_object_or_404
+from django.views.decorators.cache import cache_control
+from .edge import edge_cache
 from .models import Proyecto, EquipoMiembro, EquipoSeccion, HomePageConfig
 
 # Vista legacy de listado interno (mantener por compatibilidad interna)
+@edge_cache('catalog')
 def index(request):
 	proyectos = Proyecto.objects.all().order_by('-fecha_creacion')
 	return render(request, 'proyectos/list.html', {'proyectos': proyectos})
 
+@edge_cache('project:{pk}')
 def proyecto_detalle(request, pk):
 	proyecto = get_object_or_404(Proyecto, pk=pk)
 	return render(request, 'proyectos/detail.html', {'proyecto': proyecto})
 
 # Nuevas vistas de páginas públicas (usar templates del proyecto)
+# Cache-Control / Surrogate-Key para el CDN: ver proyectos/edge.py
+@edge_cache('home')
 def index_page(request):
 	"""Página principal. Renderiza templates/index.html"""
 	config = HomePageConfig.objects.order_by('-actualizado').first()
 	return render(request, 'index.html', {'home_config': config})
 
+@edge_cache()
 def proyectos_page(request):
 	"""Página de proyectos (frontend). Renderiza templates/proyectos.html"""
 	return render(request, 'proyectos.html')
 
+# Lleva el token CSRF: nunca en un cache compartido.
+@cache_control(private=True)
 def contacto_page(request):
 	"""Página de contacto. Renderiza templates/contacto.html"""
 	return render(request, 'contacto.html')
 
+@edge_cache('team')
 def sobre_nosotros_page(request):
 	"""Página sobre nosotros. Renderiza templates/sobre-nosotros.html"""
 	equipo_config = (
@@ -1,6 +1,13 @@
-from django.http import JsonResponse
+from asgiref.sync import iscoroutinefunction
+from django.http import StreamingHttpResponse
 from django.core.paginator import Paginator, EmptyPage
+from django.db.models import Count, Max, Min, Prefetch, Q
 from django.utils.html import escape
+from django.views.decorators.http import condition
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+import base64
+import hashlib
 import json
 import logging
 import os
@@ -9,7 +16,13 @@ from django.conf import settings
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
 from python_http_client.exceptions import HTTPError
-from .models import Proyecto, Contacto
+from .cache import catalog_cache_key, catalog_version, get_or_build
+from .edge import edge_cache
+from .encoders import JsonResponse, dumps
+from .metrics import track_sendgrid
+from .models import Proyecto, ProyectoImagen, Contacto, slug_etiqueta
+from .search import search
+from .snapshot import get_snapshot, is_snapshot_request, snapshot_response
 
 logger = logging.getLogger(__name__)
 
@@ -73,72 +86,513 @@ def _sanitize_input(text, max_length=None):
         text = text[:max_length]
     return text
 
-def proyectos_list(request):
-    # prefetch_related evita N+1 queries al acceder a p.imagenes.all()
-    qs = Proyecto.objects.all().prefetch_related('imagenes').order_by('-fecha_creacion')
+# Campos que puede devolver /api/proyectos/ (``fields=`` elige un subconjunto).
+_LIST_FIELDS = ('id', 'nombre', 'descripcion', 'categoria', 'subcategoria', 'imagenes', 'fecha_creacion')
+_IMAGE_MODES = ('all', 'cover', 'none')
 
-    # Filters
-    categoria = request.GET.get('categoria')
-    sub = request.GET.get('sub')
-    q = request.GET.get('q')
+# ``page_size`` se acota a 1..MAX_PAGE_SIZE: 0 o negativos rompían el
+# Paginator y cada valor distinto era una clave de cache nueva.
+MAX_PAGE_SIZE = 1000
 
-    if categoria:
-        qs = qs.filter(categoria__iexact=categoria)
-    if sub:
-        qs = qs.filter(subcategoria__iexact=sub)
-    if q:
-        qs = qs.filter(nombre__icontains=q)
+# A partir de este page_size (o con stream=1) el listado se emite en streaming.
+# La grilla pide páginas de 24; esto cubre a quien pide páginas grandes por su
+# cuenta (exportaciones, integraciones) y no cae en el snapshot.
+STREAM_MIN_PAGE_SIZE = 250
+STREAM_CHUNK_SIZE = 100
 
-    # Pagination
+
+class InvalidParameter(ValueError):
+    """Parámetro de consulta inválido; el mensaje se devuelve tal cual en el 400."""
+
+
+def _parse_list_params(request):
+    """Filtros y paginación de ``proyectos_list`` normalizados (sirven de clave de cache)."""
     try:
         page = int(request.GET.get('page', 1))
         page_size = int(request.GET.get('page_size', 12))
     except ValueError:
         page, page_size = 1, 12
+    page = max(1, page)
+    page_size = min(max(1, page_size), MAX_PAGE_SIZE)
+
+    fields = _LIST_FIELDS
+    if request.GET.get('fields'):
+        requested = {f.strip() for f in request.GET['fields'].split(',') if f.strip()}
+        unknown = requested - set(_LIST_FIELDS)
+        if unknown:
+            raise InvalidParameter('Campos desconocidos: ' + ', '.join(sorted(unknown)))
+        # ``id`` siempre va: el frontend lo usa como llave.
+        fields = tuple(f for f in _LIST_FIELDS if f in requested or f == 'id')
+
+    # La grilla solo muestra la portada; la galería completa la da el detalle.
+    images = request.GET.get('images') or 'cover'
+    if images not in _IMAGE_MODES:
+        raise InvalidParameter('images debe ser cover, all o none.')
+    if 'imagenes' not in fields:
+        images = 'none'
+    elif images == 'none':
+        fields = tuple(f for f in fields if f != 'imagenes')
+
+    cursor = request.GET.get('cursor') if 'cursor' in request.GET else None
+    if cursor:
+        # Se valida aquí y no al consultar: un cursor roto es un 400 antes del GET condicional.
+        _decode_cursor(cursor)
+
+    return {
+        'categoria': slug_etiqueta(request.GET.get('categoria')),
+        'sub': slug_etiqueta(request.GET.get('sub')),
+        # Solo espacios cuenta como sin búsqueda.
+        'q': (request.GET.get('q') or '').strip(),
+        'page': page,
+        'page_size': page_size,
+        # Modo keyset: basta con mandar ``cursor`` (vacío = primera página).
+        'cursor': cursor,
+        # Páginas grandes se emiten en streaming (ver _stream_list_payload).
+        'stream': request.GET.get('stream') in ('1', 'true') or page_size > STREAM_MIN_PAGE_SIZE,
+        'fields': fields,
+        'images': images,
+    }
+
+
+def with_list_params(view):
+    """Valida los parámetros del listado antes de ``@condition`` (sync o async).
+
+    La vista recibe ``params`` ya normalizados. Un 400 sale sin los validadores
+    del catálogo: no se responde 304 a una petición inválida ni su error lleva
+    el ETag de una versión del listado.
+    """
+
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            try:
+                params = _parse_list_params(request)
+            except InvalidParameter as e:
+                return JsonResponse({'ok': False, 'error': str(e)}, status=400)
+            return await view(request, params, *args, **kwargs)
+
+    else:
+
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            try:
+                params = _parse_list_params(request)
+            except InvalidParameter as e:
+                return JsonResponse({'ok': False, 'error': str(e)}, status=400)
+            return view(request, params, *args, **kwargs)
+
+    return inner
+
+
+def _encode_cursor(p, direction):
+    raw = json.dumps({'f': p.fecha_creacion.isoformat(), 'i': p.id, 'd': direction})
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(token):
+    """Devuelve (fecha_creacion, id, dirección) de un cursor opaco."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        fecha = datetime.fromisoformat(data['f'])
+        pk = int(data['i'])
+        direction = data.get('d', 'next')
+    except (ValueError, KeyError, TypeError, UnicodeError):
+        raise InvalidParameter('Cursor inválido.')
+    if direction not in ('next', 'prev'):
+        raise InvalidParameter('Cursor inválido.')
+    return fecha, pk, direction
+
+
+def _media_base(request):
+    """Origen del host (``https://dominio``) para anteponer a URLs relativas.
+
+    Se calcula una vez por petición; cada imagen solo concatena.
+    """
+    return request.build_absolute_uri('/')[:-1]
+
+
+def _absolute_media_url(base, url):
+    # FileSystemStorage guarda '/media/...'; Cloudinary ya devuelve URL absoluta.
+    return base + url if url.startswith('/') else url
+
+
+def _imagen_url(obj):
+    # imagen_url se calcula al guardar; filas anteriores a la migración o
+    # creadas con bulk_create sin rellenarla caen al storage.
+    return obj.imagen_url or obj.imagen.url
+
+
+def _serialize_proyecto(base, p, fields=_LIST_FIELDS):
+    data = {}
+    for field in fields:
+        if field == 'imagenes':
+            data['imagenes'] = _serialize_imagenes(base, p)  # ahora devuelve array
+        else:
+            data[field] = getattr(p, field)
+    return data
+
+
+# Lo que lee _serialize_imagen, igual en Proyecto y ProyectoImagen.
+_IMAGEN_COLUMNS = (
+    'imagen', 'imagen_url', 'imagen_srcset', 'imagen_ancho', 'imagen_alto', 'imagen_color', 'imagen_lqip',
+)
+
+
+def _serialize_imagen(base, obj):
+    data = {'imagen': _absolute_media_url(base, _imagen_url(obj))}
+    # Versiones reducidas por formato (proyectos/renditions.py), listas para
+    # <source type="image/avif" srcset="..."> en el frontend.
+    if obj.imagen_srcset:
+        data['srcset'] = {
+            formato: ', '.join(f'{_absolute_media_url(base, url)} {ancho}w' for url, ancho in versiones)
+            for formato, versiones in obj.imagen_srcset.items()
+        }
+    # Medidas, color y LQIP para reservar el espacio y pintar mientras carga.
+    if obj.imagen_ancho and obj.imagen_alto:
+        data['ancho'] = obj.imagen_ancho
+        data['alto'] = obj.imagen_alto
+    if obj.imagen_color:
+        data['color'] = obj.imagen_color
+    if obj.imagen_lqip:
+        data['lqip'] = obj.imagen_lqip
+    return data
+
+
+def _serialize_imagenes(base, p):
+    # Construir array de imágenes desde la relación ProyectoImagen
+    imagenes = []
+    for img in p.imagenes_api:
+        if img.imagen:
+            imagenes.append(_serialize_imagen(base, img))
+
+    # Fallback: si no hay imágenes en la galería, usar campo principal si existe
+    if not imagenes and p.imagen:
+        imagenes.append(_serialize_imagen(base, p))
+    return imagenes
+
+
+def _filtered_queryset(params):
+    qs = Proyecto.objects.all()
+
+    # Solo se cargan las columnas pedidas (p. ej. sin ``descripcion`` para la
+    # grilla). fecha_creacion siempre: la usan el orden y los cursores.
+    columns = {'id', 'fecha_creacion'}
+    columns.update(f for f in params['fields'] if f not in ('id', 'imagenes', 'fecha_creacion'))
+    if params['images'] != 'none':
+        columns.update(_IMAGEN_COLUMNS)  # fallback cuando no hay galería
+    qs = qs.only(*sorted(columns))
+
+    # prefetch_related evita N+1 queries; el resultado queda en p.imagenes_api
+    imagenes_qs = ProyectoImagen.objects.only('id', 'proyecto_id', *_IMAGEN_COLUMNS, 'orden')
+    if params['images'] == 'cover':
+        # Slice en el Prefetch: Django lo resuelve con una window function por
+        # proyecto, así que solo viaja la portada.
+        imagenes_qs = imagenes_qs[:1]
+    if params['images'] != 'none':
+        qs = qs.prefetch_related(Prefetch('imagenes', queryset=imagenes_qs, to_attr='imagenes_api'))
+
+    # Los parámetros ya vienen normalizados con slug_etiqueta: igualdad exacta
+    # sobre columnas indexadas (proyecto_cat_fecha_idx / proyecto_sub_fecha_idx).
+    if params['categoria']:
+        qs = qs.filter(categoria_slug=params['categoria'])
+    if params['sub']:
+        qs = qs.filter(subcategoria_slug=params['sub'])
+    if params['q']:
+        # Texto completo sobre nombre/descripción/categorías (proyectos/search.py).
+        qs = search(qs, params['q'])
+    return qs
+
+
+def _cursor_queryset(params):
+    """Paginación keyset sobre (fecha_creacion, id), sin COUNT ni OFFSET.
+
+    Cada página cuesta lo mismo sin importar qué tan profunda sea: el índice
+    ``proyecto_fecha_id_idx`` resuelve el rango y el orden. Devuelve la
+    consulta (una fila extra para saber si hay más) y la dirección.
+    """
+    page_size = params['page_size']
+    qs = _filtered_queryset(params)
+
+    direction = 'next'
+    if params['cursor']:
+        fecha, pk, direction = _decode_cursor(params['cursor'])
+        if direction == 'next':
+            qs = qs.filter(Q(fecha_creacion__lt=fecha) | Q(fecha_creacion=fecha, id__lt=pk))
+        else:
+            qs = qs.filter(Q(fecha_creacion__gt=fecha) | Q(fecha_creacion=fecha, id__gt=pk))
+
+    if direction == 'next':
+        qs = qs.order_by('-fecha_creacion', '-id')
+    else:
+        # Hacia atrás se recorre en orden ascendente y se invierte la página.
+        qs = qs.order_by('fecha_creacion', 'id')
+    return qs[:page_size + 1], direction
+
+
+def _cursor_payload(request, params, rows, direction):
+    page_size = params['page_size']
+    has_more = len(rows) > page_size
+    if direction == 'next':
+        rows = rows[:page_size]
+        has_next, has_prev = has_more, bool(params['cursor'])
+    else:
+        rows = rows[:page_size][::-1]
+        has_next, has_prev = True, has_more
+
+    base = _media_base(request)
+    return {
+        'page_size': page_size,
+        'next': _encode_cursor(rows[-1], 'next') if rows and has_next else None,
+        'previous': _encode_cursor(rows[0], 'prev') if rows and has_prev else None,
+        'results': [_serialize_proyecto(base, p, params['fields']) for p in rows],
+    }
+
+
+def _build_cursor_payload(request, params):
+    qs, direction = _cursor_queryset(params)
+    return _cursor_payload(request, params, list(qs), direction)
 
-    paginator = Paginator(qs, page_size)
+
+def _ordered_queryset(params):
+    qs = _filtered_queryset(params)
+    if params['q']:
+        return qs.order_by('-search_rank', '-fecha_creacion', '-id')
+    return qs.order_by('-fecha_creacion', '-id')
+
+
+def _page_of(paginator, params):
+    """Cabecera de paginación y filas (sin evaluar) de la página pedida."""
     try:
-        page_obj = paginator.page(page)
+        page_obj = paginator.page(params['page'])
     except EmptyPage:
         page_obj = paginator.page(paginator.num_pages)
 
-    results = []
-    for p in page_obj.object_list:
-        # Construir array de imágenes desde la relación ProyectoImagen
-        imagenes = []
-        for img in p.imagenes.all():
-            if img.imagen:
-                try:
-                    img_url = request.build_absolute_uri(img.imagen.url)
-                except Exception:
-                    img_url = img.imagen.url
-                imagenes.append({'imagen': img_url})
-        
-        # Fallback: si no hay imágenes en la galería, usar campo principal si existe
-        if not imagenes and p.imagen:
-            try:
-                img_url = request.build_absolute_uri(p.imagen.url)
-            except Exception:
-                img_url = p.imagen.url
-            imagenes.append({'imagen': img_url})
-        
-        results.append({
-            'id': p.id,
-            'nombre': p.nombre,
-            'descripcion': p.descripcion,
-            'categoria': p.categoria,
-            'subcategoria': p.subcategoria,
-            'imagenes': imagenes,  # ahora devuelve array
-            'fecha_creacion': p.fecha_creacion.isoformat(),
-        })
-
-    return JsonResponse({
+    header = {
         'count': paginator.count,
         'page': page_obj.number,
         'pages': paginator.num_pages,
-        'page_size': page_size,
-        'results': results,
-    })
+        'page_size': params['page_size'],
+    }
+    return header, page_obj.object_list
+
+
+def _paginate(params):
+    return _page_of(Paginator(_ordered_queryset(params), params['page_size']), params)
+
+
+def _list_payload(request, params, header, rows):
+    base = _media_base(request)
+    return {
+        **header,
+        'results': [_serialize_proyecto(base, p, params['fields']) for p in rows],
+    }
+
+
+def _build_list_payload(request, params):
+    header, rows = _paginate(params)
+    return _list_payload(request, params, header, rows)
+
+
+def _stream_list_payload(request, params):
+    """Igual que ``_build_list_payload`` pero emitiendo el JSON por partes.
+
+    ``iterator(chunk_size=...)`` trae las filas (y el prefetch de imágenes) por
+    bloques, así que la memoria del worker no crece con ``page_size``. El COUNT
+    se resuelve antes de empezar a emitir para que un error de base de datos
+    siga siendo un 500 normal y no una respuesta cortada.
+    """
+    header, rows = _paginate(params)
+    base = _media_base(request)
+
+    def chunks():
+        # Mismo formato que dumps() del payload completo.
+        yield dumps(header)[:-1] + b',"results":['
+        for i, p in enumerate(rows.iterator(chunk_size=STREAM_CHUNK_SIZE)):
+            item = dumps(_serialize_proyecto(base, p, params['fields']))
+            yield item if i == 0 else b',' + item
+        yield b']}'
+
+    return StreamingHttpResponse(chunks(), content_type='application/json')
+
+
+def _catalog_validators():
+    """ETag y Last-Modified del catálogo sin serializar filas.
+
+    Se calculan con una sola consulta agregada (conteo + fechas máximas de
+    proyectos e imágenes) y se cachean por versión del catálogo, así que un 304
+    normalmente no toca la base de datos.
+    """
+    return get_or_build(
+        catalog_cache_key('validators'),
+        lambda: _validators_from(Proyecto.objects.aggregate(**_catalog_aggregates())),
+    )
+
+
+def _catalog_aggregates():
+    return {
+        'count': Count('id', distinct=True),
+        'ultimo_proyecto': Max('fecha_creacion'),
+        'ultima_imagen': Max('imagenes__creado'),
+    }
+
+
+def _validators_from(agg):
+    version = catalog_version()
+    # Editar o borrar no cambia las fechas de creación: la versión del
+    # catálogo (un timestamp en microsegundos) cubre esos casos.
+    fechas = [
+        agg['ultimo_proyecto'],
+        agg['ultima_imagen'],
+        datetime.fromtimestamp(version / 1_000_000, tz=dt_timezone.utc),
+    ]
+    last_modified = max(f for f in fechas if f is not None)
+    raw = f"{version}:{agg['count']}:{agg['ultimo_proyecto']}:{agg['ultima_imagen']}"
+    etag = hashlib.md5(raw.encode('utf-8'), usedforsecurity=False).hexdigest()
+    return {'etag': etag, 'last_modified': last_modified}
+
+
+def _catalog_etag(request, *args, **kwargs):
+    # Débil: el mismo JSON puede salir en identity, gzip o brotli.
+    return 'W/"%s"' % _catalog_validators()['etag']
+
+
+def _catalog_last_modified(request, *args, **kwargs):
+    return _catalog_validators()['last_modified']
+
+
+# Conditional GET: proyectos.js pide páginas del catálogo en cada visita; con
+# If-None-Match / If-Modified-Since se responde 304 sin cuerpo.
+@edge_cache('catalog')
+@with_list_params
+@condition(etag_func=_catalog_etag, last_modified_func=_catalog_last_modified)
+def proyectos_list(request, params):
+    # Catálogo completo sin filtros (clientes que bajan todo de una vez): bytes
+    # ya serializados y comprimidos, ver proyectos/snapshot.py.
+    if is_snapshot_request(params, _LIST_FIELDS):
+        snapshot = get_snapshot(request, lambda: _build_list_payload(request, params))
+        return snapshot_response(request, snapshot)
+
+    if params['stream'] and params['cursor'] is None:
+        return _stream_list_payload(request, params)
+
+    # El payload se cachea por versión del catálogo (ver proyectos/cache.py):
+    # una petición repetida no toca la base de datos ni el storage de imágenes.
+    # El host forma parte de la clave porque las URLs de imagen son absolutas.
+    key = catalog_cache_key('api-list', params, request.build_absolute_uri('/'))
+    if params['cursor'] is not None:
+        payload = get_or_build(key, lambda: _build_cursor_payload(request, params))
+    else:
+        payload = get_or_build(key, lambda: _build_list_payload(request, params))
+    return JsonResponse(payload)
+
+def _detail_queryset(pk):
+    imagenes_qs = ProyectoImagen.objects.only('id', 'proyecto_id', *_IMAGEN_COLUMNS, 'orden')
+    return (
+        Proyecto.objects.only(*(f for f in _LIST_FIELDS if f != 'imagenes'), *_IMAGEN_COLUMNS)
+        .prefetch_related(Prefetch('imagenes', queryset=imagenes_qs, to_attr='imagenes_api'))
+        .filter(pk=pk)
+    )
+
+
+def _detail_payload(request, p):
+    if p is None:
+        return None
+    return _serialize_proyecto(_media_base(request), p)
+
+
+def _build_detail_payload(request, pk):
+    return _detail_payload(request, _detail_queryset(pk).first())
+
+
+def _detail_not_found():
+    return JsonResponse({'ok': False, 'error': 'Proyecto no encontrado.'}, status=404)
+
+
+def with_detail_payload(view):
+    """Busca el proyecto antes de ``@condition`` y le pasa el payload a la vista.
+
+    El 404 de un ``pk`` inexistente sale sin los validadores del catálogo: no
+    se responde 304 ni se cachea como una versión del detalle.
+    """
+
+    @wraps(view)
+    def inner(request, pk):
+        key = catalog_cache_key('api-detail', pk, request.build_absolute_uri('/'))
+        payload = get_or_build(key, lambda: _build_detail_payload(request, pk))
+        if payload is None:
+            return _detail_not_found()
+        return view(request, pk, payload)
+
+    return inner
+
+
+@edge_cache('project:{pk}')
+@with_detail_payload
+@condition(etag_func=_catalog_etag, last_modified_func=_catalog_last_modified)
+def proyecto_detail(request, pk, payload):
+    """Un proyecto con su galería completa; lo pide el modal al abrirse.
+
+    El listado solo trae la portada de cada proyecto (``images=cover``).
+    """
+    return JsonResponse(payload)
+
+
+def _facets_queryset():
+    # Un solo GROUP BY sobre las columnas slug (ver proyecto_cat_fecha_idx);
+    # la etiqueta visible es cualquiera de las variantes originales.
+    return (
+        Proyecto.objects.values('categoria_slug', 'subcategoria_slug')
+        .annotate(
+            total=Count('id'),
+            categoria_label=Min('categoria'),
+            subcategoria_label=Min('subcategoria'),
+        )
+        .order_by('categoria_slug', 'subcategoria_slug')
+    )
+
+
+def _facets_payload(rows):
+    categorias = {}
+    count = 0
+    for row in rows:
+        count += row['total']
+        if not row['categoria_slug']:
+            continue
+        cat = categorias.setdefault(row['categoria_slug'], {
+            'slug': row['categoria_slug'],
+            'label': row['categoria_label'].strip(),
+            'count': 0,
+            'subcategorias': [],
+        })
+        cat['count'] += row['total']
+        # Misma elección que Min() entre grupos: gana la variante capitalizada.
+        cat['label'] = min(cat['label'], row['categoria_label'].strip())
+        if row['subcategoria_slug']:
+            cat['subcategorias'].append({
+                'slug': row['subcategoria_slug'],
+                'label': row['subcategoria_label'].strip(),
+                'count': row['total'],
+            })
+
+    return {'count': count, 'categorias': list(categorias.values())}
+
+
+def _build_facets_payload():
+    return _facets_payload(_facets_queryset())
+
+
+@edge_cache('catalog')
+@condition(etag_func=_catalog_etag, last_modified_func=_catalog_last_modified)
+def proyectos_facets(request):
+    """Árbol categoría → subcategoría con conteos, para pintar los filtros.
+
+    Evita que proyectos.js descargue el catálogo completo solo para saber qué
+    botones dibujar. Se cachea por versión del catálogo.
+    """
+    return JsonResponse(get_or_build(catalog_cache_key('facets'), _build_facets_payload))
+
 
 def contact_form(request):
     """Vista para manejar el envío del formulario de contacto con SendGrid"""
@@ -370,8 +824,10 @@ def contact_form(request):
             """,
         )
 
-        admin_resp = sg.send(admin_email)
-        confirm_resp = sg.send(confirmation_email)
+        with track_sendgrid('admin'):
+            admin_resp = sg.send(admin_email)
+        with track_sendgrid('confirmation'):
+            confirm_resp = sg.send(confirmation_email)
         logger.info(
             "SendGrid OK admin=%s confirm=%s",
             getattr(admin_resp, 'status_code', None),
@@ -0,0 +1,211 @@
+"""Variantes async de las páginas públicas y de la API de lectura.
+
+Se usan cuando el sitio corre bajo ASGI (``SERVER_MODE=asgi`` en
+``scripts/railway_start.py``, que activa ``DJANGO_ASYNC_VIEWS``; ver
+``proyectos/urls.py``). Con el ORM async una consulta lenta deja de bloquear
+un worker entero: mientras espera a la base de datos, el mismo proceso atiende
+otras peticiones.
+
+La lógica de filtros, paginación y serialización es la de ``views_api``; aquí
+solo cambia cómo se ejecutan las consultas. ``contact_form`` sigue siendo
+síncrona (el cliente de SendGrid bloquea) y Django la corre en un hilo.
+"""
+
+from functools import wraps
+
+from django.core.paginator import Paginator
+from django.http import StreamingHttpResponse
+from django.shortcuts import render
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.cache import cache_control
+
+from .cache import aget_or_build, catalog_cache_key
+from .edge import edge_cache
+from .encoders import JsonResponse, dumps
+from .models import EquipoMiembro, EquipoSeccion, HomePageConfig, Proyecto
+from .snapshot import aget_snapshot, is_snapshot_request, snapshot_response
+from .views_api import (
+    STREAM_CHUNK_SIZE,
+    _LIST_FIELDS,
+    _catalog_aggregates,
+    _cursor_payload,
+    _cursor_queryset,
+    _detail_not_found,
+    _detail_payload,
+    _detail_queryset,
+    _facets_payload,
+    _facets_queryset,
+    _list_payload,
+    _media_base,
+    _ordered_queryset,
+    _page_of,
+    _serialize_proyecto,
+    _validators_from,
+    with_list_params,
+)
+
+
+async def _acatalog_validators():
+    async def build():
+        return _validators_from(await Proyecto.objects.aaggregate(**_catalog_aggregates()))
+
+    return await aget_or_build(catalog_cache_key('validators'), build)
+
+
+def catalog_condition(view):
+    """``@condition`` con los validadores del catálogo, para vistas async.
+
+    ``condition`` llama a ``etag_func`` de forma síncrona aunque envuelva una
+    corrutina, y una consulta síncrona dentro del event loop falla con
+    ``SynchronousOnlyOperation``.
+    """
+
+    @wraps(view)
+    async def inner(request, *args, **kwargs):
+        validators = await _acatalog_validators()
+        # Débil: el mismo JSON puede salir en identity, gzip o brotli.
+        etag = 'W/"%s"' % validators['etag']
+        last_modified = int(validators['last_modified'].timestamp())
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = await view(request, *args, **kwargs)
+        if request.method in ('GET', 'HEAD'):
+            if not response.has_header('Last-Modified'):
+                response.headers['Last-Modified'] = http_date(last_modified)
+            response.headers.setdefault('ETag', etag)
+        return response
+
+    return inner
+
+
+async def _apaginate(params):
+    qs = _ordered_queryset(params)
+    paginator = Paginator(qs, params['page_size'])
+    # Paginator.count es síncrono; se resuelve antes con acount().
+    paginator.count = await qs.acount()
+    return _page_of(paginator, params)
+
+
+async def _abuild_list_payload(request, params):
+    header, rows = await _apaginate(params)
+    return _list_payload(request, params, header, [p async for p in rows])
+
+
+async def _abuild_cursor_payload(request, params):
+    qs, direction = _cursor_queryset(params)
+    return _cursor_payload(request, params, [p async for p in qs], direction)
+
+
+async def _astream_list_payload(request, params):
+    """Como ``views_api._stream_list_payload``, con ``aiterator``."""
+
+    header, rows = await _apaginate(params)
+    base = _media_base(request)
+
+    async def chunks():
+        yield dumps(header)[:-1] + b',"results":['
+        i = 0
+        async for p in rows.aiterator(chunk_size=STREAM_CHUNK_SIZE):
+            item = dumps(_serialize_proyecto(base, p, params['fields']))
+            yield item if i == 0 else b',' + item
+            i += 1
+        yield b']}'
+
+    return StreamingHttpResponse(chunks(), content_type='application/json')
+
+
+@edge_cache('catalog')
+@with_list_params
+@catalog_condition
+async def proyectos_list(request, params):
+    if is_snapshot_request(params, _LIST_FIELDS):
+        snapshot = await aget_snapshot(request, lambda: _abuild_list_payload(request, params))
+        return snapshot_response(request, snapshot)
+
+    if params['stream'] and params['cursor'] is None:
+        return await _astream_list_payload(request, params)
+
+    key = catalog_cache_key('api-list', params, request.build_absolute_uri('/'))
+    if params['cursor'] is not None:
+        payload = await aget_or_build(key, lambda: _abuild_cursor_payload(request, params))
+    else:
+        payload = await aget_or_build(key, lambda: _abuild_list_payload(request, params))
+    return JsonResponse(payload)
+
+
+def with_detail_payload(view):
+    """Como ``views_api.with_detail_payload``, con el ORM async."""
+
+    @wraps(view)
+    async def inner(request, pk):
+        async def build():
+            return _detail_payload(request, await _detail_queryset(pk).afirst())
+
+        key = catalog_cache_key('api-detail', pk, request.build_absolute_uri('/'))
+        payload = await aget_or_build(key, build)
+        if payload is None:
+            return _detail_not_found()
+        return await view(request, pk, payload)
+
+    return inner
+
+
+@edge_cache('project:{pk}')
+@with_detail_payload
+@catalog_condition
+async def proyecto_detail(request, pk, payload):
+    return JsonResponse(payload)
+
+
+@edge_cache('catalog')
+@catalog_condition
+async def proyectos_facets(request):
+    async def build():
+        return _facets_payload([row async for row in _facets_queryset()])
+
+    return JsonResponse(await aget_or_build(catalog_cache_key('facets'), build))
+
+
+@edge_cache('home')
+async def index_page(request):
+    """Página principal. Renderiza templates/index.html"""
+    config = await HomePageConfig.objects.order_by('-actualizado').afirst()
+    return render(request, 'index.html', {'home_config': config})
+
+
+@edge_cache()
+async def proyectos_page(request):
+    """Página de proyectos (frontend). Renderiza templates/proyectos.html"""
+    return render(request, 'proyectos.html')
+
+
+@cache_control(private=True)
+async def contacto_page(request):
+    """Página de contacto. Renderiza templates/contacto.html"""
+    return render(request, 'contacto.html')
+
+
+@edge_cache('team')
+async def sobre_nosotros_page(request):
+    """Página sobre nosotros. Renderiza templates/sobre-nosotros.html"""
+    equipo_config = await (
+        EquipoSeccion.objects.filter(activo=True)
+        .order_by('-actualizado')
+        .afirst()
+    )
+    # Las plantillas no pueden evaluar querysets dentro del event loop: se
+    # traen todos los miembros en una consulta y se separan por rol aquí.
+    miembros = [
+        m async for m in EquipoMiembro.objects.filter(activo=True).order_by('rol', 'orden', 'id')
+    ]
+    return render(
+        request,
+        'sobre-nosotros.html',
+        {
+            'equipo_config': equipo_config,
+            'arquitectos': [m for m in miembros if m.rol == EquipoMiembro.ROL_ARQUITECTO],
+            'colaboradores': [m for m in miembros if m.rol == EquipoMiembro.ROL_COLABORADOR],
+        },
+    )
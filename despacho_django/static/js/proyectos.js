@@ -12,10 +12,11 @@ document.addEventListener('DOMContentLoaded', () => {
         const proyectosFiltradosContainer = document.getElementById('proyectos-filtrados');
         const panelCategorias = document.querySelector('.proyectos-panel');
         
-        let proyectos = [];
         let intervalos = [];
         
-        // Normalizador sencillo para comparar etiquetas (quita acentos, espacios, pasa a lowercase)
+        // Normalizador sencillo para comparar etiquetas (quita acentos, espacios, pasa a lowercase).
+        // Mismo criterio que slug_etiqueta (proyectos/models.py): convierte ?categoria=/?sub=
+        // de la URL en los slugs que devuelve la API.
         // Nota: evitamos \p{Diacritic} por compatibilidad (algunos browsers rompen el script).
         const normalizeString = (s) => String(s || '')
             .normalize('NFD')
@@ -44,116 +45,232 @@ document.addEventListener('DOMContentLoaded', () => {
             });
         }, { threshold: 0.2 });
 
-        // Cargar proyectos desde la API de Django
-        console.log('[FETCH] Iniciando fetch a API...');
-        try {
-            // API_BASE se define en el template. Si es '' o no existe, usamos same-origin.
-            const API_BASE = (typeof window.API_BASE === 'string') ? window.API_BASE : '';
-            const apiBaseTrimmed = API_BASE.replace(/\/$/, '');
-            const apiUrl = apiBaseTrimmed
-                ? (apiBaseTrimmed + '/api/proyectos/?page_size=1000')
-                : '/api/proyectos/?page_size=1000';
-            console.log('[FETCH] URL:', apiUrl);
-
-            const response = await fetch(apiUrl);
-            console.log('[FETCH] Respuesta recibida, status:', response.status);
-            
-            if (!response.ok) throw new Error('HTTP error! status: ' + response.status);
-            const data = await response.json();
-            console.log('[FETCH] Datos parseados, tipo:', Array.isArray(data) ? 'array' : 'object', 'keys:', Object.keys(data));
-            
-            // Soportar diferentes formatos de respuesta:
-            // - paginada: { count, results: [...] }
-            // - lista directa: [...]
-            // - envuelta: { proyectos: [...] }
-            let raw = [];
-            if (Array.isArray(data)) raw = data;
-            else if (Array.isArray(data.results)) raw = data.results;
-            else if (Array.isArray(data.proyectos)) raw = data.proyectos;
-            else raw = [];
-
-            console.log('[FETCH] Proyectos extraídos:', raw.length);
-
-            // Placeholder inline para evitar 404s
-            const PLACEHOLDER = 'data:image/svg+xml;utf8,<svg xmlns="http://www.w3.org/2000/svg" width="800" height="600"><rect width="100%" height="100%" fill="%23e5e7eb"/><text x="50%" y="50%" dominant-baseline="middle" text-anchor="middle" fill="%239ca3af" font-family="Arial, Helvetica, sans-serif" font-size="24">Sin imagen</text></svg>';
-
-            // Normalizar campos al contrato de Django (nombre, descripcion, categoria, subcategoria, imagenes[])
-            const API_ORIGIN = apiBaseTrimmed || window.location.origin;
-            const resolveImageUrl = (u) => {
-                if (!u) return '';
-                const s = String(u);
-                if (/^https?:\/\//i.test(s)) return s;
-                if (s.startsWith('/')) return API_ORIGIN + s;
-                return s;
+        // --- API ---
+        // API_BASE se define en el template. Si es '' o no existe, usamos same-origin.
+        const API_BASE = (typeof window.API_BASE === 'string') ? window.API_BASE : '';
+        const apiBaseTrimmed = API_BASE.replace(/\/$/, '');
+        const API_ORIGIN = apiBaseTrimmed || window.location.origin;
+        const apiUrl = (path, params) => {
+            const qs = params ? new URLSearchParams(params).toString() : '';
+            return apiBaseTrimmed + path + (qs ? '?' + qs : '');
+        };
+
+        // Tamaño de cada página pedida al servidor (paginación por cursor).
+        const PAGE_SIZE = 24;
+
+        // Placeholder inline para evitar 404s
+        const PLACEHOLDER = 'data:image/svg+xml;utf8,<svg xmlns="http://www.w3.org/2000/svg" width="800" height="600"><rect width="100%" height="100%" fill="%23e5e7eb"/><text x="50%" y="50%" dominant-baseline="middle" text-anchor="middle" fill="%239ca3af" font-family="Arial, Helvetica, sans-serif" font-size="24">Sin imagen</text></svg>';
+
+        // Ancho con el que se pinta cada tarjeta (.proyecto-item: 90% hasta 800px),
+        // para que el navegador elija la versión del srcset.
+        const SIZES_TARJETA = '(max-width: 900px) 100vw, 800px';
+
+        const resolveImageUrl = (u) => {
+            if (!u) return '';
+            const s = String(u);
+            if (/^https?:\/\//i.test(s)) return s;
+            if (s.startsWith('/')) return API_ORIGIN + s;
+            return s;
+        };
+
+        // Normalizar campos al contrato de Django (nombre, descripcion, categoria, subcategoria, imagenes[])
+        const normalizarProyecto = (p) => {
+            const imgs = Array.isArray(p.imagenes) ? p.imagenes : [];
+            const firstImg = imgs.length && imgs[0].imagen ? resolveImageUrl(imgs[0].imagen) : '';
+            return {
+                id: p.id,
+                nombre: (p.nombre != null) ? p.nombre : '',
+                descripcion: (p.descripcion != null) ? p.descripcion : '',
+                categoria: (p.categoria != null) ? p.categoria : '',
+                subcategoria: (p.subcategoria != null) ? p.subcategoria : '',
+                imagenes: imgs.map(i => i.imagen ? resolveImageUrl(i.imagen) : '').filter(Boolean),
+                preview: firstImg || PLACEHOLDER,  // primera imagen o placeholder
+                // Versiones reducidas de la portada por formato ({avif, webp}), si existen.
+                previewSrcset: firstImg && imgs[0].srcset ? imgs[0].srcset : null,
+                // Medidas, color dominante y LQIP de la portada, si el servidor los tiene.
+                previewAncho: firstImg && imgs[0].ancho ? imgs[0].ancho : null,
+                previewAlto: firstImg && imgs[0].alto ? imgs[0].alto : null,
+                previewColor: firstImg && imgs[0].color ? imgs[0].color : '',
+                previewLqip: firstImg && imgs[0].lqip ? imgs[0].lqip : '',
             };
-            proyectos = raw.map(p => {
-                // Extraer array de imágenes desde la API
-                const imgs = Array.isArray(p.imagenes) ? p.imagenes : [];
-                const firstImg = imgs.length && imgs[0].imagen ? resolveImageUrl(imgs[0].imagen) : '';
-                
-                const nombre = (p && p.nombre != null) ? p.nombre : ((p && p.titulo != null) ? p.titulo : '');
-                const descripcion = (p && p.descripcion != null) ? p.descripcion : '';
-                const categoria = (p && p.categoria != null) ? p.categoria : '';
-                const subcategoria = (p && p.subcategoria != null) ? p.subcategoria : ((p && p.sub != null) ? p.sub : '');
-
-                return {
-                    id: p.id,
-                    nombre: nombre,
-                    descripcion: descripcion,
-                    categoria: categoria,
-                    subcategoria: subcategoria,
-                    imagenes: imgs.map(i => i.imagen ? resolveImageUrl(i.imagen) : '').filter(Boolean),
-                    preview: firstImg || PLACEHOLDER,  // primera imagen o placeholder
-                };
-            });
-            
-            // CRÍTICO: Asignar a window.proyectos (no __proyectos)
-            window.proyectos = proyectos;
+        };
+
+        // --- Galería completa bajo demanda ---
+        // El listado solo trae la portada; /api/proyectos/<id>/ trae todas las
+        // imágenes. Se pide al abrir el modal y se recuerda por id.
+        const galerias = new Map();
+
+        function cargarGaleria(p) {
+            if (!galerias.has(p.id)) {
+                const pending = fetch(apiUrl('/api/proyectos/' + p.id + '/'))
+                    .then(response => {
+                        if (!response.ok) throw new Error('HTTP error! status: ' + response.status);
+                        return response.json();
+                    })
+                    .then(data => normalizarProyecto(data).imagenes)
+                    .catch(err => {
+                        // Sin red o error del servidor: se queda la portada y se reintenta la próxima vez.
+                        console.error('[ERROR] Galería de proyecto', p.id, err);
+                        galerias.delete(p.id);
+                        return p.imagenes;
+                    });
+                galerias.set(p.id, pending);
+            }
+            return galerias.get(p.id);
+        }
+
+        // --- Cache de páginas por filtro ---
+        // Clave "categoria|sub" -> { items, next (cursor), done, pending }.
+        // Volver a un filtro ya visitado pinta lo cargado sin pedir nada al servidor.
+        const paginas = new Map();
+        const filtroKey = (f) => (f.categoria || '') + '|' + (f.sub || '');
+        let filtroActual = null;
+        let renderizados = 0;  // items del filtro actual que ya están en el DOM
+
+        function cargarPagina(filtro) {
+            const key = filtroKey(filtro);
+            let entry = paginas.get(key);
+            if (!entry) {
+                entry = { items: [], next: '', done: false, pending: null };
+                paginas.set(key, entry);
+            }
+            if (entry.done) return Promise.resolve(entry);
+            if (entry.pending) return entry.pending;
+
+            const params = { page_size: PAGE_SIZE, cursor: entry.next };
+            if (filtro.categoria) params.categoria = filtro.categoria;
+            if (filtro.sub) params.sub = filtro.sub;
+            const url = apiUrl('/api/proyectos/', params);
+            console.log('[FETCH] URL:', url);
+
+            entry.pending = fetch(url)
+                .then(response => {
+                    if (!response.ok) throw new Error('HTTP error! status: ' + response.status);
+                    return response.json();
+                })
+                .then(data => {
+                    const raw = Array.isArray(data.results) ? data.results : [];
+                    entry.items.push(...raw.map(normalizarProyecto));
+                    entry.next = data.next || '';
+                    entry.done = !data.next;
+                    return entry;
+                })
+                .finally(() => {
+                    entry.pending = null;
+                });
+            return entry.pending;
+        }
+
+        // Muestra un filtro: usa la cache si ya hay páginas, si no pide la primera.
+        async function mostrarFiltro(filtro, mensajeVacio) {
+            filtroActual = filtro;
+            renderizados = 0;
+            let entry = paginas.get(filtroKey(filtro));
+            try {
+                if (!entry || (!entry.items.length && !entry.done)) {
+                    entry = await cargarPagina(filtro);
+                }
+            } catch (error) {
+                console.error('❌ [ERROR] No se pudieron cargar los proyectos:', error);
+                if (filtroActual !== filtro) return;
+                window.proyectosLoaded = false;
+                proyectosFiltradosContainer.innerHTML = '<p class="no-proyectos">Error al cargar la información de proyectos. Por favor, intente más tarde.</p>';
+                return;
+            }
+            // El usuario cambió de filtro mientras cargaba: la página queda en cache.
+            if (filtroActual !== filtro) return;
+            if (!entry.items.length) {
+                proyectosFiltradosContainer.innerHTML = '<p class="no-proyectos">' + mensajeVacio + '</p>';
+                return;
+            }
+            pintarPendientes(entry);
+        }
+
+        function pintarPendientes(entry) {
+            const nuevos = entry.items.slice(renderizados);
+            renderizados = entry.items.length;
+            window.proyectos = entry.items;
             window.proyectosLoaded = true;
-            console.log('✅ [SUCCESS] Proyectos cargados y asignados a window.proyectos:', proyectos.length);
-            console.log('✅ Primer proyecto:', proyectos[0]);
+            if (nuevos.length) renderProyectos(nuevos);
+            // Si la página no llenó la pantalla el sentinel sigue visible y el
+            // observer no vuelve a disparar: pedir la siguiente directamente.
+            requestAnimationFrame(() => {
+                if (!entry.done && sentinelVisible()) cargarMas();
+            });
+        }
 
-            if (!proyectos.length) {
-                proyectosFiltradosContainer.innerHTML = '<p class="no-proyectos">Aún no hay proyectos cargados.</p>';
-                // No continuar: no hay categorías que construir.
+        // --- Carga incremental al hacer scroll ---
+        const sentinel = document.createElement('div');
+        sentinel.className = 'proyectos-sentinel';
+        sentinel.setAttribute('aria-hidden', 'true');
+        proyectosFiltradosContainer.after(sentinel);
+
+        const sentinelVisible = () => {
+            const rect = sentinel.getBoundingClientRect();
+            const viewportHeight = window.innerHeight || document.documentElement.clientHeight;
+            return rect.top < viewportHeight + 600;
+        };
+
+        async function cargarMas() {
+            const filtro = filtroActual;
+            if (!filtro) return;
+            const entry = paginas.get(filtroKey(filtro));
+            if (!entry || entry.done || entry.pending) return;
+            try {
+                await cargarPagina(filtro);
+            } catch (error) {
+                console.error('❌ [ERROR] No se pudo cargar la siguiente página:', error);
                 return;
             }
+            if (filtroActual !== filtro) return;
+            pintarPendientes(entry);
+        }
 
+        const sentinelObserver = new IntersectionObserver((entries) => {
+            if (entries.some(entry => entry.isIntersecting)) cargarMas();
+        }, { rootMargin: '0px 0px 600px 0px' });
+        sentinelObserver.observe(sentinel);
 
+        // --- Categorías y subcategorías desde /api/proyectos/facets/ ---
+        // El servidor agrupa y cuenta; ya no hace falta descargar el catálogo completo.
+        let facets;
+        console.log('[FETCH] Iniciando fetch de facets...');
+        try {
+            const response = await fetch(apiUrl('/api/proyectos/facets/'));
+            if (!response.ok) throw new Error('HTTP error! status: ' + response.status);
+            facets = await response.json();
         } catch (error) {
             console.error("❌ [ERROR] No se pudieron cargar los proyectos:", error);
             window.proyectosLoaded = false;
             proyectosFiltradosContainer.innerHTML = '<p class="no-proyectos">Error al cargar la información de proyectos. Por favor, intente más tarde.</p>';
             return;
         }
-        // Resolver URLs de imagen (ya normalizado arriba)
-        const resolveImageUrl = (u) => u || '';
 
-        // --- Construir categorías y subcategorías dinámicamente desde los datos ---
+        if (!facets.count) {
+            window.proyectosLoaded = true;
+            proyectosFiltradosContainer.innerHTML = '<p class="no-proyectos">Aún no hay proyectos cargados.</p>';
+            // No continuar: no hay categorías que construir.
+            return;
+        }
+
         const titleCase = (s) => String(s || '')
             .toLowerCase()
             .split(' ')
             .map(w => w ? w[0].toUpperCase() + w.slice(1) : '')
             .join(' ');
 
-        const categoriasMap = new Map(); // key: slug normalizado, value: { label, subs: Map }
-        proyectos.forEach(p => {
-            const catSlug = normalizeString(p.categoria);
-            const subSlug = normalizeString(p.subcategoria);
-            const catLabel = titleCase(p.categoria);
-            const subLabel = titleCase(p.subcategoria);
-            if (!catSlug) return;
-            if (!categoriasMap.has(catSlug)) {
-                categoriasMap.set(catSlug, { label: catLabel, subs: new Map() });
-            }
-            const entry = categoriasMap.get(catSlug);
-            if (subSlug) {
-                entry.subs.set(subSlug, subLabel);
-            }
+        const categoriasMap = new Map(); // key: slug del servidor, value: { label, subs: Map }
+        (Array.isArray(facets.categorias) ? facets.categorias : []).forEach(cat => {
+            const subs = new Map();
+            (cat.subcategorias || []).forEach(sub => subs.set(sub.slug, titleCase(sub.label)));
+            categoriasMap.set(cat.slug, { label: titleCase(cat.label), subs });
         });
 
         // Helper centralizado para limpiar UI al cambiar filtros/categorías
         async function resetUI({ exceptCat = null } = {}) {
+            // 0) Olvidar el filtro activo: respuestas en vuelo no se pintan
+            filtroActual = null;
+            renderizados = 0;
             // 1) Animación de salida y limpieza de proyectos
             if (proyectosFiltradosContainer.children.length > 0) {
                 try {
@@ -186,6 +303,7 @@ document.addEventListener('DOMContentLoaded', () => {
         categoriasMap.forEach(({ label, subs }, catSlug) => {
             const catDiv = document.createElement('div');
             catDiv.className = 'categoria';
+            catDiv.dataset.slug = catSlug;
             const catBtn = document.createElement('button');
             catBtn.className = 'categoria-btn';
             catBtn.setAttribute('aria-expanded', 'false');
@@ -196,17 +314,12 @@ document.addEventListener('DOMContentLoaded', () => {
             subs.forEach((subLabel, subSlug) => {
                 const sBtn = document.createElement('button');
                 sBtn.className = 'subcategoria-btn';
+                sBtn.dataset.slug = subSlug;
                 sBtn.textContent = subLabel || '';
-                // Listener de subcategoría: mantener solo una categoría activa, limpiar UI y renderizar
+                // Listener de subcategoría: mantener solo una categoría activa, limpiar UI y pedir al servidor
                 sBtn.addEventListener('click', async () => {
-                    const sub = subSlug;
                     await resetUI({ exceptCat: catDiv });
-                    const filtrados = proyectos.filter(p => normalizeString(p.subcategoria) === sub);
-                    if (filtrados.length === 0) {
-                        proyectosFiltradosContainer.innerHTML = '<p class="no-proyectos">No hay proyectos en esta subcategoría.</p>';
-                        return;
-                    }
-                    renderProyectos(filtrados);
+                    mostrarFiltro({ categoria: catSlug, sub: subSlug }, 'No hay proyectos en esta subcategoría.');
                 });
                 subContainer.appendChild(sBtn);
             });
@@ -219,12 +332,7 @@ document.addEventListener('DOMContentLoaded', () => {
                     await resetUI({ exceptCat: catDiv });
                     subContainer.style.display = 'block';
                     catBtn.setAttribute('aria-expanded', 'true');
-                    const filtradosCat = proyectos.filter(p => normalizeString(p.categoria) === catSlug);
-                    if (filtradosCat.length === 0) {
-                        proyectosFiltradosContainer.innerHTML = '<p class="no-proyectos">No hay proyectos en esta categoría.</p>';
-                    } else {
-                        renderProyectos(filtradosCat);
-                    }
+                    mostrarFiltro({ categoria: catSlug }, 'No hay proyectos en esta categoría.');
                 }
             });
             catDiv.appendChild(catBtn);
@@ -238,70 +346,52 @@ document.addEventListener('DOMContentLoaded', () => {
         const subParam = params.get('sub');
 
         // Mostrar una categoría concreta si viene por parámetro
-        if (categoriaParam) {
+        if (categoriaParam && !subParam) {
             const catSlug = normalizeString(categoriaParam);
-            const cats = panelCategorias.querySelectorAll('.categoria');
-            cats.forEach(async c => {
+            panelCategorias.querySelectorAll('.categoria').forEach(c => {
                 const btn = c.querySelector('.categoria-btn');
                 const subContainer = c.querySelector('.subcategoria-container');
-                if (btn && normalizeString(btn.textContent) === catSlug) {
-                    await resetUI({ exceptCat: c });
+                if (c.dataset.slug === catSlug) {
                     c.style.display = '';
                     if (subContainer) subContainer.style.display = 'block';
-                    btn.setAttribute('aria-expanded', 'true');
-                    const filtradosCat = proyectos.filter(p => normalizeString(p.categoria) === catSlug);
-                    if (filtradosCat.length === 0) {
-                        proyectosFiltradosContainer.innerHTML = '<p class="no-proyectos">No hay proyectos en esta categoría.</p>';
-                    } else {
-                        renderProyectos(filtradosCat);
-                    }
+                    if (btn) btn.setAttribute('aria-expanded', 'true');
                 } else {
                     c.style.display = 'none';
                 }
             });
+            mostrarFiltro({ categoria: catSlug }, 'No hay proyectos en esta categoría.');
         }
 
-        // Si no hay parámetros de filtro, mostrar todos los proyectos inicialmente
-        if (!categoriaParam && !subParam) {
-            renderProyectos(proyectos);
-        }
-
-        // Si hay subcategoría en el querystring, mostrar esa sub y renderizar directamente
+        // Si hay subcategoría en el querystring, mostrar esa sub y pedir sus proyectos
         if (subParam) {
             const subSlug = normalizeString(subParam);
-            const cats = panelCategorias.querySelectorAll('.categoria');
-            let matched = false;
-            cats.forEach(async c => {
+            const catSlug = categoriaParam ? normalizeString(categoriaParam) : '';
+            panelCategorias.querySelectorAll('.categoria').forEach(c => {
                 const btn = c.querySelector('.categoria-btn');
                 const subContainer = c.querySelector('.subcategoria-container');
-                const subBtns = c.querySelectorAll('.subcategoria-btn');
                 let foundHere = false;
-                subBtns.forEach(s => {
-                    const lbl = normalizeString(s.textContent);
-                    if (lbl === subSlug) {
+                c.querySelectorAll('.subcategoria-btn').forEach(s => {
+                    if (s.dataset.slug === subSlug) {
                         foundHere = true;
                         s.style.display = 'inline-block';
                     } else {
                         s.style.display = 'none';
                     }
                 });
-                if (foundHere) {
-                    matched = true;
-                    await resetUI({ exceptCat: c });
+                if (foundHere && (!catSlug || c.dataset.slug === catSlug)) {
                     c.style.display = '';
-                    btn.setAttribute('aria-expanded', 'true');
+                    if (btn) btn.setAttribute('aria-expanded', 'true');
                     if (subContainer) subContainer.style.display = 'block';
                 } else {
                     c.style.display = 'none';
                 }
             });
-            proyectosFiltradosContainer.innerHTML = '';
-            const filtrados = proyectos.filter(p => normalizeString(p.subcategoria) === subSlug);
-            if (!filtrados.length) {
-                proyectosFiltradosContainer.innerHTML = '<p class="no-proyectos">No hay proyectos en esta subcategoría.</p>';
-            } else {
-                renderProyectos(filtrados);
-            }
+            mostrarFiltro({ categoria: catSlug, sub: subSlug }, 'No hay proyectos en esta subcategoría.');
+        }
+
+        // Si no hay parámetros de filtro, mostrar todos los proyectos (por páginas)
+        if (!categoriaParam && !subParam) {
+            mostrarFiltro({}, 'Aún no hay proyectos cargados.');
         }
 
         // Ya se añadieron listeners a cada botón de subcategoría al construir el DOM dinámico.
@@ -315,7 +405,7 @@ document.addEventListener('DOMContentLoaded', () => {
         document.addEventListener('mouseover', e => {
             const imgTarget = e.target.closest('.proyecto-item img');
             if (imgTarget) {
-                tooltipImg.src = imgTarget.src;
+                tooltipImg.src = imgTarget.currentSrc || imgTarget.src;
                 tooltip.style.display = 'block';
             }
         });
@@ -329,11 +419,45 @@ document.addEventListener('DOMContentLoaded', () => {
             }
         });
 
-        // Helper para renderizado de proyectos con animación y observers
+        // <picture> con una <source> por formato (AVIF primero): el navegador
+        // toma el primero que soporta y, del srcset, el ancho que necesita.
+        function crearPicture(imgEl, srcset) {
+            const picture = document.createElement('picture');
+            ['avif', 'webp'].forEach(formato => {
+                if (!srcset[formato]) return;
+                const source = document.createElement('source');
+                source.type = 'image/' + formato;
+                source.srcset = srcset[formato];
+                source.sizes = SIZES_TARJETA;
+                picture.appendChild(source);
+            });
+            imgEl.sizes = SIZES_TARJETA;
+            picture.appendChild(imgEl);
+            return picture;
+        }
+
+        // Mientras carga la imagen: medidas reales (el navegador reserva el alto
+        // con su proporción) y de fondo el LQIP sobre el color dominante.
+        function pintarMientrasCarga(imgEl, p) {
+            if (p.previewAncho && p.previewAlto) {
+                imgEl.setAttribute('width', p.previewAncho);
+                imgEl.setAttribute('height', p.previewAlto);
+            }
+            if (p.previewColor) imgEl.style.backgroundColor = p.previewColor;
+            if (p.previewLqip) {
+                imgEl.style.backgroundImage = 'url("' + p.previewLqip + '")';
+                imgEl.style.backgroundSize = 'cover';
+            }
+            imgEl.addEventListener('load', function () {
+                // El fondo se vería a través de las imágenes con transparencia.
+                this.style.backgroundImage = '';
+                this.style.backgroundColor = '';
+            });
+        }
+
+        // Helper para renderizado de proyectos con animación y observers.
+        // Agrega al contenedor (no lo limpia): se usa también para páginas siguientes.
         function renderProyectos(lista) {
-            // Placeholder inline para evitar 404s
-            const PLACEHOLDER = 'data:image/svg+xml;utf8,<svg xmlns="http://www.w3.org/2000/svg" width="800" height="600"><rect width="100%" height="100%" fill="%23e5e7eb"/><text x="50%" y="50%" dominant-baseline="middle" text-anchor="middle" fill="%239ca3af" font-family="Arial, Helvetica, sans-serif" font-size="24">Sin imagen</text></svg>';
-            
             const visibles = [];
             const fuera = [];
             
@@ -344,13 +468,20 @@ document.addEventListener('DOMContentLoaded', () => {
                 imgEl.alt = p.nombre;
                 imgEl.loading = 'lazy';
                 imgEl.src = p.preview || PLACEHOLDER;
+                pintarMientrasCarga(imgEl, p);
                 imgEl.addEventListener('error', function () {
-                    if (this.src !== PLACEHOLDER) this.src = PLACEHOLDER;
+                    if (this.src === PLACEHOLDER) return;
+                    // Los <source> del <picture> tienen prioridad sobre src.
+                    if (this.parentNode && this.parentNode.tagName === 'PICTURE') {
+                        this.parentNode.querySelectorAll('source').forEach(s => s.remove());
+                    }
+                    this.removeAttribute('srcset');
+                    this.src = PLACEHOLDER;
                 });
                 const descripcion = document.createElement('div');
                 descripcion.className = 'descripcion';
                 descripcion.innerHTML = '<h4>' + (p.nombre || '') + '</h4><p>' + (p.descripcion || '') + '</p>';
-                div.appendChild(imgEl);
+                div.appendChild(p.previewSrcset ? crearPicture(imgEl, p.previewSrcset) : imgEl);
                 div.appendChild(descripcion);
                 div.addEventListener('click', () => abrirModal(p));
                 proyectosFiltradosContainer.appendChild(div);
@@ -441,9 +572,9 @@ document.addEventListener('DOMContentLoaded', () => {
                 nextBtn.setAttribute('aria-label', 'Siguiente');
                 nextBtn.textContent = '❯';
 
-                // Lógica de imágenes: usar array completo desde p.imagenes
-                const PLACEHOLDER = 'data:image/svg+xml;utf8,<svg xmlns="http://www.w3.org/2000/svg" width="800" height="600"><rect width="100%" height="100%" fill="%23e5e7eb"/><text x="50%" y="50%" dominant-baseline="middle" text-anchor="middle" fill="%239ca3af" font-family="Arial, Helvetica, sans-serif" font-size="24">Sin imagen</text></svg>';
-                const imgs = Array.isArray(p.imagenes) && p.imagenes.length ? p.imagenes : [];
+                // Lógica de imágenes: primero la portada del listado, luego la
+                // galería completa cuando llegue del detalle.
+                let imgs = Array.isArray(p.imagenes) && p.imagenes.length ? p.imagenes : [];
                 let idx = 0;
                 
                 const setImg = (i) => {
@@ -472,10 +603,21 @@ document.addEventListener('DOMContentLoaded', () => {
                 nextBtn.addEventListener('click', goNext);
                 
                 // Ocultar botones de navegación si solo hay una imagen
-                if (imgs.length <= 1) {
-                    prevBtn.style.display = 'none';
-                    nextBtn.style.display = 'none';
-                }
+                const actualizarNav = () => {
+                    const display = imgs.length <= 1 ? 'none' : '';
+                    prevBtn.style.display = display;
+                    nextBtn.style.display = display;
+                };
+                actualizarNav();
+
+                cargarGaleria(p).then(galeria => {
+                    // El modal pudo cerrarse (o cambiar de proyecto) mientras cargaba.
+                    if (!overlay.isConnected || !galeria.length) return;
+                    imgs = galeria;
+                    if (idx >= imgs.length) idx = 0;
+                    setImg(idx);
+                    actualizarNav();
+                });
 
                 // Cerrar
                 const close = (ev) => {
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+"""Benchmark de carga de los endpoints públicos, con reporte JSON.
+
+Levanta el sitio bajo gunicorn (``servidor.py``) con un catálogo sembrado y
+dispara peticiones concurrentes contra cada escenario por separado: páginas
+(``/``, ``/proyectos/``, ``/sobre-nosotros/``), la API del catálogo con
+distintos filtros y el formulario ``/contact/`` (sin ``SENDGRID_API_KEY``: guarda
+el mensaje y no envía correos). Reporta req/s y latencias p50/p95/p99 por
+escenario, junto con el commit y la configuración, para comparar corridas
+entre commits con ``--baseline``.
+
+Por defecto usa una SQLite temporal con DJANGO_DEBUG=true; con
+``--database-url`` corre contra un Postgres local (migrate + flush: usar una
+base de datos desechable).
+
+Uso (desde la raíz del repo):
+  python scripts/bench/bench.py [--peticiones 500] [--concurrencia 20]
+                                [--workers 2] [--proyectos 500] [--modo wsgi]
+                                [--escenario api-cursor ...] [--sin-cache]
+                                [--database-url postgres://...]
+                                [--salida bench.json] [--baseline anterior.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import urllib.request
+from datetime import datetime, timezone
+from http.cookies import SimpleCookie
+from pathlib import Path
+
+from carga import Escenario, correr
+from servidor import ROOT, entorno, sembrar, servidor
+
+ESCENARIOS = (
+    Escenario("home", "/"),
+    Escenario("proyectos", "/proyectos/"),
+    Escenario("sobre-nosotros", "/sobre-nosotros/"),
+    Escenario("api-default", "/api/proyectos/"),
+    Escenario("api-cursor", "/api/proyectos/?cursor=&page_size=24"),
+    Escenario("api-categoria", "/api/proyectos/?cursor=&page_size=24&categoria=residencial"),
+    Escenario("api-subcategoria", "/api/proyectos/?page_size=24&categoria=comercial&sub=tiendas"),
+    Escenario("api-busqueda", "/api/proyectos/?q=terraza&page_size=24"),
+    Escenario("api-pagina", "/api/proyectos/?page=3&page_size=24"),
+    Escenario("api-campos", "/api/proyectos/?fields=id,nombre,imagenes&page_size=100"),
+    Escenario("api-galerias", "/api/proyectos/?images=all&page_size=24"),
+    Escenario("api-facets", "/api/proyectos/facets/"),
+    Escenario("api-detalle", "/api/proyectos/{pk}/"),
+    Escenario("contacto", "/contact/", method="POST", body={
+        "nombre": "Bench",
+        "correo": "bench@gmail.com",
+        "mensaje": "Mensaje de prueba de carga.",
+        "proyecto": "",
+        "hp": "",
+    }),
+)
+
+
+def commit_actual() -> dict:
+    def git(*args):
+        return subprocess.run(
+            ["git", *args], cwd=ROOT, capture_output=True, text=True, check=False,
+        ).stdout.strip()
+
+    return {"sha": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def preparar_escenarios(base: str, escenarios: list) -> list:
+    """Resuelve ``{pk}`` y agrega el CSRF que pide ``/contact/``."""
+
+    with urllib.request.urlopen(base + "/api/proyectos/?page_size=1&fields=id") as r:
+        resultados = json.load(r)["results"]
+    pk = resultados[0]["id"] if resultados else 1
+
+    with urllib.request.urlopen(base + "/contacto/") as r:
+        cookie = SimpleCookie(r.headers.get("Set-Cookie", ""))
+    csrf = cookie["csrftoken"].value if "csrftoken" in cookie else ""
+
+    listos = []
+    for e in escenarios:
+        headers = dict(e.headers)
+        if e.method == "POST":
+            headers.update({
+                "Content-Type": "application/json",
+                "Cookie": f"csrftoken={csrf}",
+                "X-CSRFToken": csrf,
+            })
+        listos.append(Escenario(e.nombre, e.path.format(pk=pk), e.method, e.body, headers))
+    return listos
+
+
+def comparar(reporte: dict, baseline: dict) -> None:
+    anterior = baseline.get("scenarios", {})
+    print(f"\nvs {(baseline.get('commit') or {}).get('sha') or '?'}", file=sys.stderr)
+    print(f"{'escenario':<18} {'req/s':>16} {'p95 ms':>18}", file=sys.stderr)
+    for nombre, r in reporte["scenarios"].items():
+        b = anterior.get(nombre)
+        if not b:
+            continue
+        delta_rps = (r["rps"] / b["rps"] - 1) * 100 if b["rps"] else 0.0
+        delta_p95 = (r["p95_ms"] / b["p95_ms"] - 1) * 100 if b["p95_ms"] else 0.0
+        print(
+            f"{nombre:<18} {b['rps']:7.1f} {delta_rps:+7.1f}% "
+            f"{b['p95_ms']:8.1f} {delta_p95:+8.1f}%",
+            file=sys.stderr,
+        )
+
+
+def main() -> None:
+    nombres = [e.nombre for e in ESCENARIOS]
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--peticiones", type=int, default=500, help="por escenario")
+    parser.add_argument("--concurrencia", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--proyectos", type=int, default=500)
+    parser.add_argument("--modo", choices=("wsgi", "asgi"), default="wsgi")
+    parser.add_argument("--puerto", type=int, default=8766)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--escenario", action="append", choices=nombres, help="repetible; por defecto todos")
+    parser.add_argument(
+        "--sin-cache", action="store_true",
+        help="DummyCache: cada petición consulta la base de datos",
+    )
+    parser.add_argument("--salida", type=Path, help="archivo JSON (por defecto, stdout)")
+    parser.add_argument("--baseline", type=Path, help="reporte JSON anterior para comparar")
+    args = parser.parse_args()
+
+    elegidos = [e for e in ESCENARIOS if not args.escenario or e.nombre in args.escenario]
+
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmpdir:
+        tmp = Path(tmpdir)
+        env = entorno(tmp, args.database_url, cache=not args.sin_cache)
+        print(f">>> Sembrando {args.proyectos} proyectos", file=sys.stderr, flush=True)
+        sembrar(env, args.proyectos)
+
+        escenarios = {}
+        with servidor(args.modo, env, args.puerto, args.workers, tmp / "gunicorn.log") as base:
+            for escenario in preparar_escenarios(base, elegidos):
+                print(
+                    f">>> {escenario.nombre}: {args.peticiones} peticiones, "
+                    f"concurrencia {args.concurrencia}",
+                    file=sys.stderr, flush=True,
+                )
+                escenarios[escenario.nombre] = {
+                    "method": escenario.method,
+                    "path": escenario.path,
+                    **correr(base, [escenario], args.peticiones, args.concurrencia),
+                }
+
+    reporte = {
+        "commit": commit_actual(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "modo": args.modo,
+            "workers": args.workers,
+            "concurrencia": args.concurrencia,
+            "peticiones": args.peticiones,
+            "proyectos": args.proyectos,
+            "database": args.database_url.split(":", 1)[0] if args.database_url else "sqlite",
+            "cache": not args.sin_cache,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "scenarios": escenarios,
+    }
+
+    texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+    if args.salida:
+        args.salida.write_text(texto + "\n", encoding="utf-8")
+        print(f">>> Reporte en {args.salida}", file=sys.stderr)
+    else:
+        print(texto)
+
+    if args.baseline:
+        comparar(reporte, json.loads(args.baseline.read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Generador de carga con hilos y estadísticas de latencia (solo stdlib)."""
+
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Escenario:
+    nombre: str
+    path: str
+    method: str = "GET"
+    body: dict | None = None
+    headers: dict = field(default_factory=dict)
+
+
+def pedir(base: str, escenario: Escenario):
+    """Una petición; devuelve (segundos, ok)."""
+
+    data = json.dumps(escenario.body).encode("utf-8") if escenario.body is not None else None
+    request = urllib.request.Request(
+        base + escenario.path, data=data, method=escenario.method, headers=escenario.headers,
+    )
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=30) as r:
+            r.read()
+            ok = 200 <= r.status < 300
+    except (urllib.error.URLError, ConnectionError):
+        ok = False
+    return time.perf_counter() - t0, ok
+
+
+def percentil(valores: list, p: float) -> float:
+    if not valores:
+        return 0.0
+    orden = sorted(valores)
+    return orden[min(len(orden) - 1, int(round(p / 100 * (len(orden) - 1))))]
+
+
+def resumen(resultados: list, segundos: float) -> dict:
+    latencias = [lat for lat, ok in resultados if ok]
+    return {
+        "requests": len(resultados),
+        "errors": sum(1 for _, ok in resultados if not ok),
+        "rps": round(len(resultados) / segundos, 1) if segundos else 0.0,
+        "p50_ms": round(percentil(latencias, 50) * 1000, 2),
+        "p95_ms": round(percentil(latencias, 95) * 1000, 2),
+        "p99_ms": round(percentil(latencias, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencias) * 1000, 2) if latencias else 0.0,
+    }
+
+
+def correr(base: str, escenarios: list, peticiones: int, concurrencia: int, calentamiento: int = 5) -> dict:
+    """``peticiones`` repartidas en ronda entre ``escenarios``, con ``concurrencia`` hilos."""
+
+    lista = [escenarios[i % len(escenarios)] for i in range(peticiones)]
+    with ThreadPoolExecutor(concurrencia) as pool:
+        # Calentamiento: plantillas, cache del catálogo, conexiones.
+        list(pool.map(lambda e: pedir(base, e), escenarios * calentamiento))
+        t0 = time.perf_counter()
+        resultados = list(pool.map(lambda e: pedir(base, e), lista))
+        total = time.perf_counter() - t0
+    return resumen(resultados, total)
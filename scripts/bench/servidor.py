@@ -0,0 +1,98 @@
+"""Levanta el sitio bajo gunicorn para los benchmarks.
+
+Base de datos temporal (SQLite) o la de ``--database-url`` (p. ej. un Postgres
+local), catálogo sembrado y cache en un directorio propio. Sin
+``SENDGRID_API_KEY``: ``/contact/`` guarda el mensaje y responde sin enviar
+correos.
+"""
+
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+PROJECT_DIR = ROOT / "despacho_django"  # donde está manage.py
+
+
+def entorno(tmp: Path, database_url=None, cache=True, async_views=False) -> dict:
+    env = dict(os.environ)
+    env.pop("SENDGRID_API_KEY", None)
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    env.update({
+        "DJANGO_SETTINGS_MODULE": "despacho_django.settings",
+        # SQLite solo se permite con DEBUG; DEBUG también deja DEBUG el log raíz,
+        # por eso el log del servidor va a un archivo.
+        "DJANGO_DEBUG": "true",
+        "DJANGO_ALLOWED_HOSTS": "127.0.0.1,localhost",
+        "DATABASE_URL": database_url or f"sqlite:///{tmp / 'bench.sqlite3'}",
+        "DJANGO_CACHE_DIR": str(tmp / "cache"),
+        "DJANGO_ASYNC_VIEWS": "true" if async_views else "false",
+        "EDGE_PURGE_BACKEND": "proyectos.edge.NullPurgeBackend",
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(PROJECT_DIR), env.get("PYTHONPATH")])),
+    })
+    if not cache:
+        env["DJANGO_CACHE_BACKEND"] = "django.core.cache.backends.dummy.DummyCache"
+    return env
+
+
+def sembrar(env: dict, n: int, seed: int = 0) -> None:
+    """Migra, vacía la base y crea ``n`` proyectos con ``generate_catalog``."""
+
+    for comando in (
+        ["migrate", "-v", "0"],
+        ["flush", "--no-input", "-v", "0"],
+        ["generate_catalog", "--proyectos", str(n), "--seed", str(seed), "-v", "0"],
+    ):
+        subprocess.run(
+            [sys.executable, "manage.py", *comando],
+            env=env, cwd=PROJECT_DIR, check=True, stdout=subprocess.DEVNULL,
+        )
+
+
+def argumentos_gunicorn(modo: str, port: int, workers: int) -> list:
+    # Igual que railway_start.server_mode_args().
+    if modo == "wsgi":
+        app = ["despacho_django.wsgi:application"]
+    elif modo == "asgi":
+        app = ["despacho_django.asgi:application", "--worker-class", "uvicorn_worker.UvicornWorker"]
+    else:
+        raise ValueError(f"modo desconocido: {modo!r}")
+    return ["gunicorn", *app, "--bind", f"127.0.0.1:{port}", "--workers", str(workers), "--timeout", "60"]
+
+
+def esperar(base: str, timeout: float = 30.0) -> None:
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        try:
+            with urllib.request.urlopen(base + "/api/proyectos/facets/", timeout=2) as r:
+                if r.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise RuntimeError(f"El servidor no respondió en {timeout:.0f}s")
+
+
+@contextmanager
+def servidor(modo: str, env: dict, port: int, workers: int, log_path: Path):
+    """Corre gunicorn mientras dura el ``with``; devuelve la URL base."""
+
+    env = {**env, "SERVER_MODE": modo}
+    if modo == "asgi":
+        env["DJANGO_ASYNC_VIEWS"] = "true"
+    base = f"http://127.0.0.1:{port}"
+    with open(log_path, "w") as log:
+        proc = subprocess.Popen(
+            argumentos_gunicorn(modo, port, workers),
+            env=env, cwd=PROJECT_DIR, stdout=log, stderr=subprocess.STDOUT,
+        )
+        try:
+            esperar(base)
+            yield base
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
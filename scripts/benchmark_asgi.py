@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""Prueba de carga: gunicorn WSGI (sync) vs gunicorn + uvicorn (ASGI, vistas async).
+
+Levanta el sitio dos veces sobre la misma base de datos, una por modo de
+``SERVER_MODE`` de ``railway_start.py``, y dispara el mismo número de
+peticiones concurrentes contra las páginas públicas y la API. Reporta
+peticiones por segundo y latencias p50/p95/p99 de cada modo.
+
+Por defecto usa una SQLite temporal con DJANGO_DEBUG=true: sirve para comparar
+los dos modos entre sí, no como número absoluto. La diferencia aparece cuando
+la base de datos tiene latencia de red; para eso, apuntar ``--database-url`` a
+un Postgres (se crean y borran las tablas de la app con migrate/flush).
+
+Uso:
+  python scripts/benchmark_asgi.py [--peticiones 2000] [--concurrencia 50]
+                                   [--workers 2] [--proyectos 500] [--sin-cache]
+                                   [--database-url postgres://...]
+"""
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "bench"))
+
+from carga import Escenario, correr  # noqa: E402
+from servidor import entorno, sembrar, servidor  # noqa: E402
+
+RUTAS = (
+    "/",
+    "/proyectos/",
+    "/sobre-nosotros/",
+    "/api/proyectos/facets/",
+    "/api/proyectos/?page_size=24&cursor=",
+    "/api/proyectos/?page_size=24&categoria=residencial",
+    "/api/proyectos/1/",
+)
+
+
+def correr_modo(modo: str, args, env: dict, tmp: Path) -> dict:
+    escenarios = [Escenario(ruta, ruta) for ruta in RUTAS]
+    with servidor(modo, env, args.puerto, args.workers, tmp / f"{modo}.log") as base:
+        return {"modo": modo, **correr(base, escenarios, args.peticiones, args.concurrencia)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--peticiones", type=int, default=2000)
+    parser.add_argument("--concurrencia", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--proyectos", type=int, default=500)
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument(
+        "--sin-cache", action="store_true",
+        help="DummyCache: cada petición consulta la base de datos",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-asgi-") as tmpdir:
+        tmp = Path(tmpdir)
+        env = entorno(tmp, args.database_url, cache=not args.sin_cache)
+        print(f">>> Sembrando {args.proyectos} proyectos", flush=True)
+        sembrar(env, args.proyectos)
+
+        resultados = []
+        for modo in ("wsgi", "asgi"):
+            print(f">>> {modo}: {args.peticiones} peticiones, concurrencia {args.concurrencia}", flush=True)
+            resultados.append(correr_modo(modo, args, env, tmp))
+
+    print(f"\n{'modo':<6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errores':>8}")
+    for r in resultados:
+        print(
+            f"{r['modo']:<6} {r['rps']:8.1f} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} "
+            f"{r['p99_ms']:8.1f} {r['errors']:8d}"
+        )
+    wsgi, asgi = resultados
+    if wsgi["rps"]:
+        print(f"asgi vs wsgi: {asgi['rps'] / wsgi['rps']:.2f}x req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""Micro-benchmark de serialización JSON para la API de proyectos.
+
+Compara, sobre un payload de 1000 proyectos con galería:
+  - legacy: lo que hacía la vista antes (``.isoformat()`` por fila + DjangoJSONEncoder)
+  - stdlib: ``proyectos.encoders`` sin orjson
+  - orjson: ``proyectos.encoders`` con orjson (si está instalado)
+
+No toca la base de datos.
+
+Uso:
+  python scripts/benchmark_json.py [--proyectos 1000] [--repeticiones 50]
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from timeit import repeat
+
+
+def resolve_paths():
+    root = Path(__file__).resolve().parents[1]
+    project_dir = root / "despacho_django"  # donde está manage.py
+    return root, project_dir
+
+
+ROOT, PROJECT_DIR = resolve_paths()
+
+if str(PROJECT_DIR) not in sys.path:
+    sys.path.insert(0, str(PROJECT_DIR))
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "despacho_django.settings")
+
+from django.core.serializers.json import DjangoJSONEncoder  # noqa: E402
+
+from proyectos import encoders  # noqa: E402
+
+
+def build_rows(n: int) -> list[dict]:
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(n):
+        rows.append({
+            "id": i + 1,
+            "nombre": f"Proyecto {i + 1}",
+            "descripcion": "Casa habitación con terraza y jardín. " * 6,
+            "categoria": "Residencial" if i % 2 else "Comercial",
+            "subcategoria": "Interés medio",
+            "imagenes": [
+                {"imagen": f"https://example.com/media/proyectos/{i}_{j}.webp"} for j in range(4)
+            ],
+            "fecha_creacion": base + timedelta(minutes=i, microseconds=i),
+        })
+    return rows
+
+
+def legacy(rows: list[dict]) -> bytes:
+    payload = {
+        "count": len(rows),
+        "results": [{**r, "fecha_creacion": r["fecha_creacion"].isoformat()} for r in rows],
+    }
+    return json.dumps(payload, cls=DjangoJSONEncoder).encode("utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--proyectos", type=int, default=1000)
+    parser.add_argument("--repeticiones", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = build_rows(args.proyectos)
+    candidates = {"legacy": lambda: legacy(rows)}
+    for name, dumps in encoders.BACKENDS.items():
+        candidates[name] = lambda dumps=dumps: dumps({"count": len(rows), "results": rows})
+
+    print(f"Payload: {args.proyectos} proyectos, {args.repeticiones} repeticiones (mejor de 5)")
+    results = {}
+    for name, fn in candidates.items():
+        size = len(fn())
+        best = min(repeat(fn, number=args.repeticiones, repeat=5)) / args.repeticiones
+        results[name] = best
+        print(f"  {name:<7} {best * 1000:8.2f} ms/payload  ({size / 1024:.0f} KiB)")
+
+    for name in results:
+        if name != "legacy":
+            print(f"  {name} vs legacy: {results['legacy'] / results[name]:.1f}x")
+    print(f"Backend activo en la API: {encoders.BACKEND}")
+
+
+if __name__ == "__main__":
+    main()
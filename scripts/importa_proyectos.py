@@ -64,6 +64,10 @@ def locate_json_file() -> Path:
 def main():
     from django.apps import apps
 
+    from proyectos.cache import bump_catalog_version
+    from proyectos.edge import purge_keys
+    from proyectos.models import url_imagen
+
     Proyecto = apps.get_model("proyectos", "Proyecto")
     t0 = perf_counter()
 
@@ -119,7 +123,13 @@ def main():
     print(f"[INFO] A crear (tras normalizar y deduplicar por nombre): {len(to_create)}")
 
     if to_create:
+        # bulk_create no pasa por save() ni por las señales del modelo.
+        for proyecto in to_create:
+            proyecto.actualizar_slugs()
+            proyecto.imagen_url = url_imagen(proyecto.imagen)
         Proyecto.objects.bulk_create(to_create, batch_size=1000)
+        bump_catalog_version()
+        purge_keys(["catalog"])
         print(f"[OK] Importados {len(to_create)} proyectos.")
     else:
         print("[INFO] No hay proyectos para importar.")
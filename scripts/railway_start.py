@@ -137,6 +137,9 @@ def seed_projects_if_requested() -> None:
 
     from django.apps import apps
 
+    from proyectos.cache import bump_catalog_version
+    from proyectos.edge import purge_keys
+
     Proyecto = apps.get_model("proyectos", "Proyecto")
     force = env_bool("SEED_PROJECTS_FORCE", default=False)
 
@@ -206,10 +209,52 @@ def seed_projects_if_requested() -> None:
         print("[SEED] No Proyecto rows to create after parsing JSON")
         return
 
+    # bulk_create bypasses save() and model signals.
+    for proyecto in to_create:
+        proyecto.actualizar_slugs()
     Proyecto.objects.bulk_create(to_create, batch_size=500)
+    bump_catalog_version()
+    purge_keys(["catalog"])
     print(f"[SEED] Created {len(to_create)} Proyecto rows")
 
 
+def prepare_metrics_dir() -> None:
+    """Per-worker metric files for /metrics (see proyectos/metrics.py).
+
+    prometheus_client reads PROMETHEUS_MULTIPROC_DIR at import time, so it is
+    set here and inherited by every gunicorn worker. Files from a previous run
+    are removed; otherwise their counters would be added to the new ones.
+    """
+
+    path = Path(os.getenv("PROMETHEUS_MULTIPROC_DIR") or "/tmp/despacho_metrics")
+    path.mkdir(parents=True, exist_ok=True)
+    for stale in path.glob("*.db"):
+        stale.unlink()
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(path)
+
+
+def server_mode_args() -> list[str]:
+    """Application and worker class for SERVER_MODE.
+
+    - wsgi (default): sync workers; one slow request blocks its worker.
+    - asgi: uvicorn workers + async views (proyectos/views_async.py), so a
+      worker keeps serving other requests while one waits on the database.
+      Sets DJANGO_ASYNC_VIEWS=true for the workers unless it is already set.
+    """
+
+    mode = (os.getenv("SERVER_MODE") or "wsgi").strip().lower()
+    if mode == "wsgi":
+        return ["despacho_django.wsgi:application"]
+    if mode == "asgi":
+        os.environ.setdefault("DJANGO_ASYNC_VIEWS", "true")
+        return [
+            "despacho_django.asgi:application",
+            "--worker-class",
+            os.getenv("ASGI_WORKER_CLASS", "uvicorn_worker.UvicornWorker"),
+        ]
+    raise SystemExit(f"SERVER_MODE must be 'wsgi' or 'asgi', got: {mode!r}")
+
+
 def main() -> None:
     # Run migrations and collect static assets on deploy/start.
     # This ensures STATIC_ROOT exists before WhiteNoise initializes.
@@ -238,10 +283,11 @@ def main() -> None:
     workers = os.getenv("WEB_CONCURRENCY", "2")
     timeout = os.getenv("GUNICORN_TIMEOUT", "60")
 
+    prepare_metrics_dir()
+
     print(">>> Starting Gunicorn", flush=True)
-    args = [
-        "gunicorn",
-        "despacho_django.wsgi:application",
+    args = ["gunicorn", *server_mode_args()]
+    args += [
         "--bind",
         f"0.0.0.0:{port}",
         "--workers",